@@ -3,7 +3,7 @@ Built-in functions and utilities for Bayan Language
 دوال مدمجة وأدوات للغة بيان
 """
 
-from .logical_engine import Term, Predicate
+from .logical_engine import Term, Predicate, PartialList, standard_order_key
 
 class BuiltinFunctions:
     """Collection of built-in functions"""
@@ -341,26 +341,187 @@ class BuiltinFunctions:
         return {}
 
 class LogicalBuiltins:
-    """Built-in logical predicates"""
-    
+    """Built-in logical predicates
+
+    The list predicates run natively on Python lists instead of as
+    recursive [H|T] rules. Each is a generator taking (engine, goal,
+    substitution, depth) and yielding the substitution once per solution,
+    undoing its bindings before the next one, like the engine's findall/not
+    handlers. register() installs them in engine.builtins; a predicate the
+    program defines itself takes precedence over the built-in of that name.
+    """
+
+    @staticmethod
+    def register(engine):
+        """Add every native list predicate to a logical engine"""
+        LogicalBuiltins.create_member_rules(engine)
+        LogicalBuiltins.create_append_rules(engine)
+        LogicalBuiltins.create_length_rules(engine)
+        LogicalBuiltins.create_nth_rules(engine)
+        LogicalBuiltins.create_msort_rules(engine)
+
     @staticmethod
     def create_member_rules(engine):
         """Add member/2 predicate to logical engine"""
         # member(X, [X|_]).
         # member(X, [_|T]) :- member(X, T).
-        pass
-    
+        engine.builtins[('member', 2)] = LogicalBuiltins.member
+
     @staticmethod
     def create_append_rules(engine):
         """Add append/3 predicate to logical engine"""
         # append([], L, L).
         # append([H|T1], L2, [H|T3]) :- append(T1, L2, T3).
-        pass
-    
+        engine.builtins[('append', 3)] = LogicalBuiltins.append
+
     @staticmethod
     def create_length_rules(engine):
         """Add length/2 predicate to logical engine"""
         # length([], 0).
         # length([_|T], N) :- length(T, N1), N is N1 + 1.
-        pass
+        engine.builtins[('length', 2)] = LogicalBuiltins.length
+
+    @staticmethod
+    def create_nth_rules(engine):
+        """Add nth0/3 and nth1/3 predicates to logical engine"""
+        engine.builtins[('nth0', 3)] = LogicalBuiltins.nth0
+        engine.builtins[('nth1', 3)] = LogicalBuiltins.nth1
+
+    @staticmethod
+    def create_msort_rules(engine):
+        """Add msort/2 predicate to logical engine"""
+        engine.builtins[('msort', 2)] = LogicalBuiltins.msort
+
+    @staticmethod
+    def _proper_list(engine, term, substitution):
+        """Return term as a Python list if it is a complete list, else None"""
+        resolved = engine._resolve(term, substitution)
+        return resolved if isinstance(resolved, list) else None
+
+    @staticmethod
+    def _unify_all(engine, pairs, substitution):
+        """Unify each (left, right) pair; return False at the first failure"""
+        for left, right in pairs:
+            if engine._unify(left, right, substitution) is None:
+                return False
+        return True
+
+    @staticmethod
+    def _fresh_list(engine, length):
+        """Return a list of length new variables"""
+        suffix = next(engine._fresh_ids)
+        return [Term(f"_E{i}#{suffix}", is_variable=True) for i in range(length)]
+
+    @staticmethod
+    def member(engine, goal, substitution, depth=0):
+        """member(?X, +List): X unifies with each element of List in turn"""
+        element, lst = goal.args
+        items = LogicalBuiltins._proper_list(engine, lst, substitution)
+        if items is None:
+            resolved = engine._resolve(lst, substitution)
+            if not isinstance(resolved, PartialList):
+                return
+            items = resolved.head  # Only the known elements of a partial list
+        mark = substitution.mark()
+        for item in items:
+            if engine._unify(element, item, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+    @staticmethod
+    def append(engine, goal, substitution, depth=0):
+        """append(?X, ?Y, ?Z): Z is X followed by Y
+
+        Either X or Z must be a complete list. With Z known and X unbound,
+        every split of Z is enumerated, shortest prefix first.
+        """
+        first, second, whole = goal.args
+        mark = substitution.mark()
+        prefix = LogicalBuiltins._proper_list(engine, first, substitution)
+        if prefix is not None:
+            rest = engine._resolve(second, substitution)
+            if isinstance(rest, list):
+                joined = prefix + rest
+            elif not prefix:
+                joined = rest
+            else:
+                joined = PartialList(prefix, rest)
+            if engine._unify(whole, joined, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+            return
+
+        items = LogicalBuiltins._proper_list(engine, whole, substitution)
+        if items is None:
+            raise RuntimeError(f"append/3: arguments are not sufficiently instantiated: {goal}")
+        for split in range(len(items) + 1):
+            if LogicalBuiltins._unify_all(engine, [(first, items[:split]), (second, items[split:])], substitution):
+                yield substitution
+            substitution.undo(mark)
+
+    @staticmethod
+    def length(engine, goal, substitution, depth=0):
+        """length(?List, ?N): N is the length of List, or List is made of N new variables"""
+        lst, size = goal.args
+        mark = substitution.mark()
+        items = LogicalBuiltins._proper_list(engine, lst, substitution)
+        if items is not None:
+            if engine._unify(size, len(items), substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+            return
+
+        count = engine._evaluate_arithmetic(size, substitution)
+        if not isinstance(count, int):
+            raise RuntimeError(f"length/2: arguments are not sufficiently instantiated: {goal}")
+        resolved = engine._resolve(lst, substitution)
+        if isinstance(resolved, PartialList):
+            # Close a partial list [a, b|T] at the requested length
+            known = len(resolved.head)
+            if count >= known and engine._unify(
+                    resolved.tail, LogicalBuiltins._fresh_list(engine, count - known), substitution) is not None:
+                yield substitution
+        elif count >= 0 and engine._unify(lst, LogicalBuiltins._fresh_list(engine, count), substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
 
+    @staticmethod
+    def nth0(engine, goal, substitution, depth=0):
+        """nth0(?Index, +List, ?Elem): Elem is at 0-based Index of List"""
+        return LogicalBuiltins._nth(engine, goal, substitution, 0)
+
+    @staticmethod
+    def nth1(engine, goal, substitution, depth=0):
+        """nth1(?Index, +List, ?Elem): Elem is at 1-based Index of List"""
+        return LogicalBuiltins._nth(engine, goal, substitution, 1)
+
+    @staticmethod
+    def _nth(engine, goal, substitution, base):
+        index, lst, element = goal.args
+        items = LogicalBuiltins._proper_list(engine, lst, substitution)
+        if items is None:
+            return
+        mark = substitution.mark()
+        position = engine._evaluate_arithmetic(index, substitution)
+        if isinstance(position, int):
+            if 0 <= position - base < len(items) \
+                    and engine._unify(element, items[position - base], substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+            return
+        for offset, item in enumerate(items):
+            if LogicalBuiltins._unify_all(engine, [(index, offset + base), (element, item)], substitution):
+                yield substitution
+            substitution.undo(mark)
+
+    @staticmethod
+    def msort(engine, goal, substitution, depth=0):
+        """msort(+List, ?Sorted): Sorted is List in standard order, duplicates kept"""
+        lst, result = goal.args
+        items = LogicalBuiltins._proper_list(engine, lst, substitution)
+        if items is None:
+            raise RuntimeError(f"msort/2: the list is not sufficiently instantiated: {goal}")
+        mark = substitution.mark()
+        if engine._unify(result, sorted(items, key=standard_order_key), substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
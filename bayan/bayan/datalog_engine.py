@@ -0,0 +1,569 @@
+"""
+Bottom-up Datalog evaluation for Bayan
+تقييم داتالوج من الأسفل إلى الأعلى للغة بيان
+"""
+
+from .logical_engine import Term, Predicate, Fact, Substitution
+
+
+class Relation:
+    """The ground rows of one predicate, with hash indexes on bound positions
+
+    Rows are told apart by the type of their values as well, so q(a, 2)
+    and q(a, 2.0) are two rows; index lookups compare values as unification
+    does, and find both.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}  # {row_key(row): row}, in insertion order
+        self.indexes = {}  # {positions: {key: [row]}}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows.values())
+
+    def __contains__(self, row):
+        return row_key(row) in self.rows
+
+    def add(self, row):
+        """Add a row; return False if it was already present"""
+        key = row_key(row)
+        if key in self.rows:
+            return False
+        self.rows[key] = row
+        for positions, index in self.indexes.items():
+            index.setdefault(tuple(row[p] for p in positions), []).append(row)
+        return True
+
+    def discard(self, row):
+        """Remove a row if present"""
+        row = self.rows.pop(row_key(row), None)
+        if row is None:
+            return
+        for positions, index in self.indexes.items():
+            key = tuple(row[p] for p in positions)
+            bucket = index[key]
+            bucket[:] = [other for other in bucket if other is not row]
+            if not bucket:
+                del index[key]
+
+    def lookup(self, positions, key):
+        """Return the rows whose values at positions equal key"""
+        if not positions:
+            return list(self.rows.values())
+        index = self.indexes.get(positions)
+        if index is None:
+            index = self.indexes[positions] = {}
+            for row in self.rows.values():
+                index.setdefault(tuple(row[p] for p in positions), []).append(row)
+        return index.get(key, ())
+
+
+class MaterializedModel:
+    """The relations computed by a DatalogEvaluator, kept up to date as facts change"""
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.relations = evaluator.relations  # {predicate_name: Relation}
+        self.strata = evaluator.strata  # [[predicate_name]] in evaluation order
+
+    def update(self, added=(), removed=()):
+        """Apply asserted and retracted clauses; return False if the model must be rebuilt
+
+        Only ground facts can be maintained incrementally; a rule change
+        invalidates the stratification and the compiled rules.
+        """
+        changes = []
+        for clause in list(added) + list(removed):
+            if not isinstance(clause, Fact):
+                return False
+            row = tuple(clause.predicate.args)
+            if not all(_is_ground(value) for value in row):
+                return False
+            changes.append((clause.predicate.name, row))
+
+        if added:
+            self.evaluator.insert(changes[:len(added)])
+        if removed:
+            self.evaluator.delete(changes[len(added):])
+        return True
+
+    def solve(self, engine, goal, substitution):
+        """Yield once per row of the model matching a goal"""
+        relation = self.relations[goal.name]
+        args = [engine._deref(arg, substitution) for arg in goal.args]
+        positions = tuple(i for i, arg in enumerate(args) if _is_ground(arg))
+        key = tuple(args[p] for p in positions)
+
+        mark = substitution.mark()
+        for row in list(relation.lookup(positions, key)):
+            if len(row) == len(args) and engine._unify(args, list(row), substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+
+class DatalogEvaluator:
+    """Compute the least model of a knowledge base bottom-up
+
+    Rules are grouped into strata so that every predicate used under not/1
+    is fully computed before the rules that negate it. Each stratum is run
+    to a fixpoint with semi-naive iteration: after the first round, a rule
+    is only re-evaluated with one of its recursive body literals reading
+    the rows derived in the previous round. Body literals are joined with
+    hash indexes on their bound positions, starting from the literal that
+    reads the new rows.
+
+    Once built, the model is maintained incrementally: inserted facts are
+    propagated as deltas, and deleted facts use delete/rederive (DRed),
+    first over-deleting everything they may have supported, then restoring
+    the rows that still have another derivation. A stratum that negates a
+    changed predicate is recomputed instead, together with the strata
+    above it.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.relations = {}
+        self.rules = []  # [(rule, [(kind, goal)])]
+        self.base = {}  # {predicate_name: {row_key(row): (row, number of facts asserting it)}}
+        self.strata = []  # [[predicate_name]]
+        self.stratum_rules = []  # Rules defining the predicates of each stratum
+        self.join_orders = {}  # {(id(literals), delta position, bound names): (literals, delta position)}
+
+    def run(self):
+        """Materialize every predicate of the knowledge base"""
+        for pred_name, clauses in self.engine.knowledge_base.items():
+            relation = self._relation(pred_name)
+            for clause in clauses:
+                if isinstance(clause, Fact):
+                    row = tuple(clause.predicate.args)
+                    if not all(_is_ground(value) for value in row):
+                        raise RuntimeError(f"Bottom-up evaluation requires ground facts: {clause}")
+                    self._count_base(pred_name, row, 1)
+                    relation.add(row)
+                else:
+                    self.rules.append((clause, self._compile_body(clause)))
+
+        self.strata = self._stratify()
+        for names in self.strata:
+            members = set(names)
+            self.stratum_rules.append([r for r in self.rules if r[0].head.name in members])
+        for level in range(len(self.strata)):
+            self._evaluate_stratum(level)
+        self._prepare_indexes()
+        return MaterializedModel(self)
+
+    def insert(self, facts):
+        """Add ground facts [(predicate_name, row)] and propagate what they derive"""
+        delta = {}
+        for pred_name, row in facts:
+            self._count_base(pred_name, row, 1)
+            if self._relation(pred_name).add(row):
+                _delta_for(delta, pred_name).add(row)
+        self._propagate_insert(delta)
+
+    def delete(self, facts):
+        """Remove ground facts [(predicate_name, row)] and the rows that only they supported"""
+        deleted = {}
+        for pred_name, row in facts:
+            if self._count_base(pred_name, row, -1) == 0 and row in self._relation(pred_name):
+                _delta_for(deleted, pred_name).add(row)
+        if not deleted:
+            return
+
+        # Over-delete: every row with a derivation using a deleted row, up to
+        # the first stratum that negates one of them
+        stop = len(self.strata)
+        for level, rules in enumerate(self.stratum_rules):
+            if self._negates(rules, deleted):
+                stop = level
+                break
+            current = dict(deleted)
+            while current:
+                found = {}
+                for rule, literals in rules:
+                    name = rule.head.name
+                    for i, (kind, goal) in enumerate(literals):
+                        if kind == 'positive' and goal.name in current:
+                            rows = [self._head_row(rule, bindings)
+                                    for bindings in self._solutions(literals, {}, i, current[goal.name])]
+                            for row in rows:
+                                if row in self.relations[name] and row not in deleted.get(name, ()):
+                                    _delta_for(deleted, name).add(row)
+                                    _delta_for(found, name).add(row)
+                current = found
+        self._remove(deleted)
+
+        # Rederive: restore the rows that still have a derivation, then propagate them
+        restored = {}
+        for pred_name, rows in deleted.items():
+            for row in rows:
+                if row not in self.relations[pred_name] and self._derivable(pred_name, row):
+                    self.relations[pred_name].add(row)
+                    _delta_for(restored, pred_name).add(row)
+        self._propagate_insert(restored, stop)
+        if stop < len(self.strata):
+            self._recompute(stop)
+
+    def _relation(self, pred_name):
+        if pred_name not in self.relations:
+            self.relations[pred_name] = Relation(pred_name)
+        return self.relations[pred_name]
+
+    def _compile_body(self, rule):
+        """Classify each body goal as a positive, negative, comparison or 'is' literal"""
+        from .ast_nodes import IsExpression
+
+        literals = []
+        for goal in rule.body:
+            if isinstance(goal, IsExpression):
+                literals.append(('is', goal))
+            elif isinstance(goal, Predicate) and goal.name.startswith('_compare_'):
+                literals.append(('compare', goal))
+            elif isinstance(goal, Predicate) and goal.name == 'not' and len(goal.args) == 1 \
+                    and self._is_relation_goal(goal.args[0]):
+                literals.append(('negative', goal.args[0]))
+                self._relation(goal.args[0].name)
+            elif self._is_relation_goal(goal):
+                literals.append(('positive', goal))
+                self._relation(goal.name)
+            else:
+                raise RuntimeError(f"Bottom-up evaluation does not support the goal {goal} in {rule}")
+        self._check_safety(rule, literals)
+        self._relation(rule.head.name)
+        return literals
+
+    def _is_relation_goal(self, goal):
+        """Check whether a goal reads a stored or derived relation, not a builtin"""
+        return isinstance(goal, Predicate) \
+            and goal.name not in ('findall', 'bagof', 'setof', 'aggregate_all', 'not') \
+            and not ((goal.name, len(goal.args)) in self.engine.builtins
+                     and goal.name not in self.engine.knowledge_base)
+
+    def _check_safety(self, rule, literals):
+        """Raise if a head variable is not bound by a positive or 'is' literal of the body"""
+        bound = set()
+        for kind, goal in literals:
+            if kind == 'positive':
+                bound.update(arg.value for arg in goal.args if isinstance(arg, Term) and arg.is_variable)
+            elif kind == 'is' and isinstance(goal.variable, Term) and goal.variable.is_variable:
+                bound.add(goal.variable.value)
+        for arg in rule.head.args:
+            if isinstance(arg, Term) and arg.is_variable and arg.value not in bound:
+                raise RuntimeError(f"Unsafe rule for bottom-up evaluation, ?{arg.value} is unbound: {rule}")
+
+    def _stratify(self):
+        """Assign each predicate a stratum; raise if negation is recursive"""
+        stratum = {name: 0 for name in self.relations}
+        limit = len(stratum)
+        changed = True
+        while changed:
+            changed = False
+            for rule, literals in self.rules:
+                head = rule.head.name
+                for kind, goal in literals:
+                    if kind == 'positive':
+                        needed = stratum[goal.name]
+                    elif kind == 'negative':
+                        needed = stratum[goal.name] + 1
+                    else:
+                        continue
+                    if needed > stratum[head]:
+                        if needed > limit:
+                            raise RuntimeError(f"Program is not stratifiable: {head} depends negatively on itself")
+                        stratum[head] = needed
+                        changed = True
+
+        strata = [[] for _ in range(max(stratum.values(), default=-1) + 1)]
+        for name, level in stratum.items():
+            strata[level].append(name)
+        return [names for names in strata if names]
+
+    def _evaluate_stratum(self, level):
+        """Run the rules of one stratum to a fixpoint with semi-naive iteration"""
+        rules = self.stratum_rules[level]
+        members = set(self.strata[level])
+
+        # The first round joins the full relations
+        delta = {}
+        for rule, literals in rules:
+            self._derive(rule, literals, None, None, delta)
+
+        while delta:
+            new_delta = {}
+            for rule, literals in rules:
+                for i, (kind, goal) in enumerate(literals):
+                    if kind == 'positive' and goal.name in members and goal.name in delta:
+                        self._derive(rule, literals, i, delta[goal.name], new_delta)
+            delta = new_delta
+
+    def _propagate_insert(self, delta, stop=None):
+        """Derive, stratum by stratum below stop, the rows that follow from newly added rows"""
+        if not delta:
+            return
+        for level, rules in enumerate(self.stratum_rules[:stop]):
+            if self._negates(rules, delta):
+                self._recompute(level)
+                return
+            current = dict(delta)
+            while current:
+                found = {}
+                for rule, literals in rules:
+                    for i, (kind, goal) in enumerate(literals):
+                        if kind == 'positive' and goal.name in current:
+                            self._derive(rule, literals, i, current[goal.name], found)
+                for pred_name, rows in found.items():
+                    for row in rows:
+                        _delta_for(delta, pred_name).add(row)
+                current = found
+
+    def _negates(self, rules, changed):
+        """Check whether any rule negates a predicate with changed rows"""
+        return any(kind == 'negative' and goal.name in changed
+                   for rule, literals in rules for kind, goal in literals)
+
+    def _recompute(self, level):
+        """Rebuild the derived rows of a stratum and of every stratum above it"""
+        for names in self.strata[level:]:
+            for pred_name in names:
+                relation = self.relations[pred_name] = Relation(pred_name)
+                for row, _ in self.base.get(pred_name, {}).values():
+                    relation.add(row)
+        for higher in range(level, len(self.strata)):
+            self._evaluate_stratum(higher)
+        self._prepare_indexes()
+
+    def _remove(self, deleted):
+        """Drop deleted rows from their relations, keeping rows still asserted as facts"""
+        for pred_name, rows in deleted.items():
+            asserted = self.base.get(pred_name, {})
+            for row in rows:
+                if row_key(row) not in asserted:
+                    self.relations[pred_name].discard(row)
+
+    def _derivable(self, pred_name, row):
+        """Check whether a rule still derives a row from the current relations"""
+        for rule, literals in self.rules:
+            if rule.head.name != pred_name or len(rule.head.args) != len(row):
+                continue
+            bindings = {}
+            for arg, value in zip(rule.head.args, row):
+                if isinstance(arg, Term) and arg.is_variable:
+                    if bindings.setdefault(arg.value, value) != value:
+                        break
+                elif arg != value:
+                    break
+            else:
+                for solution in self._solutions(literals, bindings, None, None):
+                    if self._head_row(rule, solution) == row:
+                        return True
+        return False
+
+    def _count_base(self, pred_name, row, change):
+        """Adjust how many facts assert a row; return the new count"""
+        counts = self.base.setdefault(pred_name, {})
+        key = row_key(row)
+        count = counts.get(key, (row, 0))[1] + change
+        if count > 0:
+            counts[key] = (row, count)
+        else:
+            counts.pop(key, None)
+        return max(count, 0)
+
+    def _derive(self, rule, literals, delta_position, delta_relation, delta):
+        """Evaluate one rule, adding new head rows to its relation and to delta"""
+        rows = [self._head_row(rule, bindings)
+                for bindings in self._solutions(literals, {}, delta_position, delta_relation)]
+        relation = self.relations[rule.head.name]
+        for row in rows:
+            if relation.add(row):
+                _delta_for(delta, rule.head.name).add(row)
+
+    def _prepare_indexes(self):
+        """Build the indexes that joins starting from a changed literal will look up
+
+        Building them with the model keeps the first update after
+        materialize() in proportion to the change as well.
+        """
+        for rule, literals in self.rules:
+            for i, (kind, _) in enumerate(literals):
+                if kind != 'positive':
+                    continue
+                ordered, _ = self._solutions_order(literals, i, set())
+                bound = set()
+                for position, (kind, goal) in enumerate(ordered):
+                    if kind == 'positive' and position > 0:
+                        positions = tuple(p for p, arg in enumerate(goal.args)
+                                          if not (isinstance(arg, Term) and arg.is_variable) or arg.value in bound)
+                        if positions:
+                            self.relations[goal.name].lookup(positions, None)
+                    bound |= _bound_by(kind, goal)
+
+    def _solutions_order(self, literals, delta_position, bound):
+        """Return the cached join order of literals for a delta position and bound variables"""
+        key = (id(literals), delta_position, frozenset(bound))
+        if key not in self.join_orders:
+            self.join_orders[key] = self._join_order(literals, delta_position, set(bound))
+        return self.join_orders[key]
+
+    def _solutions(self, literals, bindings, delta_position, delta_relation):
+        """Yield every extension of bindings satisfying literals, reading delta_relation at delta_position"""
+        ordered, position = self._solutions_order(literals, delta_position, bindings)
+        return self._join(ordered, 0, bindings, position, delta_relation)
+
+    def _join_order(self, literals, delta_position, bound):
+        """Reorder body literals so each positive one is looked up on bound positions
+
+        The delta literal goes first, so an update costs time in proportion
+        to the change rather than to the relations it joins with. After it
+        come the literals that can be looked up on the most bound positions.
+        A negative, comparison or 'is' literal keeps its place after the
+        positive literals written before it, and a positive literal only
+        moves ahead of one of them if that does not bind its variables
+        sooner. Return the ordered literals and the new delta position.
+        """
+        bound = set(bound)
+        before = {}  # {index of a non-positive literal: variables bound before it as written}
+        seen = set(bound)
+        for i, (kind, goal) in enumerate(literals):
+            if kind != 'positive':
+                before[i] = set(seen)
+            seen |= _bound_by(kind, goal)
+
+        def movable(i):
+            kind, goal = literals[i]
+            if kind != 'positive':
+                return all(j in placed for j in range(i) if literals[j][0] == 'positive' or j in before)
+            names = _variables(goal)
+            return all(j in placed or not (names & _variables(literals[j][1])) - before[j]
+                       for j in before if j < i)
+
+        def bound_positions(i):
+            return sum(1 for arg in literals[i][1].args
+                       if not (isinstance(arg, Term) and arg.is_variable) or arg.value in bound)
+
+        placed = []
+        while len(placed) < len(literals):
+            ready = [i for i in range(len(literals)) if i not in placed and movable(i)]
+            if delta_position in ready:
+                choice = delta_position
+            else:
+                filters = [i for i in ready if literals[i][0] != 'positive']
+                choice = filters[0] if filters else max(ready, key=lambda i: (bound_positions(i), -i))
+            placed.append(choice)
+            bound |= _bound_by(*literals[choice])
+        position = placed.index(delta_position) if delta_position is not None else None
+        return [literals[i] for i in placed], position
+
+    def _join(self, literals, position, bindings, delta_position, delta_relation):
+        """Yield every extension of bindings satisfying literals[position:]"""
+        if position == len(literals):
+            yield bindings
+            return
+
+        kind, goal = literals[position]
+        following = position + 1
+        if kind == 'positive':
+            relation = delta_relation if position == delta_position else self.relations[goal.name]
+            for extended in self._match(relation, goal, bindings):
+                yield from self._join(literals, following, extended, delta_position, delta_relation)
+        elif kind == 'negative':
+            if not any(True for _ in self._match(self.relations[goal.name], goal, bindings)):
+                yield from self._join(literals, following, bindings, delta_position, delta_relation)
+        elif kind == 'compare':
+            if self.engine._evaluate_comparison(goal, Substitution(dict(bindings))) is not None:
+                yield from self._join(literals, following, bindings, delta_position, delta_relation)
+        else:
+            substitution = Substitution(dict(bindings))
+            if self.engine._evaluate_is_expression(goal, substitution) is not None:
+                # Store computed numbers as terms so rows compare with stored facts
+                extended = {name: value if isinstance(value, Term) else self.engine._constant(value)
+                            for name, value in substitution.bindings.items()}
+                yield from self._join(literals, following, extended, delta_position, delta_relation)
+
+    def _match(self, relation, goal, bindings):
+        """Yield bindings extended by each row of relation matching goal"""
+        positions = []
+        key = []
+        free = []  # (position, variable name) of the arguments still unbound
+        for i, arg in enumerate(goal.args):
+            if isinstance(arg, Term) and arg.is_variable:
+                if arg.value in bindings:
+                    positions.append(i)
+                    key.append(bindings[arg.value])
+                else:
+                    free.append((i, arg.value))
+            elif _is_ground(arg):
+                positions.append(i)
+                key.append(arg)
+            else:
+                raise RuntimeError(f"Bottom-up evaluation does not support compound arguments: {goal}")
+
+        for row in relation.lookup(tuple(positions), tuple(key)):
+            if len(row) != len(goal.args):
+                continue
+            extended = dict(bindings)
+            for i, name in free:
+                if name in extended and extended[name] != row[i]:
+                    break
+                extended[name] = row[i]
+            else:
+                yield extended
+
+    def _head_row(self, rule, bindings):
+        # _check_safety has made sure every head variable is bound
+        return tuple(bindings[arg.value] if isinstance(arg, Term) and arg.is_variable else arg
+                     for arg in rule.head.args)
+
+
+def row_key(row):
+    """Return a key for a row that tells 1, 1.0 and True apart"""
+    return tuple((value.value.__class__, value.value) if isinstance(value, Term) else (value.__class__, value)
+                 for value in row)
+
+
+def _variables(value):
+    """Return the names of the variables in a goal, term or arithmetic expression"""
+    from .ast_nodes import BinaryOp, UnaryOp, Variable, IsExpression
+
+    if isinstance(value, Term):
+        return {value.value} if value.is_variable else set()
+    if isinstance(value, Variable):
+        return {value.name[1:] if value.name.startswith('?') else value.name}
+    if isinstance(value, Predicate):
+        value = value.args
+    elif isinstance(value, IsExpression):
+        value = [value.variable, value.expression]
+    elif isinstance(value, BinaryOp):
+        value = [value.left, value.right]
+    elif isinstance(value, UnaryOp):
+        value = [value.operand]
+    elif not isinstance(value, (list, tuple)):
+        return set()
+    names = set()
+    for item in value:
+        names |= _variables(item)
+    return names
+
+
+def _bound_by(kind, goal):
+    """Return the names of the variables a body literal binds"""
+    if kind == 'positive':
+        return _variables(goal)
+    if kind == 'is':
+        return _variables(goal.variable)
+    return set()
+
+
+def _delta_for(delta, pred_name):
+    """Return the delta relation of a predicate, creating it if missing"""
+    if pred_name not in delta:
+        delta[pred_name] = Relation(pred_name)
+    return delta[pred_name]
+
+
+def _is_ground(value):
+    """Check whether a value can be stored in a relation row"""
+    if isinstance(value, Term):
+        return not value.is_variable
+    return isinstance(value, (str, int, float, bool))
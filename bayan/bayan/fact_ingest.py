@@ -0,0 +1,148 @@
+"""
+Streaming ingestion of CSV, TSV and JSONL files as logical facts
+استيراد الحقائق المنطقية من ملفات CSV وTSV وJSONL بشكل متدفق
+"""
+
+import csv
+import json
+import os
+import re
+
+from .logical_engine import Fact, Predicate, Term
+
+FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.tab': 'tsv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# No leading zeros: codes such as 007 or 02139 stay text
+_NUMBER = re.compile(r'-?(0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+
+
+def native_value(text):
+    """Convert the text of a numeric field to an int or float, leaving other text as is
+
+    Text with a leading zero, such as '007', is not a number.
+    """
+    stripped = text.strip()
+    if not _NUMBER.fullmatch(stripped):
+        return text
+    if '.' in stripped or 'e' in stripped or 'E' in stripped:
+        return float(stripped)
+    return int(stripped)
+
+
+def file_format(path, format=None):
+    """Return 'csv', 'tsv' or 'jsonl' for a file, from format or the file extension"""
+    if format is None:
+        format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise ValueError(f"Cannot tell the format of {path}; pass format='csv', 'tsv' or 'jsonl'")
+    if format not in ('csv', 'tsv', 'jsonl'):
+        raise ValueError(f"Unknown fact file format: {format}")
+    return format
+
+
+def read_facts(path, predicate, columns=None, format=None, header=True, numeric=True, encoding='utf-8'):
+    """Yield one Fact per record of a CSV, TSV or JSONL file, reading it lazily
+
+    columns selects and orders the fields that become the predicate's
+    arguments: header names (or JSON keys) or 0-based positions. By
+    default every column is used, in file order; for JSONL the keys of
+    the first record are used.
+
+    numeric chooses the CSV/TSV columns whose fields become ints or floats
+    (JSON values keep their own types). With True, a column is converted
+    only if every field in it is a number, which takes one extra pass over
+    the file; with a collection of column names or positions, those
+    columns are converted and a field that is not a number is an error.
+    """
+    format = file_format(path, format)
+    with open(path, newline='', encoding=encoding) as handle:
+        if format == 'jsonl':
+            records = _json_records(handle, path, columns)
+        else:
+            records = _delimited_records(handle, path, columns, '\t' if format == 'tsv' else ',', header, numeric)
+        for values in records:
+            yield Fact(Predicate(predicate, [_term(value) for value in values]))
+
+
+def _term(value):
+    if isinstance(value, list):
+        return [_term(item) for item in value]
+    return Term(value)
+
+
+def _delimited_records(handle, path, columns, delimiter, header, numeric):
+    if numeric is True:
+        numeric = _numeric_columns(handle, delimiter, header)
+        handle.seek(0)
+    reader = csv.reader(handle, delimiter=delimiter)
+    names = None
+    if header:
+        names = next(reader, None)
+        if names is None:
+            return
+    positions = None
+    if columns is not None:
+        positions = [_position(column, names, path) for column in columns]
+    converted = {_position(column, names, path) for column in numeric} if numeric else set()
+
+    for row in reader:
+        if not row:
+            continue
+        if positions is None:
+            positions = list(range(len(names) if names is not None else len(row)))
+        try:
+            fields = [row[position] for position in positions]
+        except IndexError:
+            raise ValueError(f"{path}:{reader.line_num}: expected at least {max(positions) + 1} fields, got {len(row)}")
+        values = []
+        for position, field in zip(positions, fields):
+            if position in converted:
+                field = native_value(field)
+                if isinstance(field, str):
+                    raise ValueError(f"{path}:{reader.line_num}: {field!r} in column {position} is not a number")
+            values.append(field)
+        yield values
+
+
+def _numeric_columns(handle, delimiter, header):
+    """Return the positions of the columns whose fields are all numbers"""
+    reader = csv.reader(handle, delimiter=delimiter)
+    if header:
+        next(reader, None)
+    candidates = None
+    for row in reader:
+        if not row:
+            continue
+        if candidates is None:
+            candidates = set(range(len(row)))
+        candidates = {p for p in candidates if p < len(row) and _NUMBER.fullmatch(row[p].strip())}
+        if not candidates:
+            break
+    return candidates or set()
+
+
+def _position(column, names, path):
+    if isinstance(column, int):
+        return column
+    if names is None or column not in names:
+        raise ValueError(f"{path}: no column named {column!r}")
+    return names.index(column)
+
+
+def _json_records(handle, path, columns):
+    for line_number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, list):
+            keys = columns if columns is not None else range(len(record))
+        elif isinstance(record, dict):
+            if columns is None:
+                columns = list(record)
+            keys = columns
+        else:
+            raise ValueError(f"{path}:{line_number}: expected a JSON object or array")
+        try:
+            yield [record[key] for key in keys]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"{path}:{line_number}: record has no field for every column in {list(keys)}")
@@ -217,9 +217,8 @@ class HybridInterpreter:
         """Visit a logical if statement"""
         # Try to solve the condition as a logical query
         if isinstance(node.condition, LogicalQuery):
-            solutions = self.logical.query(node.condition.goal)
-
-            if solutions:
+            # Only the existence of a solution matters, so stop at the first one
+            if self.logical.has_solution(node.condition.goal):
                 # If solutions found, execute then branch
                 return self.interpret(node.then_branch)
             elif node.else_branch:
@@ -245,7 +245,7 @@ class HybridLexer:
         # Match ** before * to avoid splitting it
         if self._match_pattern(r'\*\*', TokenType.OPERATOR):
             return True
-        if self._match_pattern(r'[+\-*/%]', TokenType.OPERATOR):
+        if self._match_pattern(r'[+\-*/%^]', TokenType.OPERATOR):
             return True
         if self._match_pattern(r'=', TokenType.ASSIGN):
             return True
@@ -280,9 +280,13 @@ class HybridLexer:
 
         return False
 
+    _compiled_patterns = {}  # {pattern: compiled regex}, shared by every lexer
+
     def _match_pattern(self, pattern, token_type=None):
         """Try to match a regex pattern"""
-        regex = re.compile(pattern)
+        regex = self._compiled_patterns.get(pattern)
+        if regex is None:
+            regex = self._compiled_patterns[pattern] = re.compile(pattern)
         match = regex.match(self.code, self.position)
 
         if match:
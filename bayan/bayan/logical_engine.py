@@ -3,11 +3,21 @@ Logical Engine for Bayan Language
 محرك منطقي للغة بيان
 """
 
+import heapq
+import itertools
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
 class Term:
     """Represents a logical term (constant, variable, or compound)"""
+    __slots__ = ('value', 'is_variable', '_hash')
+
     def __init__(self, value, is_variable=False):
         self.value = value
         self.is_variable = is_variable
+        self._hash = None  # Computed on first use
     
     def __repr__(self):
         if self.is_variable:
@@ -20,13 +30,18 @@ class Term:
         return self.value == other.value and self.is_variable == other.is_variable
     
     def __hash__(self):
-        return hash((self.value, self.is_variable))
+        if self._hash is None:
+            self._hash = hash((self.value, self.is_variable))
+        return self._hash
 
 class Predicate:
     """Represents a logical predicate"""
+    __slots__ = ('name', 'args', '_hash')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args  # List of Term objects
+        self._hash = None  # Computed on first use
     
     def __repr__(self):
         args_str = ", ".join(str(arg) for arg in self.args)
@@ -37,8 +52,15 @@ class Predicate:
             return False
         return self.name == other.name and self.args == other.args
 
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.name, tuple(self.args)))
+        return self._hash
+
 class Fact:
     """Represents a logical fact"""
+    __slots__ = ('predicate',)
+
     def __init__(self, predicate):
         self.predicate = predicate
     
@@ -47,55 +69,1212 @@ class Fact:
 
 class Rule:
     """Represents a logical rule: head :- body"""
+    __slots__ = ('head', 'body', '_template')
+
     def __init__(self, head, body):
         self.head = head  # Predicate
         self.body = body  # List of Predicates
+        self._template = None  # ClauseTemplate, compiled when the rule is stored or first run
     
     def __repr__(self):
         body_str = ", ".join(str(p) for p in self.body)
         return f"{self.head} :- {body_str}."
 
+class Atom(Term):
+    """An interned constant Term: equal constants share one Atom object"""
+    __slots__ = ('atom_id',)
+
+    def __init__(self, value, atom_id):
+        super().__init__(value)
+        self.atom_id = atom_id  # Small integer ID in the engine's AtomTable
+
+class ListView:
+    """A read-only view of items[start:], so list tails need no copying
+
+    Matching [H|T] against a list binds T to a ListView over the same
+    backing list, making each step of a recursion over the list O(1). A
+    view compares equal to a list with the same elements.
+    """
+    __slots__ = ('items', 'start')
+
+    def __init__(self, items, start=0):
+        if isinstance(items, ListView):
+            start += items.start
+            items = items.items
+        self.items = items
+        self.start = start
+
+    def __len__(self):
+        return len(self.items) - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('ListView index out of range')
+        return self.items[self.start + index]
+
+    def __iter__(self):
+        items = self.items
+        for index in range(self.start, len(items)):
+            yield items[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, ListView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+class PartialList:
+    """An open list term [H1, ..., Hn|Tail]
+
+    head is a list of element terms and tail the rest of the list: a
+    variable, a list, a ListView or another PartialList.
+    """
+    __slots__ = ('head', 'tail')
+
+    def __init__(self, head, tail):
+        self.head = head
+        self.tail = tail
+
+    @classmethod
+    def from_dict(cls, pattern):
+        """Convert the older {'list_pattern': True, 'head': ..., 'tail': ...} form"""
+        return cls(pattern['head'], pattern['tail'])
+
+    def __eq__(self, other):
+        if not isinstance(other, PartialList):
+            return False
+        return self.head == other.head and self.tail == other.tail
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"[{', '.join(str(item) for item in self.head)}|{self.tail}]"
+
+def _list_pattern(term):
+    """Return term as a PartialList if it is one (or the older dict form), else None"""
+    if isinstance(term, PartialList):
+        return term
+    if isinstance(term, dict) and 'list_pattern' in term:
+        return PartialList.from_dict(term)
+    return None
+
+class AtomTable:
+    """Interns constants and hash-conses ground predicates
+
+    Every distinct constant value (Arabic or Latin string, number, ...)
+    gets one Atom with a small integer ID, and ground Predicates built from
+    interned arguments are shared the same way, so identical facts reuse
+    one structure and unification can compare atoms by identity.
+    """
+    def __init__(self):
+        self.atoms = []  # [Atom], indexed by atom ID
+        self.atom_ids = {}  # {(value type, value): atom ID}
+        self.predicates = {}  # {ground key: Predicate}
+
+    def __len__(self):
+        return len(self.atoms)
+
+    def atom(self, value):
+        """Return the Atom for a constant value, creating it on first use"""
+        key = (value.__class__, value)
+        atom_id = self.atom_ids.get(key)
+        if atom_id is None:
+            atom_id = self.atom_ids[key] = len(self.atoms)
+            self.atoms.append(Atom(value, atom_id))
+        return self.atoms[atom_id]
+
+    def owns(self, term):
+        """Return True if term is an Atom of this table (not of another engine's)"""
+        if term.__class__ is not Atom:
+            return False
+        atom_id = term.atom_id
+        return atom_id < len(self.atoms) and self.atoms[atom_id] is term
+
+    def intern(self, term):
+        """Return term with its constants interned and ground predicates shared"""
+        return self._intern(term, True)[0]
+
+    def find(self, term):
+        """Return term with its known constants and ground predicates swapped for the shared ones
+
+        Unlike intern, nothing is added to the table: a constant no stored
+        clause uses stays a plain Term, since it cannot match a stored atom
+        anyway. Used for queries, so answering them does not grow the table.
+        """
+        return self._intern(term, False)[0]
+
+    def _intern(self, term, create):
+        """Return (interned term, ground key), the key being None for non-ground terms"""
+        if isinstance(term, Term):
+            if term.is_variable:
+                return term, None
+            if not self.owns(term):
+                # A plain Term, or an Atom of another engine's table
+                try:
+                    if create:
+                        term = self.atom(term.value)
+                    else:
+                        atom_id = self.atom_ids.get((term.value.__class__, term.value))
+                        if atom_id is None:
+                            return (Term(term.value) if isinstance(term, Atom) else term), None
+                        term = self.atoms[atom_id]
+                except TypeError:
+                    return term, None  # Unhashable constant value
+            return term, term.atom_id
+        if isinstance(term, Predicate):
+            interned = [self._intern(arg, create) for arg in term.args]
+            args = [arg for arg, _ in interned]
+            if any(key is None for _, key in interned):
+                return Predicate(term.name, args), None
+            key = (term.name, tuple(key for _, key in interned))
+            predicate = self.predicates.get(key)
+            if predicate is None:
+                predicate = Predicate(term.name, args)
+                if create:
+                    self.predicates[key] = predicate
+            return predicate, key
+        if isinstance(term, list):
+            interned = [self._intern(item, create) for item in term]
+            keys = tuple(key for _, key in interned)
+            return [item for item, _ in interned], (None if None in keys else ('[]', keys))
+        pattern = _list_pattern(term)
+        if pattern is not None:
+            return PartialList([self._intern(item, create)[0] for item in pattern.head],
+                               self._intern(pattern.tail, create)[0]), None
+        if isinstance(term, (str, int, float)):
+            return term, ('raw', term.__class__, term)
+        return term, None
+
 class Substitution:
-    """Represents variable substitutions"""
+    """Represents variable substitutions
+
+    The solver keeps one Substitution per query as a mutable binding store.
+    bind() records every new binding on an undo trail, so backtracking pops
+    the trail back to a mark() instead of copying the bindings at each
+    choice point.
+    """
+    __slots__ = ('bindings', 'trail')
+
     def __init__(self, bindings=None):
         self.bindings = bindings or {}
-    
+        self.trail = []  # Names of new bindings, or (name, old value) of rebound ones
+
     def bind(self, var_name, value):
         """Bind a variable to a value"""
         self.bindings[var_name] = value
-    
+        self.trail.append(var_name)
+
+    def rebind(self, var_name, value):
+        """Replace a variable's binding, recording the old one for undo()"""
+        self.trail.append((var_name, self.bindings[var_name]))
+        self.bindings[var_name] = value
+
     def lookup(self, var_name):
         """Look up a variable"""
         return self.bindings.get(var_name)
-    
+
+    def mark(self):
+        """Return the current trail height, to undo() back to later"""
+        return len(self.trail)
+
+    def undo(self, mark):
+        """Remove every binding made since mark, restoring rebound variables"""
+        bindings = self.bindings
+        trail = self.trail
+        while len(trail) > mark:
+            entry = trail.pop()
+            if entry.__class__ is tuple:
+                bindings[entry[0]] = entry[1]
+            else:
+                del bindings[entry]
+
     def copy(self):
         """Create a copy of this substitution"""
         return Substitution(self.bindings.copy())
-    
+
     def __repr__(self):
         return f"Substitution({self.bindings})"
 
+def clause_head(clause):
+    """Return the head predicate of a fact or rule"""
+    return clause.predicate if isinstance(clause, Fact) else clause.head
+
+def _numeric_twin(value):
+    """Return the other numeric type's equal value (1 for 1.0, 1.0 for 1), or None"""
+    if value.__class__ is int:
+        return float(value)
+    if value.__class__ is float and value.is_integer():
+        return int(value)
+    return None
+
+def index_key(term):
+    """Return the hash key of a constant term, or None if it cannot be indexed"""
+    if isinstance(term, Term):
+        if term.is_variable:
+            return None
+        value = term.value
+    elif isinstance(term, (str, int, float)):
+        value = term
+    else:
+        return None
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+class ArgumentIndex:
+    """Hash index over one argument position of a predicate's clauses
+
+    Clauses are bucketed by the constant at that position. Clauses with a
+    variable there (or anything that is not a hashable constant) live in a
+    shared bucket that every lookup also visits. Entries are (seq, clause)
+    pairs so merged buckets keep clause order.
+    """
+
+    def __init__(self, position, entries=()):
+        self.position = position
+        self.buckets = {}  # {key: [(seq, clause)]}
+        self.unindexed = []  # [(seq, clause)] with a non-constant argument
+        for entry in entries:
+            self.add(entry)
+
+    def _key(self, clause):
+        args = clause_head(clause).args
+        return index_key(args[self.position]) if self.position < len(args) else None
+
+    def add(self, entry, at_front=False):
+        """Index an entry at the end (or the start) of its bucket"""
+        key = self._key(entry[1])
+        bucket = self.unindexed if key is None else self.buckets.setdefault(key, [])
+        if at_front:
+            bucket.insert(0, entry)
+        else:
+            bucket.append(entry)
+
+    def remove(self, clause):
+        """Drop the first indexed occurrence of a clause"""
+        key = self._key(clause)
+        bucket = self.unindexed if key is None else self.buckets.get(key, [])
+        for i, (_, indexed) in enumerate(bucket):
+            if indexed is clause:
+                bucket.pop(i)
+                break
+        if key is not None and not bucket:
+            self.buckets.pop(key, None)
+
+    def count(self, key):
+        """Return how many clauses a lookup of key would visit"""
+        return len(self.buckets.get(key, ())) + len(self.unindexed)
+
+    def lookup(self, key):
+        """Return the clauses that may match a constant key at this position"""
+        bucket = self.buckets.get(key, [])
+        if not self.unindexed:
+            return [clause for _, clause in bucket]
+        if not bucket:
+            return [clause for _, clause in self.unindexed]
+        return [clause for _, clause in heapq.merge(bucket, self.unindexed, key=lambda entry: entry[0])]
+
+    def memory_size(self):
+        """Approximate bytes used by the index structure (not the clauses)"""
+        size = sys.getsizeof(self.buckets) + sys.getsizeof(self.unindexed)
+        for bucket in self.buckets.values():
+            size += sys.getsizeof(bucket)
+        return size
+
+class ClauseIndex:
+    """Argument indexes over the clauses of one predicate
+
+    The first argument is always indexed. Any other position gets a
+    just-in-time index the first time a call binds it, the predicate has at
+    least ``jit_threshold`` clauses and the existing indexes still leave more
+    than that many candidates. Every index is kept up to date on add/remove.
+    """
+
+    def __init__(self, clauses=()):
+        self.entries = []  # [(seq, clause)] in knowledge-base order
+        self.arguments = {0: ArgumentIndex(0)}  # {position: ArgumentIndex}
+        self._front = 0
+        self._back = 0
+        for clause in clauses:
+            self.add(clause)
+
+    def add(self, clause, at_front=False):
+        """Index a clause at the end (or the start) of the predicate"""
+        if at_front:
+            self._front -= 1
+            entry = (self._front, clause)
+            self.entries.insert(0, entry)
+        else:
+            entry = (self._back, clause)
+            self._back += 1
+            self.entries.append(entry)
+        for index in self.arguments.values():
+            index.add(entry, at_front)
+
+    def remove(self, clause):
+        """Drop the first indexed occurrence of a clause"""
+        for i, (_, indexed) in enumerate(self.entries):
+            if indexed is clause:
+                self.entries.pop(i)
+                break
+        for index in self.arguments.values():
+            index.remove(clause)
+
+    def build(self, position):
+        """Build (or return) the index on one argument position"""
+        index = self.arguments.get(position)
+        if index is None:
+            index = self.arguments[position] = ArgumentIndex(position, self.entries)
+        return index
+
+    def select(self, args, jit_threshold):
+        """Return the candidate clauses for a call, or None to scan them all"""
+        bound = []
+        for position, arg in enumerate(args):
+            key = index_key(arg)
+            if key is not None:
+                bound.append((position, key))
+        if not bound:
+            return None
+
+        best = None
+        for position, key in bound:
+            index = self.arguments.get(position)
+            if index is not None:
+                count = index.count(key)
+                if best is None or count < best[0]:
+                    best = (count, index, key)
+
+        if len(self.entries) >= jit_threshold and (best is None or best[0] > jit_threshold):
+            for position, key in bound:
+                if position not in self.arguments:
+                    index = self.build(position)
+                    count = index.count(key)
+                    if best is None or count < best[0]:
+                        best = (count, index, key)
+
+        if best is None:
+            return None
+        return best[1].lookup(best[2])
+
+class ColumnStore:
+    """Array-backed storage for a predicate whose clauses are all ground facts
+
+    Each argument position is an array of atom IDs with one entry per fact,
+    in clause order, so a large relation costs a few bytes per argument
+    instead of a Fact/Predicate/Term object graph. Per-position indexes map
+    an atom ID to the rows holding it and are built on first use. The store
+    behaves like the clause list it replaces: len(), indexing and iteration
+    produce Fact objects.
+    """
+    def __init__(self, name, arity, atoms):
+        self.name = name
+        self.arity = arity
+        self.atoms = atoms  # The engine's AtomTable
+        self.columns = [array('i') for _ in range(arity)]
+        self.indexes = {}  # {position: {atom ID: array of rows}}
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("column store row out of range")
+        return self.fact(row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.fact(row)
+
+    def fact(self, row):
+        """Rebuild the Fact stored at a row"""
+        atoms = self.atoms.atoms
+        return Fact(Predicate(self.name, [atoms[column[row]] for column in self.columns]))
+
+    def row_ids(self, clause):
+        """Return the atom IDs of a ground fact's arguments, or None if it cannot be stored"""
+        if not isinstance(clause, Fact) or len(clause.predicate.args) != self.arity:
+            return None
+        ids = []
+        for arg in clause.predicate.args:
+            if not isinstance(arg, Term) or arg.is_variable:
+                return None
+            try:
+                ids.append(self.atoms.atom(arg.value).atom_id)
+            except TypeError:
+                return None
+        return ids
+
+    def append(self, ids):
+        row = len(self)
+        for column, atom_id in zip(self.columns, ids):
+            column.append(atom_id)
+        for position, index in self.indexes.items():
+            rows = index.get(ids[position])
+            if rows is None:
+                rows = index[ids[position]] = array('i')
+            rows.append(row)
+
+    def extend(self, clauses):
+        """Append many ground facts, interning their constants in one pass
+
+        The per-position indexes are dropped, to be rebuilt on first use.
+        Returns False, appending nothing, if any clause cannot be stored.
+        """
+        atoms = self.atoms
+        atom_ids = atoms.atom_ids
+        arity = self.arity
+        columns = [[] for _ in range(arity)]
+        for clause in clauses:
+            if not isinstance(clause, Fact) or len(clause.predicate.args) != arity:
+                return False
+            for ids, arg in zip(columns, clause.predicate.args):
+                if atoms.owns(arg):
+                    ids.append(arg.atom_id)
+                    continue
+                if not isinstance(arg, Term) or arg.is_variable:
+                    return False
+                value = arg.value
+                try:
+                    atom_id = atom_ids.get((value.__class__, value))
+                except TypeError:
+                    return False
+                ids.append(atoms.atom(value).atom_id if atom_id is None else atom_id)
+        for column, ids in zip(self.columns, columns):
+            column.extend(ids)
+        self.indexes = {}
+        return True
+
+    def insert_front(self, ids):
+        # New arrays rather than shifting rows in place, so scans already
+        # running keep reading the rows they started with
+        self.columns = [array('i', [atom_id]) + column for column, atom_id in zip(self.columns, ids)]
+        self.indexes = {}  # Every row number shifted
+
+    def delete(self, rows):
+        """Remove a collection of rows"""
+        dead = set(rows)
+        self.columns = [array('i', (atom_id for row, atom_id in enumerate(column) if row not in dead))
+                        for column in self.columns]
+        self.indexes = {}
+
+    def goal_ids(self, args):
+        """Map dereferenced goal arguments to atom IDs (None for variables)
+
+        Returns None when a constant argument appears in no stored fact.
+        """
+        ids = []
+        for arg in args:
+            if isinstance(arg, Term):
+                if arg.is_variable:
+                    ids.append(None)
+                    continue
+                arg = arg.value
+            try:
+                atom_id = self.atoms.atom_ids.get((arg.__class__, arg))
+            except TypeError:
+                return None
+            twin = _numeric_twin(arg)
+            if twin is not None and (twin.__class__, twin) in self.atoms.atom_ids:
+                if atom_id is None:
+                    atom_id = self.atoms.atom_ids[(twin.__class__, twin)]
+                else:
+                    ids.append(None)  # Both 1 and 1.0 are stored: unify row by row
+                    continue
+            if atom_id is None:
+                return None
+            ids.append(atom_id)
+        return ids
+
+    def match(self, ids):
+        """Return the rows whose columns hold every non-None atom ID in ids"""
+        bound = [(position, atom_id) for position, atom_id in enumerate(ids) if atom_id is not None]
+        if not bound:
+            return range(len(self))
+        best = None
+        for position, atom_id in bound:
+            rows = self._index(position).get(atom_id, ())
+            if best is None or len(rows) < len(best):
+                best = rows
+        columns = self.columns
+        return [row for row in best
+                if all(columns[position][row] == atom_id for position, atom_id in bound)]
+
+    def solve(self, engine, goal, substitution):
+        """Yield once per stored fact unifying with goal
+
+        Like a clause list, the scan sees the facts stored when it started:
+        delete() and insert_front() replace the column arrays instead of
+        changing them, and rows appended later are past the matched rows.
+        """
+        if len(goal.args) != self.arity:
+            return
+        args = [engine._deref(arg, substitution) for arg in goal.args]
+        ids = self.goal_ids(args)
+        if ids is None:
+            return
+        columns = self.columns
+        rows = self.match(ids)
+        free = [(columns[position], arg) for position, arg in enumerate(args)
+                if ids[position] is None]
+        atoms = self.atoms.atoms
+
+        mark = substitution.mark()
+        for row in rows:
+            for column, arg in free:
+                if engine._unify(arg, atoms[column[row]], substitution) is None:
+                    break
+            else:
+                yield substitution
+            substitution.undo(mark)
+
+    def _index(self, position):
+        index = self.indexes.get(position)
+        if index is None:
+            index = self.indexes[position] = {}
+            for row, atom_id in enumerate(self.columns[position]):
+                rows = index.get(atom_id)
+                if rows is None:
+                    rows = index[atom_id] = array('i')
+                rows.append(row)
+        return index
+
+    def memory_size(self):
+        """Approximate bytes used by the columns and indexes"""
+        size = sum(column.buffer_info()[1] * column.itemsize for column in self.columns)
+        return size + sum(self.index_size(position) for position in self.indexes)
+
+    def index_size(self, position):
+        """Approximate bytes used by the index on one argument position"""
+        index = self.indexes.get(position, {})
+        return sys.getsizeof(index) + sum(rows.buffer_info()[1] * rows.itemsize for rows in index.values())
+
+class _Slot:
+    """Template placeholder for the variable stored in one frame slot"""
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+
+class _Compound:
+    """Template node for a term that contains variables"""
+    __slots__ = ('build', 'parts')
+
+    def __init__(self, build, parts):
+        self.build = build  # Callable taking the instantiated parts
+        self.parts = parts
+
+def _instantiate(node, frame):
+    """Build a term from a template node and a frame of fresh variables"""
+    if isinstance(node, _Slot):
+        return frame[node.index]
+    if isinstance(node, _Compound):
+        return node.build([_instantiate(part, frame) for part in node.parts])
+    return node
+
+# Kinds of body goal, decided once when a clause is compiled
+_CALL, _CUT, _IS, _COMPARE, _BUILTIN = range(5)
+
+def goal_kind(goal):
+    """Classify a goal for the solver's dispatch"""
+    from .ast_nodes import Cut, IsExpression
+
+    if isinstance(goal, Cut):
+        return _CUT
+    if isinstance(goal, IsExpression):
+        return _IS
+    if isinstance(goal, Predicate):
+        if goal.name.startswith('_compare_'):
+            return _COMPARE
+        if (len(goal.args) == 3 and goal.name in ('findall', 'bagof', 'setof', 'aggregate_all')) \
+                or (len(goal.args) == 1 and goal.name == 'not'):
+            return _BUILTIN
+    return _CALL
+
+class ClauseTemplate:
+    """A rule compiled once into variable slots, for cheap renaming
+
+    Every distinct variable of the rule gets a slot. instantiate() allocates
+    one fresh variable per slot and rebuilds only the parts of the head and
+    body that contain variables; ground sub-terms are shared between copies.
+
+    The solver uses the compiled form directly: match_head() runs one
+    closure per head argument, binding a variable's first occurrence to the
+    goal argument itself instead of creating and unifying a fresh variable,
+    and body_cells() builds the body goals tagged with their goal kind.
+    """
+
+    def __init__(self, rule):
+        self.slots = {}  # {var_name: slot index}
+        self.head = self._compile(rule.head)
+        self.body = [self._compile(goal) for goal in rule.body]
+        self.var_names = list(self.slots)
+
+        seen = set()
+        self.head_args = self.head.parts if isinstance(self.head, _Compound) else rule.head.args
+        self.arity = len(self.head_args)
+        self.head_matchers = [self._head_matcher(node, seen) for node in self.head_args]
+        self.body_only = [index for index in range(len(self.var_names)) if index not in seen]
+        self.body_steps = [(goal_kind(goal), node) for goal, node in zip(rule.body, self.body)]
+
+        # Used by the QueryPlanner
+        self.goals = list(rule.body)
+        self.goal_names = [goal.name if isinstance(goal, Predicate) else None for goal in self.goals]
+        self.call_names = sorted({name for (kind, _), name in zip(self.body_steps, self.goal_names)
+                                  if kind == _CALL and name is not None})
+        self.plans = {}  # {bound head arguments: (generations of call_names, body steps)}
+
+    def _slot(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+        return _Slot(self.slots[name])
+
+    def _compound(self, build, parts):
+        """Return a compound node, or the ground term itself if no part has variables"""
+        compiled = [self._compile(part) for part in parts]
+        if any(isinstance(part, (_Slot, _Compound)) for part in compiled):
+            return _Compound(build, compiled)
+        return None
+
+    def _compile(self, term):
+        from .ast_nodes import IsExpression, BinaryOp, UnaryOp, Variable
+
+        if isinstance(term, Term):
+            return self._slot(term.value) if term.is_variable else term
+        if isinstance(term, Variable) and term.name.startswith('?'):
+            return self._slot(term.name[1:])
+
+        node = None
+        if isinstance(term, Predicate):
+            name = term.name
+            node = self._compound(lambda args: Predicate(name, args), term.args)
+        elif isinstance(term, list):
+            node = self._compound(list, term)
+        elif _list_pattern(term) is not None:
+            term = _list_pattern(term)
+            node = self._compound(lambda parts: PartialList(parts[0], parts[1]), [term.head, term.tail])
+        elif isinstance(term, IsExpression):
+            node = self._compound(lambda parts: IsExpression(parts[0], parts[1]),
+                                  [term.variable, term.expression])
+        elif isinstance(term, BinaryOp):
+            op = term.operator
+            node = self._compound(lambda parts: BinaryOp(op, parts[0], parts[1]),
+                                  [term.left, term.right])
+        elif isinstance(term, UnaryOp):
+            op = term.operator
+            node = self._compound(lambda parts: UnaryOp(op, parts[0]), [term.operand])
+        return term if node is None else node
+
+    def _head_matcher(self, node, seen):
+        """Return a closure matching one goal argument against a head argument"""
+        if isinstance(node, _Slot):
+            index = node.index
+            if index in seen:
+                def match(engine, arg, frame, suffix, substitution):
+                    return engine._unify(arg, frame[index], substitution) is not None
+                return match
+            seen.add(index)
+
+            def bind(engine, arg, frame, suffix, substitution):
+                frame[index] = arg  # First occurrence: alias the goal's argument
+                return True
+            return bind
+
+        if isinstance(node, _Compound):
+            fresh = [index for index in self._node_slots(node) if index not in seen]
+            seen.update(fresh)
+            names = self.var_names
+
+            def match_compound(engine, arg, frame, suffix, substitution):
+                for index in fresh:
+                    frame[index] = Term(f"{names[index]}#{suffix}", is_variable=True)
+                return engine._unify(arg, _instantiate(node, frame), substitution) is not None
+            return match_compound
+
+        def match_constant(engine, arg, frame, suffix, substitution):
+            return engine._unify(arg, node, substitution) is not None
+        return match_constant
+
+    def _node_slots(self, node):
+        """Return the slot indexes used in a template node, in order"""
+        if isinstance(node, _Slot):
+            return [node.index]
+        indexes = []
+        if isinstance(node, _Compound):
+            for part in node.parts:
+                indexes.extend(index for index in self._node_slots(part) if index not in indexes)
+        return indexes
+
+    def match_head(self, engine, goal, substitution):
+        """Unify goal with the rule head; return the variable frame, or None on failure"""
+        if len(goal.args) != self.arity:
+            return None
+        frame = [None] * len(self.var_names)
+        suffix = next(engine._fresh_ids)
+        for match, arg in zip(self.head_matchers, goal.args):
+            if not match(engine, arg, frame, suffix, substitution):
+                return None
+        names = self.var_names
+        for index in self.body_only:
+            frame[index] = Term(f"{names[index]}#{suffix}", is_variable=True)
+        return frame
+
+    def body_cells(self, frame, depth, barrier, rest, steps=None):
+        """Prepend the instantiated body goals (in steps order if given) to a solver continuation"""
+        for kind, node in reversed(self.body_steps if steps is None else steps):
+            rest = (kind, _instantiate(node, frame), depth, barrier, rest)
+        return rest
+
+    def instantiate(self, suffix):
+        """Return a copy of the rule whose variables are renamed with suffix"""
+        frame = [Term(f"{name}#{suffix}", is_variable=True) for name in self.var_names]
+        return Rule(_instantiate(self.head, frame), [_instantiate(goal, frame) for goal in self.body])
+
+def variant_key(term):
+    """Return a hashable key that is equal for terms differing only in variable names"""
+    numbering = {}
+
+    def key(t):
+        if isinstance(t, Term):
+            if t.is_variable:
+                return ('$VAR', numbering.setdefault(t.value, len(numbering)))
+            return ('$TERM', t.value.__class__, t.value)  # 1, 1.0 and True are different terms
+        if isinstance(t, Predicate):
+            return (t.name, tuple(key(arg) for arg in t.args))
+        if isinstance(t, (list, tuple, ListView)):
+            return ('$LIST', tuple(key(item) for item in t))
+        pattern = _list_pattern(t)
+        if pattern is not None:
+            return ('$PATTERN', key(pattern.head), key(pattern.tail))
+        try:
+            hash(t)
+            return (t.__class__, t)
+        except TypeError:
+            return ('$REPR', repr(t))
+
+    return key(term)
+
+def standard_order_key(term):
+    """Return a sort key giving terms a total standard order
+
+    Variables < numbers < atoms and strings < compound terms (predicates
+    and lists). Numbers compare by value, with a float before an equal int;
+    compound terms compare by arity, then name, then arguments left to
+    right. A list compares as the compound '.'(Head, Tail).
+    """
+    if isinstance(term, Term):
+        if term.is_variable:
+            return (0, str(term.value))
+        term = term.value
+    if term.__class__ is bool:
+        return (3, str(term))
+    if isinstance(term, (int, float)):
+        return (1, term, 0 if isinstance(term, float) else 1)
+    if isinstance(term, str):
+        return (3, term)
+    if isinstance(term, Predicate):
+        return (4, len(term.args), term.name, tuple(standard_order_key(arg) for arg in term.args))
+    if isinstance(term, (list, tuple, ListView)):
+        key = (3, '[]')
+        for item in reversed(list(term)):
+            key = (4, 2, '.', (standard_order_key(item), key))
+        return key
+    pattern = _list_pattern(term)
+    if pattern is not None:
+        key = standard_order_key(pattern.tail)
+        for item in reversed(pattern.head):
+            key = (4, 2, '.', (standard_order_key(item), key))
+        return key
+    return (5, type(term).__name__, repr(term))
+
+class _Aggregator:
+    """Running state of one aggregate_all/3 group"""
+    __slots__ = ('kind', 'count', 'total', 'items')
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.count = 0
+        self.total = None  # Sum, or current max/min value
+        self.items = [] if kind == 'bag' else {}  # bag values, or {order key: value} for set
+
+    def add(self, value):
+        self.count += 1
+        kind = self.kind
+        if kind in ('sum', 'avg'):
+            self.total = value if self.total is None else self.total + value
+        elif kind == 'max':
+            if self.total is None or standard_order_key(value) > standard_order_key(self.total):
+                self.total = value
+        elif kind == 'min':
+            if self.total is None or standard_order_key(value) < standard_order_key(self.total):
+                self.total = value
+        elif kind == 'bag':
+            self.items.append(value)
+        elif kind == 'set':
+            self.items.setdefault(standard_order_key(value), value)
+
+    def result(self):
+        """Return the aggregate value, or None if it is undefined (max of nothing)"""
+        kind = self.kind
+        if kind == 'count':
+            return self.count
+        if kind == 'sum':
+            return 0 if self.total is None else self.total
+        if kind == 'avg':
+            return None if not self.count else self.total / self.count
+        if kind == 'set':
+            return [self.items[key] for key in sorted(self.items)]
+        if kind == 'bag':
+            return self.items
+        return self.total
+
+class AnswerTable:
+    """The answers found so far for one tabled call variant"""
+    def __init__(self, goal):
+        self.goal = goal  # The call, resolved against the caller's bindings
+        self.answers = []  # [(answer, ClauseTemplate or None)] in discovery order
+        self.keys = set()  # Variant keys of the answers, for duplicate checks
+        self.complete = False
+
+    def add(self, answer):
+        """Record an answer; return False if a variant of it is already known"""
+        key = variant_key(answer)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        # Answers with variables are renamed apart each time they are returned
+        template = ClauseTemplate(Rule(answer, [])) if _has_variables(answer) else None
+        self.answers.append((answer, template))
+        return True
+
+def _copy_lists(value):
+    """Return value with every list in it (also in open lists) copied"""
+    if isinstance(value, list):
+        return [_copy_lists(item) for item in value]
+    if isinstance(value, PartialList):
+        return PartialList(_copy_lists(value.head), _copy_lists(value.tail))
+    return value
+
+def _has_variables(term):
+    """Check whether a resolved term still contains logical variables"""
+    if isinstance(term, Term):
+        return term.is_variable
+    if isinstance(term, Predicate):
+        return any(_has_variables(arg) for arg in term.args)
+    if isinstance(term, (list, tuple, ListView)):
+        return any(_has_variables(item) for item in term)
+    pattern = _list_pattern(term)
+    if pattern is not None:
+        return _has_variables(pattern.head) or _has_variables(pattern.tail)
+    return False
+
+class QueryCache:
+    """An LRU cache of query answers, keyed by goal variant
+
+    Each entry records the generation of every predicate the goal depends
+    on; it is served only while all of them are unchanged.
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity  # Max entries (0 disables caching)
+        self.entries = OrderedDict()  # {variant key: (versions, answers)}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, generations):
+        """Return the cached answers for key, or None if missing or stale"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            versions, answers = entry
+            if all(generations.get(name, 0) == version for name, version in versions):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return answers
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, versions, answers):
+        """Store answers, evicting the least recently used entries beyond capacity"""
+        if self.capacity <= 0:
+            return
+        self.entries[key] = (versions, answers)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        self.entries.clear()
+
+    def stats(self):
+        """Return the hit, miss and eviction counters with the current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'capacity': self.capacity,
+        }
+
+_UNBOUND = object()  # Cached answer slot of a variable left unbound
+
+class ResolutionLimitError(RuntimeError):
+    """Raised when a query exceeds the engine's depth or step budget"""
+    pass
+
+class _ChoicePoint:
+    """Remaining alternatives for one goal, and the state to restore before each"""
+    __slots__ = ('mark', 'goal', 'clauses', 'next_clause', 'alternatives', 'depth', 'rest')
+
+    def __init__(self, mark, goal, clauses, alternatives, depth, rest):
+        self.mark = mark  # Trail height to undo to
+        self.goal = goal
+        self.clauses = clauses  # Candidate clauses, or None for a built-in
+        self.next_clause = 0
+        self.alternatives = alternatives  # Iterator of bodies for a built-in
+        self.depth = depth
+        self.rest = rest  # Continuation after the goal
+
+_NO_MORE = object()  # Continuation marker: every choice point is exhausted
+
+def _batches(items, size):
+    """Yield lists of up to size consecutive items"""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _source_clauses(path, chunk_lines, encoding='utf-8'):
+    """Yield the Facts and Rules of a Bayan source file, parsing it in chunks of lines
+
+    A chunk is cut after at least chunk_lines lines, at the first line
+    whose tokens end with the '.' closing a clause, so comments and
+    strings ending in '.' never split a clause.
+    """
+    from .lexer import HybridLexer, TokenType
+    from .parser import HybridParser
+
+    opening = (TokenType.LPAREN, TokenType.LBRACKET, TokenType.LBRACE)
+    closing = (TokenType.RPAREN, TokenType.RBRACKET, TokenType.RBRACE)
+
+    def complete(text):
+        # The tokens of text if it ends at the end of a clause, else None
+        try:
+            tokens = HybridLexer(text).tokenize()
+        except SyntaxError:
+            return None  # A string opened here may close on a later line
+        depth = 0
+        for token in tokens:
+            if token.type in opening:
+                depth += 1
+            elif token.type in closing:
+                depth -= 1
+        if depth == 0 and len(tokens) > 1 and tokens[-2].type == TokenType.DOT:
+            return tokens
+        return None
+
+    def parse(tokens):
+        parser = HybridParser(tokens)
+        while parser.current_token and parser.current_token.type != TokenType.EOF:
+            if parser.match(TokenType.RULE) or parser.is_logical_rule():
+                node = parser.parse_rule()
+                yield Rule(node.head, node.body)
+            elif parser.match(TokenType.FACT) or parser.is_logical_fact():
+                yield Fact(parser.parse_fact().predicate)
+            else:
+                raise SyntaxError(f"Expected a fact or rule in {path}, got {parser.current_token}")
+
+    with open(path, encoding=encoding) as handle:
+        pending = []
+        for line in handle:
+            pending.append(line)
+            text = line.strip()
+            if len(pending) >= chunk_lines and text.endswith('.') and not text.startswith('#'):
+                tokens = complete(''.join(pending))
+                if tokens is not None:
+                    yield from parse(tokens)
+                    pending = []
+        if pending:
+            yield from parse(HybridLexer(''.join(pending)).tokenize())
+
 class LogicalEngine:
     """The logical inference engine"""
-    
+
     def __init__(self):
         self.knowledge_base = {}  # {predicate_name: [facts/rules]}
+        self.indexes = {}  # {predicate_name: ClauseIndex}
+        self.jit_index_threshold = 16  # min clauses before indexing other arguments
         self.call_stack = []
-        self.max_depth = 1000
-    
+        self.max_depth = 1000000  # Max nesting of clause expansions (None disables)
+        self.max_steps = None  # Max inference steps per query (None disables)
+        self.steps = 0  # Inference steps taken by the current query
+        self._fresh_ids = itertools.count(1)  # Suffixes for renamed rule variables
+        self.tabled = set()  # {(predicate_name, arity)} resolved with answer tables
+        self.tables = {}  # {variant key: AnswerTable}
+        self._table_active = set()  # Variant keys of tables being evaluated
+        self._table_session = []  # Incomplete tables of the current leader evaluation
+        self._table_answer_count = 0  # Answers added to any table, to detect fixpoints
+        self.model = None  # MaterializedModel answering queries bottom-up, if any
+        self.generations = {}  # {predicate_name: count of changes to its clauses}
+        self.query_cache = QueryCache()
+        self.atoms = AtomTable()  # Interned constants of stored clauses and queries
+        self.columnar_threshold = 1024  # Ground facts before a predicate moves to a ColumnStore (None disables)
+        self._row_storage = set()  # Predicates with rules or non-ground facts, never columnar
+        self.planner = None  # QueryPlanner reordering rule bodies, see enable_planner()
+        self.builtins = {}  # {(name, arity): native predicate}, used unless the program defines name
+
+        from .builtins import LogicalBuiltins
+        LogicalBuiltins.register(self)
+
     def add_fact(self, fact):
         """Add a fact to the knowledge base"""
-        pred_name = fact.predicate.name
-        if pred_name not in self.knowledge_base:
-            self.knowledge_base[pred_name] = []
-        self.knowledge_base[pred_name].append(fact)
-    
+        self._store_clause(fact.predicate.name, fact)
+
     def add_rule(self, rule):
         """Add a rule to the knowledge base"""
-        pred_name = rule.head.name
+        self._store_clause(rule.head.name, rule)
+
+    def _store_clause(self, pred_name, clause, at_front=False):
+        """Insert a clause into the knowledge base and its argument indexes"""
+        clauses = self.knowledge_base.get(pred_name)
+        if isinstance(clauses, ColumnStore):
+            ids = clauses.row_ids(clause)
+            if ids is not None:
+                if at_front:
+                    clauses.insert_front(ids)
+                else:
+                    clauses.append(ids)
+                self._clauses_changed(pred_name, added=[clause])
+                return
+            self._use_rows(pred_name)
+
+        self._intern_clause(clause)
         if pred_name not in self.knowledge_base:
             self.knowledge_base[pred_name] = []
-        self.knowledge_base[pred_name].append(rule)
+            self.indexes[pred_name] = ClauseIndex()
+        if at_front:
+            self.knowledge_base[pred_name].insert(0, clause)
+        else:
+            self.knowledge_base[pred_name].append(clause)
+        self.indexes[pred_name].add(clause, at_front)
+
+        if isinstance(clause, Rule):
+            self._compiled(clause)
+            self._row_storage.add(pred_name)
+        elif _has_variables(clause.predicate):
+            self._row_storage.add(pred_name)
+        elif self.columnar_threshold is not None and pred_name not in self._row_storage \
+                and len(self.knowledge_base[pred_name]) >= self.columnar_threshold:
+            self.use_columns(pred_name)
+        self._clauses_changed(pred_name, added=[clause])
+
+    def use_columns(self, pred_name):
+        """Move a predicate whose clauses are all ground facts into a ColumnStore
+
+        Returns False, and keeps the clause list, if any clause is a rule or
+        has variables or arguments that cannot be interned.
+        """
+        clauses = self.knowledge_base.get(pred_name)
+        if isinstance(clauses, ColumnStore):
+            return True
+        if not clauses or not isinstance(clauses[0], Fact) or not clauses[0].predicate.args:
+            self._row_storage.add(pred_name)
+            return False
+
+        store = ColumnStore(pred_name, len(clauses[0].predicate.args), self.atoms)
+        rows = []
+        for clause in clauses:
+            ids = store.row_ids(clause)
+            if ids is None:
+                self._row_storage.add(pred_name)
+                return False
+            rows.append(ids)
+        for ids in rows:
+            store.append(ids)
+            # The store replaces the shared Predicate objects
+            self.atoms.predicates.pop((pred_name, tuple(ids)), None)
+
+        self.knowledge_base[pred_name] = store
+        self.indexes.pop(pred_name, None)
+        return True
+
+    def _use_rows(self, pred_name):
+        """Move a predicate from its ColumnStore back to a clause list"""
+        clauses = list(self.knowledge_base[pred_name])
+        self.knowledge_base[pred_name] = clauses
+        self.indexes[pred_name] = ClauseIndex(clauses)
+        self._row_storage.add(pred_name)
+
+    def _intern_clause(self, clause):
+        """Intern the constants of a clause in place, sharing its ground predicates"""
+        if isinstance(clause, Fact):
+            clause.predicate = self.atoms.intern(clause.predicate)
+        elif clause._template is None:
+            # A compiled template already refers to the rule's current terms
+            clause.head = self.atoms.intern(clause.head)
+            clause.body = [self.atoms.intern(goal) if isinstance(goal, Predicate) else goal
+                           for goal in clause.body]
+
+    def _clauses_for(self, goal, substitution=None):
+        """Return a snapshot of the clauses that may match a goal, in knowledge-base order"""
+        clauses = self.knowledge_base.get(goal.name)
+        if not clauses or not goal.args:
+            return list(clauses or [])
+        args = goal.args
+        if substitution is not None:
+            args = [self._deref(arg, substitution) for arg in args]
+        if isinstance(clauses, ColumnStore):
+            ids = clauses.goal_ids(args) if len(args) == clauses.arity else None
+            return [] if ids is None else [clauses.fact(row) for row in clauses.match(ids)]
+        candidates = self._index_for(goal.name).select(args, self.jit_index_threshold)
+        return list(clauses) if candidates is None else candidates
+
+    def _index_for(self, pred_name):
+        """Return the clause index of a predicate, building it if missing"""
+        index = self.indexes.get(pred_name)
+        if index is None:
+            index = self.indexes[pred_name] = ClauseIndex(self.knowledge_base.get(pred_name, []))
+        return index
+
+    def list_indexes(self):
+        """Describe every argument index: predicate, position, keys, clauses and bytes"""
+        info = []
+        for pred_name, clause_index in self.indexes.items():
+            for position, index in sorted(clause_index.arguments.items()):
+                info.append({
+                    'predicate': pred_name,
+                    'position': position,
+                    'keys': len(index.buckets),
+                    'clauses': len(clause_index.entries),
+                    'bytes': index.memory_size(),
+                })
+        for pred_name, clauses in self.knowledge_base.items():
+            if isinstance(clauses, ColumnStore):
+                for position, index in sorted(clauses.indexes.items()):
+                    info.append({
+                        'predicate': pred_name,
+                        'position': position,
+                        'keys': len(index),
+                        'clauses': len(clauses),
+                        'bytes': clauses.index_size(position),
+                    })
+        return info
 
     def assertz(self, fact_or_rule):
         """Add a fact or rule at the end of the knowledge base (Prolog assertz)"""
@@ -109,34 +1288,138 @@ class LogicalEngine:
     def asserta(self, fact_or_rule):
         """Add a fact or rule at the beginning of the knowledge base (Prolog asserta)"""
         if isinstance(fact_or_rule, Fact):
-            pred_name = fact_or_rule.predicate.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
+            self._store_clause(fact_or_rule.predicate.name, fact_or_rule, at_front=True)
         elif isinstance(fact_or_rule, Rule):
-            pred_name = fact_or_rule.head.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
+            self._store_clause(fact_or_rule.head.name, fact_or_rule, at_front=True)
         else:
             raise TypeError("asserta requires a Fact or Rule")
 
+    def bulk_load(self, clauses, batch_size=10000):
+        """Add many facts (and rules) at once, in order; return a load report
+
+        Clauses are appended a batch at a time, grouped by predicate.
+        Argument indexes are not maintained while loading: each touched
+        predicate gets its clause index rebuilt once at the end (column
+        stores build theirs on first use), and caches, tables and the
+        materialized model are updated once per predicate. Ground facts
+        for a predicate that is new or already columnar go straight into
+        its ColumnStore without building Fact objects' shared predicates.
+
+        The report is a dict with 'facts', 'rules', 'predicates',
+        'seconds' and 'facts_per_second'.
+        """
+        started = time.perf_counter()
+        added = {}  # {pred_name: [clauses]}, kept only for the materialized model
+        counts = {'facts': 0, 'rules': 0}
+        try:
+            for batch in _batches(clauses, batch_size):
+                groups = {}
+                for clause in batch:
+                    if isinstance(clause, Fact):
+                        counts['facts'] += 1
+                        groups.setdefault(clause.predicate.name, []).append(clause)
+                    elif isinstance(clause, Rule):
+                        counts['rules'] += 1
+                        groups.setdefault(clause.head.name, []).append(clause)
+                    else:
+                        raise TypeError("bulk_load requires Fact or Rule objects")
+                for pred_name, group in groups.items():
+                    self._append_batch(pred_name, group)
+                    touched = added.setdefault(pred_name, [])
+                    if self.model is not None:
+                        touched.extend(group)
+        finally:
+            for pred_name, group in added.items():
+                if not isinstance(self.knowledge_base.get(pred_name), ColumnStore):
+                    self.indexes[pred_name] = ClauseIndex(self.knowledge_base[pred_name])
+                self._clauses_changed(pred_name, added=group)
+
+        seconds = time.perf_counter() - started
+        return {
+            'facts': counts['facts'],
+            'rules': counts['rules'],
+            'predicates': len(added),
+            'seconds': seconds,
+            'facts_per_second': counts['facts'] / seconds if seconds > 0 else float('inf'),
+        }
+
+    def _append_batch(self, pred_name, group):
+        """Append one predicate's clauses from a bulk_load batch, without indexing them"""
+        clauses = self.knowledge_base.get(pred_name)
+        if not clauses and pred_name not in self._row_storage and self.columnar_threshold is not None \
+                and len(group) >= self.columnar_threshold and isinstance(group[0], Fact) and group[0].predicate.args:
+            clauses = ColumnStore(pred_name, len(group[0].predicate.args), self.atoms)
+        if isinstance(clauses, ColumnStore):
+            if clauses.extend(group):
+                self.knowledge_base[pred_name] = clauses
+                return
+            if len(clauses):
+                self._use_rows(pred_name)
+            else:
+                self.knowledge_base.pop(pred_name, None)
+
+        clauses = self.knowledge_base.setdefault(pred_name, [])
+        self.indexes.pop(pred_name, None)  # Rebuilt once the load finishes
+        for clause in group:
+            self._intern_clause(clause)
+            if isinstance(clause, Rule):
+                self._compiled(clause)
+                self._row_storage.add(pred_name)
+            elif _has_variables(clause.predicate):
+                self._row_storage.add(pred_name)
+        clauses.extend(group)
+        if self.columnar_threshold is not None and pred_name not in self._row_storage \
+                and len(clauses) >= self.columnar_threshold:
+            self.use_columns(pred_name)
+
+    def load_facts_file(self, path, batch_size=10000, encoding='utf-8', chunk_lines=1000):
+        """Bulk-load the facts and rules of a Bayan source file; return the load report
+
+        The file is read and parsed about chunk_lines lines at a time, so
+        only one chunk's tokens are in memory. It may hold facts, rules and
+        comments only, as written at the top level of a .by knowledge base.
+        """
+        report = self.bulk_load(_source_clauses(path, chunk_lines, encoding), batch_size)
+        report['path'] = path
+        return report
+
+    def ingest_file(self, path, predicate, columns=None, format=None, header=True, numeric=True,
+                    batch_size=10000, encoding='utf-8'):
+        """Stream a CSV, TSV or JSONL file into facts of predicate; return the load report
+
+        Each record becomes one fact whose arguments are the chosen columns
+        (see fact_ingest.read_facts). The file is read lazily and handed to
+        bulk_load a batch at a time, so it never has to fit in memory.
+        """
+        from .fact_ingest import read_facts
+
+        facts = read_facts(path, predicate, columns, format, header, numeric, encoding)
+        report = self.bulk_load(facts, batch_size)
+        report['path'] = path
+        return report
+
     def retract(self, predicate):
         """Remove the first matching fact or rule from the knowledge base (Prolog retract)"""
         pred_name = predicate.name
         if pred_name not in self.knowledge_base:
             return False
 
+        clauses = self.knowledge_base[pred_name]
+        if isinstance(clauses, ColumnStore):
+            for row in self._column_rows(clauses, predicate):
+                fact = clauses.fact(row)
+                clauses.delete([row])
+                self._clauses_changed(pred_name, removed=[fact])
+                return True
+            return False
+
         # Find and remove first matching fact/rule
-        for i, item in enumerate(self.knowledge_base[pred_name]):
-            if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
-            elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
+        for item in self._clauses_for(predicate):
+            if self._unify(clause_head(item), predicate, Substitution()) is not None:
+                self.knowledge_base[pred_name].remove(item)
+                self._index_for(pred_name).remove(item)
+                self._clauses_changed(pred_name, removed=[item])
+                return True
         return False
 
     def retractall(self, predicate):
@@ -145,189 +1428,538 @@ class LogicalEngine:
         if pred_name not in self.knowledge_base:
             return 0
 
+        clauses = self.knowledge_base[pred_name]
+        if isinstance(clauses, ColumnStore):
+            rows = list(self._column_rows(clauses, predicate))
+            if rows:
+                removed = [clauses.fact(row) for row in rows]
+                clauses.delete(rows)
+                self._clauses_changed(pred_name, removed=removed)
+            return len(rows)
+
         # Find and remove all matching facts/rules
-        count = 0
         items_to_keep = []
+        removed = []
         for item in self.knowledge_base[pred_name]:
-            if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is None:
-                    items_to_keep.append(item)
-                else:
-                    count += 1
-            elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is None:
-                    items_to_keep.append(item)
-                else:
-                    count += 1
+            if self._unify(clause_head(item), predicate, Substitution()) is None:
+                items_to_keep.append(item)
+            else:
+                removed.append(item)
+
+        if removed:
+            self.knowledge_base[pred_name] = items_to_keep
+            self.indexes[pred_name] = ClauseIndex(items_to_keep)
+            self._clauses_changed(pred_name, removed=removed)
+        return len(removed)
+
+    def _column_rows(self, store, predicate):
+        """Yield the rows of a ColumnStore whose fact unifies with predicate"""
+        ids = store.goal_ids(predicate.args) if len(predicate.args) == store.arity else None
+        if ids is None:
+            return
+        for row in store.match(ids):
+            if self._unify(store.fact(row).predicate, predicate, Substitution()) is not None:
+                yield row
+
+    def table(self, pred_name, arity):
+        """Resolve pred_name/arity with answer tables (tabling)
+
+        Each call variant of a tabled predicate is evaluated to a fixpoint
+        once and its answers are stored, so left-recursive and cyclic rules
+        terminate. Completed tables are reused by later queries until a
+        clause of a predicate they depend on is asserted or retracted.
+        """
+        self.tabled.add((pred_name, arity))
+        self.abolish_tables(pred_name)
+
+    def abolish_tables(self, pred_name=None):
+        """Drop the answer tables of one predicate, or all of them"""
+        for key, table in list(self.tables.items()):
+            if table.complete and pred_name in (None, table.goal.name):
+                del self.tables[key]
+
+    def materialize(self):
+        """Compute every predicate bottom-up and answer later queries from the result
+
+        Returns the MaterializedModel. Asserting or retracting ground facts
+        updates it incrementally; any other change to the clauses discards
+        it, after which queries run top-down again until materialize() is
+        called anew.
+        """
+        from .datalog_engine import DatalogEvaluator
 
-        self.knowledge_base[pred_name] = items_to_keep
-        return count
+        self.model = DatalogEvaluator(self).run()
+        return self.model
+
+    def enable_planner(self, enabled=True):
+        """Turn selectivity-based reordering of rule bodies on or off
+
+        With the planner on, consecutive body goals on fact-only predicates
+        are evaluated most selective first, using cardinality and distinct
+        value statistics kept per predicate. Answers are the same, but may
+        come in a different order.
+        """
+        from .query_planner import QueryPlanner
+
+        self.planner = QueryPlanner(self) if enabled else None
+        return self.planner
+
+    def predicate_stats(self, pred_name):
+        """Return the planner's PredicateStats for a fact-only predicate, or None"""
+        from .query_planner import QueryPlanner
+
+        planner = self.planner or QueryPlanner(self)
+        return planner.predicate_stats(pred_name)
+
+    def _clauses_changed(self, pred_name, added=(), removed=()):
+        """Update or drop the derived data made stale by a change to pred_name's clauses"""
+        self.generations[pred_name] = self.generations.get(pred_name, 0) + 1
+        for clause in removed:
+            if isinstance(clause, Rule):
+                clause._template = None  # Drop the compiled form of a retracted rule
+        if self.model is not None:
+            try:
+                current = self.model.update(added, removed)
+            except Exception:
+                # A failed update leaves the model half changed; queries go top-down instead
+                current = False
+            if not current:
+                self.model = None
+        if self.planner is not None:
+            self.planner.clauses_changed(pred_name, added, removed)
+        self._invalidate_tables(pred_name)
+
+    def _invalidate_tables(self, pred_name):
+        """Drop the completed tables whose predicate depends on pred_name"""
+        if not self.tables:
+            return
+        dependencies = {}
+        for key, table in list(self.tables.items()):
+            name = table.goal.name
+            if name not in dependencies:
+                dependencies[name] = self._dependencies(name)
+            if table.complete and pred_name in dependencies[name]:
+                del self.tables[key]
+
+    def _dependencies(self, pred_name):
+        """Return the names of the predicates pred_name may call, itself included"""
+        seen = {pred_name}
+        pending = [pred_name]
+        while pending:
+            clauses = self.knowledge_base.get(pending.pop(), ())
+            if isinstance(clauses, ColumnStore):
+                continue  # Facts only
+            for clause in clauses:
+                if not isinstance(clause, Rule):
+                    continue
+                terms = list(clause.body)
+                while terms:
+                    term = terms.pop()
+                    if isinstance(term, Predicate):
+                        if term.name not in seen:
+                            seen.add(term.name)
+                            pending.append(term.name)
+                        # Goals passed to not/findall/... are calls too
+                        terms.extend(term.args)
+                    elif isinstance(term, (list, tuple)):
+                        terms.extend(term)
+        return seen
 
     def query(self, goal, substitution=None):
-        """Execute a query and return all solutions"""
+        """Execute a query and return all solutions
+
+        Queries made without bindings are answered from query_cache when a
+        variant of the goal was solved before and none of the predicates it
+        depends on has changed since.
+        """
+        if (substitution is not None and substitution.bindings) or self.query_cache.capacity <= 0:
+            return list(self.solve_iter(goal, substitution))
+
+        names = self._term_variables(goal)
+        key = variant_key(goal)
+        answers = self.query_cache.get(key, self.generations)
+        if answers is None:
+            versions = tuple((name, self.generations.get(name, 0))
+                             for name in self._goal_dependencies(goal))
+            answers = [tuple(solution.bindings.get(name, _UNBOUND) for name in names)
+                       for solution in self.solve_iter(goal, substitution)]
+            self.query_cache.put(key, versions, answers)
+
+        # Variants list their variables in the same order, so answers map by position.
+        # Lists are copied so a caller changing its answer cannot change the cache.
+        return [Substitution({name: _copy_lists(value) for name, value in zip(names, answer) if value is not _UNBOUND})
+                for answer in answers]
+
+    def cache_stats(self):
+        """Return the query cache's hit, miss and eviction counters"""
+        return self.query_cache.stats()
+
+    def _goal_dependencies(self, goal):
+        """Return the names of every predicate a goal may call"""
+        names = set()
+        terms = [goal]
+        while terms:
+            term = terms.pop()
+            if isinstance(term, Predicate):
+                names.add(term.name)
+                terms.extend(term.args)
+            elif isinstance(term, (list, tuple)):
+                terms.extend(term)
+
+        dependencies = set()
+        for name in names:
+            if name not in dependencies:
+                dependencies |= self._dependencies(name)
+        return dependencies
+
+    def solve_iter(self, goal, substitution=None):
+        """Execute a query and yield its solutions one at a time
+
+        Each solution is an independent Substitution holding the resolved
+        values of the query's variables (and of any variables bound in the
+        substitution passed in). The substitution passed in is not changed,
+        even if the caller stops early or the query raises.
+        """
         if substitution is None:
             substitution = Substitution()
-        
-        if len(self.call_stack) > self.max_depth:
-            raise RuntimeError("Maximum recursion depth exceeded")
-        
+        else:
+            substitution = Substitution(dict(substitution.bindings))
+        if isinstance(goal, Predicate):
+            goal = self.atoms.find(goal)
+
+        names = list(substitution.bindings)
+        for name in self._term_variables(goal):
+            if name not in substitution.bindings:
+                names.append(name)
+
+        self.steps = 0
         self.call_stack.append(goal)
         try:
-            solutions = self._solve_goal(goal, substitution)
+            for _ in self._solve_goal(goal, substitution):
+                yield self._snapshot(names, substitution)
+        except RecursionError:
+            raise self._nesting_error(goal) from None
         finally:
             self.call_stack.pop()
-        
-        return solutions
-    
-    def _solve_goal(self, goal, substitution):
-        """Solve a single goal (predicate, IsExpression, or comparison)"""
-        from .ast_nodes import IsExpression
-
-        solutions = []
-
-        # Handle IsExpression: ?X is 5 + 3
-        if isinstance(goal, IsExpression):
-            result = self._evaluate_is_expression(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
-
-        # Handle comparison predicates: _compare_>, _compare_<, etc.
-        if isinstance(goal, Predicate) and goal.name.startswith('_compare_'):
-            result = self._evaluate_comparison(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
-
-        # Handle built-in predicates
+
+    def has_solution(self, goal):
+        """Check whether a query has at least one solution, stopping at the first"""
+        self.steps = 0
         if isinstance(goal, Predicate):
-            # Handle findall/3: findall(?Template, ?Goal, ?Result)
-            if goal.name == 'findall' and len(goal.args) == 3:
-                return self._handle_findall(goal, substitution)
+            goal = self.atoms.find(goal)
+        try:
+            for _ in self._solve_goal(goal, Substitution()):
+                return True
+        except RecursionError:
+            raise self._nesting_error(goal) from None
+        return False
 
-            # Handle bagof/3: bagof(?Template, ?Goal, ?Result)
-            if goal.name == 'bagof' and len(goal.args) == 3:
-                return self._handle_bagof(goal, substitution)
+    def _nesting_error(self, goal):
+        """The error reported when a query runs out of Python stack
 
-            # Handle setof/3: setof(?Template, ?Goal, ?Result)
-            if goal.name == 'setof' and len(goal.args) == 3:
-                return self._handle_setof(goal, substitution)
+        Clause expansion runs on the solver's own stack, but findall/3,
+        bagof/3, setof/3, aggregate_all/3 and not/1 each start a nested
+        solver, so deep recursion through them can still exhaust it.
+        """
+        return ResolutionLimitError(
+            f"Nesting of findall/bagof/setof/aggregate_all/not too deep while proving {goal}")
+
+    def _snapshot(self, names, substitution):
+        """Copy the resolved values of the named variables out of the binding store"""
+        bindings = {}
+        for name in names:
+            value = self._resolve(Term(name, is_variable=True), substitution)
+            if not (isinstance(value, Term) and value.is_variable):
+                bindings[name] = value
+        return Substitution(bindings)
+
+    def _resolve(self, term, substitution):
+        """Fully instantiate a term, including variables nested in lists and patterns"""
+        term = self._deref(term, substitution)
+        if isinstance(term, Predicate):
+            return self._apply_substitution(term, substitution)
+        if isinstance(term, (list, ListView)):
+            return [self._resolve(elem, substitution) for elem in term]
+        pattern = _list_pattern(term)
+        if pattern is not None:
+            # Follow bound tails iteratively: lists built as [H|R] chain deeply
+            head = []
+            while pattern is not None:
+                head.extend(self._resolve(elem, substitution) for elem in pattern.head)
+                tail = self._deref(pattern.tail, substitution)
+                pattern = _list_pattern(tail)
+            tail = self._resolve(tail, substitution)
+            if isinstance(tail, list):
+                return head + tail
+            return PartialList(head, tail)
+        return term
 
-            # Handle not/1: not(?Goal) - negation as failure
-            if goal.name == 'not' and len(goal.args) == 1:
-                return self._handle_not(goal, substitution)
+    def _term_variables(self, term):
+        """Return the names of the variables in a term, in order of appearance"""
+        from .ast_nodes import BinaryOp, UnaryOp
+
+        names = []
+
+        def collect(t):
+            if isinstance(t, Term):
+                if t.is_variable and t.value not in names:
+                    names.append(t.value)
+            elif isinstance(t, Predicate):
+                for arg in t.args:
+                    collect(arg)
+            elif isinstance(t, (list, ListView)):
+                for elem in t:
+                    collect(elem)
+            elif self._is_list_pattern(t):
+                pattern = _list_pattern(t)
+                collect(pattern.head)
+                collect(pattern.tail)
+            elif isinstance(t, BinaryOp):
+                collect(t.left)
+                collect(t.right)
+            elif isinstance(t, UnaryOp):
+                collect(t.operand)
+
+        collect(term)
+        return names
+
+    def _solve_goal(self, goal, substitution, depth=0):
+        """Yield once per solution of a goal (predicate, IsExpression, comparison or built-in)
+
+        The solver is a small abstract machine driven by two explicit stacks
+        instead of Python recursion: a continuation of pending goals (linked
+        cells of goal kind, goal, depth, cut barrier and rest) and a list of choice
+        points. Recursive predicates are therefore bounded by max_depth and
+        memory rather than by the Python interpreter's recursion limit.
+
+        Bindings are made in place on the substitution and undone before the
+        next solution is produced, so callers must read what they need from
+        it before resuming the generator.
+        """
+        return self._run((goal_kind(goal), goal, depth, 0, None), substitution)
+
+    def _run(self, cont, substitution):
+        """Run the machine on a continuation, yielding the substitution per solution"""
+        start = substitution.mark()
+        choicepoints = []
+
+        while cont is not _NO_MORE:
+            if cont is None:
+                # Every pending goal is proved: report a solution, then backtrack
+                yield substitution
+                cont = self._resume(choicepoints, substitution)
+                continue
+
+            kind, goal, depth, barrier, cont = cont
+            self._count_step(goal, depth)
+
+            if kind == _CALL:
+                choicepoint = self._choicepoint(goal, substitution, depth, cont)
+            elif kind == _CUT:
+                # Commit to the choices made since the clause was entered
+                del choicepoints[barrier:]
+                continue
+            elif kind == _IS:
+                # Deterministic built-ins run inline
+                if self._evaluate_is_expression(goal, substitution) is None:
+                    cont = self._resume(choicepoints, substitution)
+                continue
+            elif kind == _COMPARE:
+                if self._evaluate_comparison(goal, substitution) is None:
+                    cont = self._resume(choicepoints, substitution)
+                continue
+            else:
+                choicepoint = self._builtin_choicepoint(goal, substitution, depth, cont)
 
-        # Apply current substitution to the goal
-        goal = self._apply_substitution(goal, substitution)
+            # Predicates and built-ins open a choice point over their alternatives
+            if choicepoint is not None:
+                choicepoints.append(choicepoint)
+            cont = self._resume(choicepoints, substitution)
 
-        pred_name = goal.name
-        if pred_name not in self.knowledge_base:
-            return solutions
+        substitution.undo(start)
 
-        # Try to unify with facts and rules
-        for item in self.knowledge_base[pred_name]:
-            if isinstance(item, Fact):
-                # Try to unify with the fact
-                new_sub = self._unify(goal, item.predicate, substitution.copy())
-                if new_sub is not None:
-                    solutions.append(new_sub)
-
-            elif isinstance(item, Rule):
-                # Try to prove the rule
-                rule_solutions = self._prove_rule(item, goal, substitution)
-                solutions.extend(rule_solutions)
-
-        return solutions
-    
-    def _prove_rule(self, rule, goal, substitution):
-        """Prove a rule"""
-        solutions = []
-
-        # Rename variables in the rule to avoid conflicts
-        renamed_rule = self._rename_variables(rule)
-        var_mapping = self.var_mapping.copy()  # Save the mapping
-
-        # Unify the goal with the rule head
-        head_sub = self._unify(goal, renamed_rule.head, substitution)
-        if head_sub is None:
-            return solutions
-
-        # Prove the body
-        body_solutions = self._prove_body(renamed_rule.body, head_sub)
-
-        # Map renamed variables back to original variables
-        for sol in body_solutions:
-            for renamed_var, original_var in var_mapping.items():
-                if renamed_var in sol.bindings:
-                    sol.bindings[original_var] = sol.bindings[renamed_var]
-            solutions.append(sol)
-
-        return solutions
-    
-    def _prove_body(self, body, substitution):
-        """Prove a list of goals (conjunction) with cut support"""
-        from .ast_nodes import Cut
-
-        if not body:
-            return [substitution]
-
-        solutions = []
-        first_goal = body[0]
-        rest_goals = body[1:]
-
-        # Handle cut operator
-        if isinstance(first_goal, Cut):
-            # Cut prevents backtracking
-            # Execute remaining goals without allowing backtracking
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, substitution)
-                # Return only the first solution (or all solutions from remaining goals)
-                # but prevent backtracking to alternative clauses
-                return rest_solutions
-            else:
-                return [substitution]
+    def _builtin_choicepoint(self, goal, substitution, depth, rest):
+        """Create the choice point for findall/bagof/setof/aggregate_all/not"""
+        # Built-ins bind their results into the substitution and yield
+        handler = getattr(self, f'_handle_{goal.name}')
+        solutions = handler(goal, substitution, depth + 1)
+        return _ChoicePoint(substitution.mark(), goal, None, (() for _ in solutions), depth, rest)
 
-        # Solve the first goal
-        first_solutions = self._solve_goal(first_goal, substitution)
+    def _choicepoint(self, goal, substitution, depth, rest):
+        """Create the choice point for a user predicate goal"""
+        if not isinstance(goal, Predicate):
+            return None
 
-        # Check if there's a cut in the remaining goals
-        has_cut = any(isinstance(g, Cut) for g in rest_goals)
+        if self.model is not None and goal.name in self.model.relations:
+            solutions = self.model.solve(self, goal, substitution)
+            return _ChoicePoint(substitution.mark(), goal, None, (() for _ in solutions), depth, rest)
+
+        clauses = self.knowledge_base.get(goal.name)
+        if isinstance(clauses, ColumnStore):
+            solutions = clauses.solve(self, goal, substitution)
+            return _ChoicePoint(substitution.mark(), goal, None, (() for _ in solutions), depth, rest)
+        if clauses is None:
+            builtin = self.builtins.get((goal.name, len(goal.args)))
+            if builtin is not None:
+                solutions = builtin(self, goal, substitution, depth + 1)
+                return _ChoicePoint(substitution.mark(), goal, None, (() for _ in solutions), depth, rest)
+
+        if (goal.name, len(goal.args)) in self.tabled:
+            solutions = self._solve_tabled(goal, substitution, depth + 1)
+            return _ChoicePoint(substitution.mark(), goal, None, (() for _ in solutions), depth, rest)
+
+        clauses = self._clauses_for(goal, substitution)
+        if not clauses:
+            return None
+        return _ChoicePoint(substitution.mark(), goal, clauses, None, depth, rest)
 
-        # For each solution, solve the rest
-        for sol in first_solutions:
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, sol)
-                solutions.extend(rest_solutions)
+    def _solve_tabled(self, goal, substitution, depth):
+        """Yield once per answer of a tabled goal, completing its table first
 
-                # If we found a cut in the remaining goals, stop backtracking
-                if has_cut and rest_solutions:
+        A call to a variant that is already being evaluated consumes the
+        answers found so far; the outermost (leader) evaluation re-runs its
+        clauses until no table gains an answer, then marks every table it
+        touched complete.
+        """
+        call = self._resolve(goal, substitution)
+        key = variant_key(call)
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = AnswerTable(call)
+        if not table.complete and key not in self._table_active:
+            self._complete_table(key, table, depth)
+
+        mark = substitution.mark()
+        for answer, template in list(table.answers):
+            if template is not None:
+                answer = template.instantiate(next(self._fresh_ids)).head
+            if self._unify(goal, answer, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+    def _complete_table(self, key, table, depth):
+        """Evaluate the clauses of a tabled call until its answers reach a fixpoint"""
+        leader = not self._table_active
+        if table not in self._table_session:
+            self._table_session.append(table)
+        try:
+            while True:
+                added = self._table_answer_count
+                self._table_active.add(key)
+                try:
+                    self._table_pass(table, depth)
+                finally:
+                    self._table_active.discard(key)
+                if self._table_answer_count == added:
                     break
-            else:
-                solutions.append(sol)
+            if leader:
+                for evaluated in self._table_session:
+                    evaluated.complete = True
+                self._table_session = []
+        except BaseException:
+            if leader:
+                # Never keep the partial answers of an interrupted evaluation
+                for evaluated in self._table_session:
+                    self.tables.pop(variant_key(evaluated.goal), None)
+                self._table_session = []
+            raise
+
+    def _table_pass(self, table, depth):
+        """Resolve a tabled call against its clauses once, recording new answers"""
+        substitution = Substitution()
+        for clause in self._clauses_for(table.goal):
+            mark = substitution.mark()
+            body = self._unify_clause(table.goal, clause, substitution, depth + 1, 0, None)
+            if body is not _NO_MORE:
+                for _ in self._run(body, substitution):
+                    if table.add(self._resolve(table.goal, substitution)):
+                        self._table_answer_count += 1
+            substitution.undo(mark)
+
+    def _resume(self, choicepoints, substitution):
+        """Take the next alternative of the newest live choice point
+
+        Returns the new continuation, or _NO_MORE once every choice point is
+        exhausted. A clause choice point is popped before its last clause is
+        tried, so deterministic calls leave nothing behind.
+        """
+        while choicepoints:
+            choicepoint = choicepoints[-1]
+            substitution.undo(choicepoint.mark)
+
+            if choicepoint.alternatives is not None:
+                if next(choicepoint.alternatives, None) is None:
+                    choicepoints.pop()
+                    continue
+                return choicepoint.rest
+
+            # A cut in a clause body removes this choice point and every newer one
+            barrier = len(choicepoints) - 1
+            clauses = choicepoint.clauses
+            while choicepoint.next_clause < len(clauses):
+                clause = clauses[choicepoint.next_clause]
+                choicepoint.next_clause += 1
+                if choicepoint.next_clause == len(clauses):
+                    choicepoints.pop()
+                cont = self._unify_clause(choicepoint.goal, clause, substitution,
+                                          choicepoint.depth + 1, barrier, choicepoint.rest)
+                if cont is not _NO_MORE:
+                    return cont
+                substitution.undo(choicepoint.mark)
+        return _NO_MORE
+
+    def _unify_clause(self, goal, clause, substitution, depth, barrier, rest):
+        """Unify a goal with a clause head; return rest with the clause body prepended, or _NO_MORE"""
+        if isinstance(clause, Fact):
+            if self._unify(goal, clause.predicate, substitution) is not None:
+                return rest
+            return _NO_MORE
+        template = self._compiled(clause)
+        frame = template.match_head(self, goal, substitution)
+        if frame is None:
+            return _NO_MORE
+        if self.planner is not None and len(template.body_steps) > 1:
+            steps = self.planner.body_steps(template, goal, substitution)
+            return template.body_cells(frame, depth, barrier, rest, steps)
+        return template.body_cells(frame, depth, barrier, rest)
+
+    def _count_step(self, goal, depth):
+        """Charge one inference step, enforcing the depth and step budgets"""
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise ResolutionLimitError(f"Inference step budget ({self.max_steps}) exhausted while proving {goal}")
+        if self.max_depth is not None and depth > self.max_depth:
+            raise ResolutionLimitError(f"Maximum recursion depth ({self.max_depth}) exceeded while proving {goal}")
 
-        return solutions
-    
     def _unify(self, term1, term2, substitution):
         """Unify two terms with support for list patterns [H|T]"""
         # Apply substitution
         term1 = self._deref(term1, substitution)
         term2 = self._deref(term2, substitution)
 
-        # Handle list pattern unification
-        # Case 1: ListPattern with list
-        if self._is_list_pattern(term1) and isinstance(term2, list):
-            return self._unify_list_pattern(term1, term2, substitution)
-        elif isinstance(term1, list) and self._is_list_pattern(term2):
-            return self._unify_list_pattern(term2, term1, substitution)
-
-        # Case 2: Two ListPatterns
-        elif self._is_list_pattern(term1) and self._is_list_pattern(term2):
-            # Convert both to lists and unify
-            # This is complex - for now, fail
+        # Interned atoms and hash-consed ground predicates compare by identity
+        if term1 is term2:
+            return substitution
+        if isinstance(term1, Atom) and isinstance(term2, Atom) \
+                and term1.value.__class__ is term2.value.__class__ \
+                and self.atoms.owns(term1) and self.atoms.owns(term2):
             return None
 
-        # Case 3: Two lists
-        elif isinstance(term1, list) and isinstance(term2, list):
+        # Handle list pattern unification
+        if term1.__class__ is dict:
+            term1 = _list_pattern(term1) or term1
+        if term2.__class__ is dict:
+            term2 = _list_pattern(term2) or term2
+        list1 = isinstance(term1, (list, ListView))
+        list2 = isinstance(term2, (list, ListView))
+
+        # Case 1: an open list with a list or another open list
+        if isinstance(term1, PartialList) and (list2 or isinstance(term2, PartialList)) \
+                or list1 and isinstance(term2, PartialList):
+            return self._unify_open_lists(term1, term2, substitution)
+
+        # Case 2: Two lists
+        elif list1 and list2:
             if len(term1) != len(term2):
                 return None
             for e1, e2 in zip(term1, term2):
@@ -340,10 +1972,10 @@ class LogicalEngine:
         if isinstance(term1, Term) and isinstance(term2, Term):
             if term1.value == term2.value and term1.is_variable == term2.is_variable:
                 return substitution
-        elif isinstance(term1, str) and isinstance(term2, str):
+        elif isinstance(term1, (str, int, float)) and isinstance(term2, (str, int, float)):
             if term1 == term2:
                 return substitution
-        elif isinstance(term1, str) and isinstance(term2, Term):
+        elif isinstance(term1, (str, int, float)) and isinstance(term2, Term):
             if term2.is_variable:
                 if self._occurs_check(term2.value, term1, substitution):
                     return None
@@ -352,7 +1984,7 @@ class LogicalEngine:
             else:
                 if term1 == term2.value:
                     return substitution
-        elif isinstance(term1, Term) and isinstance(term2, str):
+        elif isinstance(term1, Term) and isinstance(term2, (str, int, float)):
             if term1.is_variable:
                 if self._occurs_check(term1.value, term2, substitution):
                     return None
@@ -361,7 +1993,8 @@ class LogicalEngine:
             else:
                 if term1.value == term2:
                     return substitution
-        elif term1 == term2:
+        elif not isinstance(term1, Predicate) and term1 == term2:
+            # Predicates are unified argument by argument below
             return substitution
 
         # If term1 is a variable, bind it
@@ -394,47 +2027,115 @@ class LogicalEngine:
         return None
 
     def _is_list_pattern(self, term):
-        """Check if term is a list pattern [H|T]"""
-        # A list pattern is represented as a dict with 'head' and 'tail' keys
-        return isinstance(term, dict) and 'list_pattern' in term
+        """Check if term is a list pattern [H|T] (a PartialList, or the older dict form)"""
+        return isinstance(term, PartialList) or (isinstance(term, dict) and 'list_pattern' in term)
 
     def _unify_list_pattern(self, pattern, lst, substitution):
         """Unify a list pattern [H1, H2, ...|T] with a list"""
-        if not isinstance(pattern, dict) or 'list_pattern' not in pattern:
+        pattern = _list_pattern(pattern)
+        if pattern is None:
             return None
+        return self._unify_open_lists(pattern, lst, substitution)
 
-        head_elements = pattern['head']
-        tail_var = pattern['tail']
+    def _list_cursor(self, term, substitution):
+        """Return (items, position, tail) for a list term, following bound tails
 
-        # Check if list has enough elements
-        if len(lst) < len(head_elements):
-            return None
+        items[position:] are the elements known so far and tail is what
+        follows them: None for a closed list, otherwise an unbound variable
+        or a non-list term.
+        """
+        while True:
+            term = self._deref(term, substitution)
+            if term.__class__ is dict:
+                term = _list_pattern(term) or term
+            if isinstance(term, ListView):
+                return term.items, term.start, None
+            if isinstance(term, list):
+                return term, 0, None
+            if not isinstance(term, PartialList):
+                return (), 0, term
+            if term.head:
+                return term.head, 0, term.tail
+            term = term.tail
+
+    def _unify_open_lists(self, left, right, substitution):
+        """Unify two list terms, either of which may be open ([H|T])
+
+        Elements are matched pairwise along both lists. When one side runs
+        out of known elements, its tail is unified with whatever remains of
+        the other side, given as a ListView or PartialList over the same
+        items, so neither list is copied.
+        """
+        left_items, i, left_tail = self._list_cursor(left, substitution)
+        right_items, j, right_tail = self._list_cursor(right, substitution)
+        while True:
+            while i < len(left_items) and j < len(right_items):
+                if self._unify(left_items[i], right_items[j], substitution) is None:
+                    return None
+                i += 1
+                j += 1
+
+            # Step into a tail that is (or has since been bound to) more list
+            if i == len(left_items) and left_tail is not None:
+                left_items, i, left_tail = self._list_cursor(left_tail, substitution)
+                if left_items:
+                    continue
+            if j == len(right_items) and right_tail is not None:
+                right_items, j, right_tail = self._list_cursor(right_tail, substitution)
+                if right_items:
+                    continue
+
+            if i == len(left_items):
+                return self._unify_rest(left_tail, right_items, j, right_tail, substitution)
+            return self._unify_rest(right_tail, left_items, i, left_tail, substitution)
+
+    def _unify_rest(self, tail, items, position, rest_tail, substitution):
+        """Unify the tail of an exhausted list with the remainder of the other"""
+        remaining = ListView(items, position)
+        if rest_tail is None:
+            rest = remaining
+        elif not remaining:
+            rest = rest_tail
+        else:
+            rest = PartialList(remaining, rest_tail)
+        if tail is None:
+            # A closed list ended: the other side must end here too
+            if rest_tail is None:
+                return substitution if not remaining else None
+            return self._unify(rest_tail, [], substitution) if not remaining else None
+        return self._unify(tail, rest, substitution)
 
-        # Unify head elements
-        for i, head_elem in enumerate(head_elements):
-            substitution = self._unify(head_elem, lst[i], substitution)
-            if substitution is None:
-                return None
+    def _deref(self, term, substitution):
+        """Dereference a term by following variable bindings
 
-        # Unify tail with remaining elements
-        remaining = lst[len(head_elements):]
-        substitution = self._unify(tail_var, remaining, substitution)
+        Bindings form a union-find forest over variables. When a lookup
+        walks a chain of several variable-to-variable bindings, every
+        variable on the way is rebound straight to the chain's end (path
+        compression), so later lookups take one step. The rebinding goes on
+        the trail, so backtracking restores the original chain.
+        """
+        if not (isinstance(term, Term) and term.is_variable):
+            return term
+        bindings = substitution.bindings
+        value = bindings.get(term.value)
+        if not (isinstance(value, Term) and value.is_variable):
+            return term if value is None else value
+
+        path = [term.value]
+        while True:
+            following = bindings.get(value.value)
+            if following is None:
+                break
+            path.append(value.value)
+            value = following
+            if not (isinstance(value, Term) and value.is_variable):
+                break
+
+        # The last variable on the path already points at the end
+        for name in path[:-1]:
+            substitution.rebind(name, value)
+        return value
 
-        return substitution
-    
-    def _deref(self, term, substitution):
-        """Dereference a term by following variable bindings"""
-        if isinstance(term, Term) and term.is_variable:
-            value = substitution.lookup(term.value)
-            if value is not None:
-                # If value is a Term, dereference it recursively
-                if isinstance(value, Term):
-                    return self._deref(value, substitution)
-                else:
-                    # If value is a string, return it as is
-                    return value
-        return term
-    
     def _occurs_check(self, var_name, term, substitution):
         """Check if a variable occurs in a term (prevents infinite structures)"""
         term = self._deref(term, substitution)
@@ -446,6 +2147,14 @@ class LogicalEngine:
             for arg in term.args:
                 if self._occurs_check(var_name, arg, substitution):
                     return True
+        elif isinstance(term, PartialList):
+            # Catches X = [1|X]; proper lists are not scanned, as before
+            while isinstance(term, PartialList):
+                for item in term.head:
+                    if self._occurs_check(var_name, item, substitution):
+                        return True
+                term = self._deref(term.tail, substitution)
+            return self._occurs_check(var_name, term, substitution)
         
         return False
     
@@ -461,7 +2170,7 @@ class LogicalEngine:
                     new_args.append(deref_arg)
                 else:
                     # If it's a string, convert it to a Term
-                    new_args.append(Term(deref_arg, is_variable=False))
+                    new_args.append(self._constant(deref_arg))
             return Predicate(term.name, new_args)
 
         deref_term = self._deref(term, substitution)
@@ -469,28 +2178,32 @@ class LogicalEngine:
             return deref_term
         else:
             # If it's a string, convert it to a Term
-            return Term(deref_term, is_variable=False)
+            return self._constant(deref_term)
+
+    def _constant(self, value):
+        """Return the shared atom for a constant value, or a plain Term if no clause uses it
+
+        Computed values are not added to the atom table, so answering
+        queries does not grow it.
+        """
+        if isinstance(value, ListView):
+            value = list(value)
+        return self.atoms.find(Term(value, is_variable=False))
     
-    def _rename_variables(self, rule):
-        """Rename variables in a rule to avoid conflicts"""
-        import time
-        suffix = str(int(time.time() * 1000000) % 1000000)
-        self.var_mapping = {}  # Store mapping from renamed to original
-
-        def rename_term(term):
-            if isinstance(term, Term) and term.is_variable:
-                renamed = f"{term.value}_{suffix}"
-                self.var_mapping[renamed] = term.value  # Store mapping
-                return Term(renamed, is_variable=True)
-            elif isinstance(term, Predicate):
-                new_args = [rename_term(arg) for arg in term.args]
-                return Predicate(term.name, new_args)
-            return term
+    def _compiled(self, rule):
+        """Return the rule's ClauseTemplate, compiling it if needed"""
+        template = rule._template
+        if template is None:
+            template = rule._template = ClauseTemplate(rule)
+        return template
 
-        new_head = rename_term(rule.head)
-        new_body = [rename_term(goal) for goal in rule.body]
+    def _rename_variables(self, rule):
+        """Rename variables in a rule to avoid conflicts
 
-        return Rule(new_head, new_body)
+        The rule is compiled into a ClauseTemplate on first use; each call
+        then only allocates fresh variables named with the next counter value.
+        """
+        return self._compiled(rule).instantiate(next(self._fresh_ids))
 
     def _evaluate_is_expression(self, is_expr, substitution):
         """Evaluate an 'is' expression: ?X is 5 + 3"""
@@ -503,8 +2216,7 @@ class LogicalEngine:
             return None
 
         # Unify the variable with the result
-        new_sub = self._unify(is_expr.variable, result, substitution.copy())
-        return new_sub
+        return self._unify(is_expr.variable, result, substitution)
 
     def _evaluate_arithmetic(self, expr, substitution):
         """Evaluate an arithmetic expression"""
@@ -523,24 +2235,24 @@ class LogicalEngine:
             var_name = expr.name
             if var_name.startswith('?'):
                 var_name = var_name[1:]
-            value = substitution.lookup(var_name)
-            if value is not None:
-                return self._evaluate_arithmetic(value, substitution)
-            return None
+            expr = Term(var_name, is_variable=True)
 
         # Handle Terms
         if isinstance(expr, Term):
+            # Follow the whole binding chain before evaluating
+            expr = self._deref(expr, substitution)
+            if not isinstance(expr, Term):
+                return self._evaluate_arithmetic(expr, substitution)
             if expr.is_variable:
-                value = substitution.lookup(expr.value)
-                if value is not None:
-                    return self._evaluate_arithmetic(value, substitution)
                 return None
-            else:
-                # Try to convert to number
-                try:
-                    return float(expr.value) if '.' in str(expr.value) else int(expr.value)
-                except:
-                    return None
+            value = expr.value
+            if value.__class__ is int or value.__class__ is float:
+                return value
+            # Numbers built from text, e.g. Term('3') from older callers
+            try:
+                return float(value) if '.' in str(value) else int(value)
+            except (TypeError, ValueError):
+                return None
 
         # Handle binary operations
         if isinstance(expr, BinaryOp):
@@ -604,11 +2316,11 @@ class LogicalEngine:
             result = left < right
         elif op == '>=':
             result = left >= right
-        elif op == '<=':
+        elif op in ('<=', '=<'):
             result = left <= right
-        elif op == '==':
+        elif op in ('==', '=:='):
             result = left == right
-        elif op == '!=':
+        elif op in ('!=', '=\\='):
             result = left != right
 
         # If comparison succeeds, return the substitution unchanged
@@ -617,7 +2329,7 @@ class LogicalEngine:
         else:
             return None
 
-    def _handle_findall(self, findall_pred, substitution):
+    def _handle_findall(self, findall_pred, substitution, depth=0):
         """Handle findall/3: findall(?Template, ?Goal, ?Result)
 
         Collects all solutions of Goal and instantiates Template for each,
@@ -629,114 +2341,149 @@ class LogicalEngine:
         goal = findall_pred.args[1]
         result_var = findall_pred.args[2]
 
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
-            else:
-                results.append(instantiated)
+        # Collect instantiated templates as the solutions stream out
+        results = [self._collected_value(template, sol) for sol in self._solve_goal(goal, substitution, depth)]
 
         # Unify the result with the result variable
-        new_sub = self._unify(result_var, results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
+        mark = substitution.mark()
+        if self._unify(result_var, results, substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
 
-    def _handle_bagof(self, bagof_pred, substitution):
+    def _handle_bagof(self, bagof_pred, substitution, depth=0):
         """Handle bagof/3: bagof(?Template, ?Goal, ?Result)
 
-        Like findall, but fails if there are no solutions.
-        Collects all solutions of Goal and instantiates Template for each,
-        returning the list in Result.
+        Like findall, but fails if there are no solutions, and groups the
+        solutions by the free variables of Goal (those unbound and not in
+        Template or quantified with Var^Goal): Result is produced once per
+        distinct binding of them, in standard order.
 
-        Example: bagof(?X, parent(?X, john), ?List)
+        Example: bagof(?X, parent(?X, ?Parent), ?Children)
         """
         template = bagof_pred.args[0]
-        goal = bagof_pred.args[1]
-        result_var = bagof_pred.args[2]
-
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # bagof fails if there are no solutions (unlike findall)
-        if not solutions:
-            return []
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
-            else:
-                results.append(instantiated)
+        goal, free = self._grouping(template, bagof_pred.args[1], substitution)
+        groups = self._solution_groups(template, goal, free, substitution, depth)
+        yield from self._unify_groups(groups, free, bagof_pred.args[2], substitution)
 
-        # Unify the result with the result variable
-        new_sub = self._unify(result_var, results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
-
-    def _handle_setof(self, setof_pred, substitution):
+    def _handle_setof(self, setof_pred, substitution, depth=0):
         """Handle setof/3: setof(?Template, ?Goal, ?Result)
 
-        Like bagof, but removes duplicates and sorts the results.
-        Fails if there are no solutions.
+        Like bagof, but each Result has no duplicates and is sorted in the
+        standard order of terms.
 
-        Example: setof(?X, parent(?X, john), ?List)
+        Example: setof(?X, ?Y^parent(?Y, ?X), ?Children)
         """
         template = setof_pred.args[0]
-        goal = setof_pred.args[1]
-        result_var = setof_pred.args[2]
-
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # setof fails if there are no solutions
-        if not solutions:
-            return []
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
+        goal, free = self._grouping(template, setof_pred.args[1], substitution)
+        groups = self._solution_groups(template, goal, free, substitution, depth)
+        for witness, values in groups.values():
+            unique = {}
+            for value in values:
+                unique.setdefault(standard_order_key(value), value)
+            values[:] = [unique[key] for key in sorted(unique)]
+        yield from self._unify_groups(groups, free, setof_pred.args[2], substitution)
+
+    def _collected_value(self, template, substitution):
+        """Instantiate a findall/bagof/setof template, unwrapping constants to their values"""
+        instantiated = self._apply_substitution(template, substitution)
+        if isinstance(instantiated, Term):
+            return instantiated.value
+        return instantiated
+
+    def _grouping(self, template, goal, substitution):
+        """Return (Goal without ^ prefixes, free variables) for bagof-style grouping"""
+        goal, quantified = self._strip_existential(goal, substitution)
+        bound = set(quantified)
+        if template is not None:
+            bound.update(self._term_variables(self._resolve(template, substitution)))
+        free = [Term(name, is_variable=True)
+                for name in self._term_variables(self._resolve(goal, substitution)) if name not in bound]
+        return goal, free
+
+    def _solution_groups(self, template, goal, free, substitution, depth):
+        """Partition the template values of goal's solutions by the bindings of free in one pass"""
+        groups = {}  # {standard order key of the free values: (free values, [template values])}
+        for sol in self._solve_goal(goal, substitution, depth):
+            witness = [self._resolve(var, sol) for var in free]
+            key = standard_order_key(witness)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (witness, [])
+            group[1].append(self._collected_value(template, sol))
+        return groups
+
+    def _unify_groups(self, groups, free, result_var, substitution):
+        """Yield once per group, in standard order, binding free and result_var"""
+        for key in sorted(groups):
+            witness, result = groups[key]
+            if result is None:
+                continue
+            mark = substitution.mark()
+            if self._unify(free, witness, substitution) is not None \
+                    and self._unify(result_var, result, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+    def _handle_aggregate_all(self, aggregate_pred, substitution, depth=0):
+        """Handle aggregate_all/3: aggregate_all(?Spec, ?Goal, ?Result)
+
+        Spec is count, sum(?X), max(?X), min(?X), avg(?X), bag(?X) or set(?X).
+        Each solution of Goal is folded into a running aggregate as it streams
+        out, so count, sum, max, min and avg use constant memory. Variables of
+        Goal that are unbound, not in Spec and not quantified with ^ group
+        the solutions like bagof/3: Result is produced once per distinct
+        binding of them, in standard order. Without such variables count and
+        sum of no solutions are 0 and bag/set give [], while max, min and avg
+        fail.
+
+        Example: aggregate_all(sum(?S), ?Name^salary(?Name, ?S), ?Total)
+        """
+        spec = self._deref(aggregate_pred.args[0], substitution)
+        if isinstance(spec, Term) and not spec.is_variable and spec.value == 'count':
+            kind, template = 'count', None
+        elif isinstance(spec, Predicate) and spec.name == 'count' and not spec.args:
+            kind, template = 'count', None
+        elif isinstance(spec, Predicate) and len(spec.args) == 1 \
+                and spec.name in ('sum', 'max', 'min', 'avg', 'bag', 'set'):
+            kind, template = spec.name, spec.args[0]
+        else:
+            raise RuntimeError(f"Unknown aggregate_all specification: {spec}")
+        goal, free = self._grouping(template, aggregate_pred.args[1], substitution)
+
+        groups = {}  # {standard order key of the free values: (free values, _Aggregator)}
+        for sol in self._solve_goal(goal, substitution, depth):
+            if kind == 'count':
+                value = None
+            elif kind in ('bag', 'set'):
+                value = self._collected_value(template, sol)
             else:
-                results.append(instantiated)
-
-        # Remove duplicates and sort
-        # Convert to set to remove duplicates, then back to sorted list
-        try:
-            unique_results = list(set(results))
-            unique_results.sort()
-        except TypeError:
-            # If items are not sortable (e.g., mixed types), just remove duplicates
-            unique_results = []
-            seen = set()
-            for item in results:
-                if item not in seen:
-                    unique_results.append(item)
-                    seen.add(item)
-
-        # Unify the result with the result variable
-        new_sub = self._unify(result_var, unique_results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
-
-    def _handle_not(self, not_pred, substitution):
+                value = self._evaluate_arithmetic(template, sol)
+                if value is None:
+                    if kind in ('sum', 'avg'):
+                        raise TypeError(f"aggregate_all {kind}/1 needs numbers, got {self._resolve(template, sol)}")
+                    value = self._collected_value(template, sol)
+            witness = [self._resolve(var, sol) for var in free]
+            key = standard_order_key(witness)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (witness, _Aggregator(kind))
+            group[1].add(value)
+
+        if not free and not groups:
+            groups[standard_order_key([])] = ([], _Aggregator(kind))
+        results = {key: (witness, aggregator.result()) for key, (witness, aggregator) in groups.items()}
+        yield from self._unify_groups(results, free, aggregate_pred.args[2], substitution)
+
+    def _strip_existential(self, goal, substitution):
+        """Split Var^Goal into (Goal, names of the variables in Var), nesting allowed"""
+        quantified = []
+        goal = self._deref(goal, substitution)
+        while isinstance(goal, Predicate) and goal.name == '^' and len(goal.args) == 2:
+            quantified.extend(self._term_variables(self._resolve(goal.args[0], substitution)))
+            goal = self._deref(goal.args[1], substitution)
+        return goal, quantified
+
+    def _handle_not(self, not_pred, substitution, depth=0):
         """Handle not/1: not(?Goal) - negation as failure
 
         Succeeds if Goal fails, fails if Goal succeeds.
@@ -745,11 +2492,11 @@ class LogicalEngine:
         """
         goal = not_pred.args[0]
 
-        # Try to solve the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # Negation as failure: succeed if no solutions found
-        if len(solutions) == 0:
-            return [substitution]
-        return []
+        # Negation as failure: fail as soon as the goal has one solution,
+        # dropping whatever bindings that solution made
+        mark = substitution.mark()
+        for _ in self._solve_goal(goal, substitution, depth):
+            substitution.undo(mark)
+            return
+        yield substitution
 
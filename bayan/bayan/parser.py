@@ -1153,10 +1153,15 @@ class HybridParser:
         return args
 
     def parse_logical_term(self):
-        """Parse a logical term (including list patterns)"""
+        """Parse a logical term (including list patterns, compound terms and ?X^Goal)"""
         if self.match(TokenType.VARIABLE):
             var_name = self.eat(TokenType.VARIABLE).value[1:]  # Remove ?
-            return Term(var_name, is_variable=True)
+            variable = Term(var_name, is_variable=True)
+            if self.match(TokenType.OPERATOR) and self.current_token.value == '^':
+                # Existential quantification for bagof/setof/aggregate_all
+                self.eat(TokenType.OPERATOR)
+                return Predicate('^', [variable, self.parse_logical_term()])
+            return variable
 
         elif self.match(TokenType.STRING):
             raw = self.eat(TokenType.STRING).value
@@ -1168,20 +1173,50 @@ class HybridParser:
             return Term(value, is_variable=False)
 
         elif self.match(TokenType.NUMBER):
-            value = self.eat(TokenType.NUMBER).value
-            return Term(value, is_variable=False)
+            return Term(self._number_value(self.eat(TokenType.NUMBER).value), is_variable=False)
+
+        elif self.match(TokenType.OPERATOR) and self.current_token.value == '-' \
+                and self.peek_ahead(1) and self.peek_ahead(1).type == TokenType.NUMBER:
+            # Negative number
+            self.eat(TokenType.OPERATOR)
+            return Term(-self._number_value(self.eat(TokenType.NUMBER).value), is_variable=False)
 
         elif self.match(TokenType.IDENTIFIER):
+            if self.peek_ahead(1) and self.peek_ahead(1).type == TokenType.LPAREN:
+                # Compound term, e.g. the goal passed to findall/bagof/setof
+                return self.parse_logical_predicate()
             value = self.eat(TokenType.IDENTIFIER).value
             return Term(value, is_variable=False)
 
         elif self.match(TokenType.LBRACKET):
             # Parse list or list pattern
-            return self.parse_list()
+            return self.parse_logical_list()
 
         else:
             raise SyntaxError(f"Unexpected token in logical term: {self.current_token}")
 
+    def parse_logical_list(self):
+        """Parse a list term [a, b] or an open list [H1, H2|T] for the logical engine"""
+        from .logical_engine import PartialList
+        self.eat(TokenType.LBRACKET)
+        elements = []
+        if not self.match(TokenType.RBRACKET):
+            elements.append(self.parse_logical_term())
+            while self.match(TokenType.COMMA):
+                self.eat(TokenType.COMMA)
+                elements.append(self.parse_logical_term())
+            if self.match(TokenType.PIPE):
+                self.eat(TokenType.PIPE)
+                tail = self.parse_logical_term()
+                self.eat(TokenType.RBRACKET)
+                return PartialList(elements, tail)
+        self.eat(TokenType.RBRACKET)
+        return elements
+
+    def _number_value(self, text):
+        """Convert the text of a NUMBER token to an int or float"""
+        return float(text) if '.' in text else int(text)
+
     def parse_logical_body(self):
         """Parse the body of a logical rule (predicates, comparisons, is expressions)"""
         goals = [self.parse_logical_goal()]
@@ -1199,6 +1234,14 @@ class HybridParser:
             self.eat(TokenType.CUT)
             return Cut()
 
+        # Check for negation as failure: not(goal)
+        if self.match(TokenType.NOT) and self.peek_ahead(1) and self.peek_ahead(1).type == TokenType.LPAREN:
+            self.eat(TokenType.NOT)
+            self.eat(TokenType.LPAREN)
+            goal = self.parse_logical_goal()
+            self.eat(TokenType.RPAREN)
+            return Predicate('not', [goal])
+
         # Check if this is an 'is' expression or comparison: ?X is Expression or ?X > ?Y
         if self.match(TokenType.VARIABLE):
             # Peek ahead to see if 'is' or comparison operator follows
@@ -1222,7 +1265,7 @@ class HybridParser:
                     left = self.parse_logical_term()
                     op_tok = self.eat(TokenType.OPERATOR)
                     right = self.parse_logical_term()
-                    return IsExpression(left, BinaryOp(left, op_tok.value, right))
+                    return Predicate(f'_compare_{op_tok.value}', [left, right])
                 else:
                     # Not a comparison, restore and parse as predicate
                     self.position = saved_pos
@@ -0,0 +1,178 @@
+"""
+Selectivity-based goal ordering for Bayan rule bodies
+ترتيب الأهداف حسب الانتقائية في أجسام قواعد بيان
+"""
+
+from collections import Counter
+
+from .logical_engine import Term, Fact, ColumnStore, index_key, _CALL, _CUT, _Slot
+
+
+class PredicateStats:
+    """Size and per-argument distinct-value counts of a stored fact predicate"""
+    __slots__ = ('cardinality', 'counts')
+
+    def __init__(self, cardinality, counts):
+        self.cardinality = cardinality
+        self.counts = counts  # [Counter {value key: number of facts} for each argument position]
+
+    @property
+    def distinct(self):
+        """The number of distinct values at each argument position"""
+        return [len(counts) for counts in self.counts]
+
+    def change(self, args, change):
+        """Count a fact with these arguments as added (change=1) or removed (change=-1)"""
+        self.cardinality += change
+        while len(self.counts) < len(args):
+            self.counts.append(Counter())
+        for counts, arg in zip(self.counts, args):
+            key = _value_key(arg)
+            counts[key] += change
+            if counts[key] <= 0:
+                del counts[key]
+
+    def estimate(self, bound_positions):
+        """Estimate how many facts match a goal with the given argument positions bound"""
+        rows = float(self.cardinality)
+        for position in bound_positions:
+            if position < len(self.distinct) and self.distinct[position]:
+                rows /= self.distinct[position]
+        return rows
+
+    def __repr__(self):
+        return f"PredicateStats({self.cardinality}, {self.distinct})"
+
+
+class QueryPlanner:
+    """Reorders runs of stored-fact goals in rule bodies, most selective first
+
+    Only consecutive goals on predicates made of ground or non-ground facts
+    (no rules) are moved: such goals have no side effects, so their order
+    changes the order of solutions but not the set. Cuts, not/1, is,
+    comparisons, built-ins and calls to rules stay where they are and
+    split the body into separately planned runs. Goals before the last
+    cut of a body are not moved either, since the cut commits to the
+    first solution they find.
+
+    A plan depends on which head arguments are bound by the call, and is
+    cached on the rule's ClauseTemplate until a predicate it reads changes.
+    Statistics are collected once per predicate and then kept up to date
+    as facts are asserted and retracted.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.stats = {}  # {pred_name: PredicateStats or None}
+
+    def predicate_stats(self, pred_name):
+        """Return the PredicateStats of a fact-only predicate, or None"""
+        if pred_name not in self.stats:
+            self.stats[pred_name] = self._collect(pred_name)
+        return self.stats[pred_name]
+
+    def clauses_changed(self, pred_name, added=(), removed=()):
+        """Apply a change to pred_name's clauses to its statistics"""
+        if pred_name not in self.stats:
+            return
+        stats = self.stats[pred_name]
+        facts_only = all(isinstance(clause, Fact) for clause in added) \
+            and all(isinstance(clause, Fact) for clause in removed)
+        if stats is None and facts_only and added and not removed \
+                and len(self.engine.knowledge_base.get(pred_name, ())) > len(added):
+            return  # Still not fact-only: the rules that made it so are all there
+        if stats is None or not facts_only or not (added or removed):
+            # Unknown change, rules or a first fact: collect again when next needed
+            del self.stats[pred_name]
+            return
+        for clause in added:
+            stats.change(clause.predicate.args, 1)
+        for clause in removed:
+            stats.change(clause.predicate.args, -1)
+
+    def _collect(self, pred_name):
+        clauses = self.engine.knowledge_base.get(pred_name)
+        if not clauses:
+            return None
+        if isinstance(clauses, ColumnStore):
+            atoms = clauses.atoms.atoms
+            counts = []
+            for column in clauses.columns:
+                values = Counter()
+                for atom_id, number in Counter(column).items():
+                    values[_value_key(atoms[atom_id])] += number
+                counts.append(values)
+            return PredicateStats(len(clauses), counts)
+        if not all(isinstance(clause, Fact) for clause in clauses):
+            return None
+        stats = PredicateStats(0, [])
+        for clause in clauses:
+            stats.change(clause.predicate.args, 1)
+        return stats
+
+    def body_steps(self, template, goal, substitution):
+        """Return the body steps of a rule in planned order for this call"""
+        mode = tuple(not (isinstance(arg, Term) and arg.is_variable)
+                     for arg in (self.engine._deref(arg, substitution) for arg in goal.args))
+        generations = self.engine.generations
+        versions = tuple(generations.get(name, 0) for name in template.call_names)
+        cached = template.plans.get(mode)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        steps = self.plan(template, mode)
+        template.plans[mode] = (versions, steps)
+        return steps
+
+    def plan(self, template, mode):
+        """Order the body steps given which head arguments are bound"""
+        bound = set()
+        for is_bound, node in zip(mode, template.head_args):
+            if is_bound:
+                bound.update(template._node_slots(node))
+
+        steps = template.body_steps
+        cuts = [index for index, (kind, _) in enumerate(steps) if kind == _CUT]
+        planned = list(steps[:cuts[-1] + 1]) if cuts else []
+        for index in range(len(planned)):
+            bound.update(self._goal_slots(template, index))
+        position = len(planned)
+        while position < len(steps):
+            run = []
+            while position < len(steps) and self._movable(template, position):
+                run.append(position)
+                position += 1
+            while run:
+                best = min(run, key=lambda index: self._cost(template, index, bound))
+                run.remove(best)
+                planned.append(steps[best])
+                bound.update(self._goal_slots(template, best))
+            if position < len(steps):
+                planned.append(steps[position])
+                bound.update(self._goal_slots(template, position))
+                position += 1
+        return planned
+
+    def _movable(self, template, index):
+        kind, _ = template.body_steps[index]
+        name = template.goal_names[index]
+        return kind == _CALL and name is not None and self.predicate_stats(name) is not None
+
+    def _cost(self, template, index, bound):
+        stats = self.predicate_stats(template.goal_names[index])
+        positions = [position for position, node in enumerate(self._goal_args(template, index))
+                     if not isinstance(node, _Slot) or node.index in bound]
+        return stats.estimate(positions)
+
+    def _goal_args(self, template, index):
+        _, node = template.body_steps[index]
+        parts = getattr(node, 'parts', None)
+        return parts if parts is not None else template.goals[index].args
+
+    def _goal_slots(self, template, index):
+        return template._node_slots(template.body_steps[index][1])
+
+
+def _value_key(arg):
+    """Return the key an argument is counted under in PredicateStats"""
+    key = index_key(arg)
+    return key if key is not None else ('$ANY', id(arg))
@@ -594,16 +594,11 @@ class TraditionalInterpreter:
 
     def visit_list_pattern(self, node):
         """Visit a list pattern node [H|T]"""
-        # Convert ListPattern to internal representation for logical engine
+        from .logical_engine import PartialList
+        # Convert ListPattern to the logical engine's open list term
         head_elements = [self.interpret(elem) for elem in node.head_elements]
         tail = self.interpret(node.tail)
-
-        # Return a special dict representation
-        return {
-            'list_pattern': True,
-            'head': head_elements,
-            'tail': tail
-        }
+        return PartialList(head_elements, tail)
 
     def visit_list_comprehension(self, node):
         """Evaluate a list comprehension."""
@@ -628,6 +623,13 @@ class TraditionalInterpreter:
             result[key] = value
         return result
 
+    def _logical_constant(self, value):
+        """Convert an evaluated value to a logical constant, keeping numbers numeric"""
+        from .logical_engine import Term
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return Term(value, is_variable=False)
+        return Term(str(value), is_variable=False)
+
     def visit_function_call(self, node):
         """Visit a function call node"""
         # Check if this is a logical predicate call (contains logical variables)
@@ -647,18 +649,17 @@ class TraditionalInterpreter:
                     else:
                         # Regular variable - evaluate it
                         value = self.interpret(arg)
-                        logical_args.append(Term(str(value), is_variable=False))
+                        logical_args.append(self._logical_constant(value))
                 else:
                     # Evaluate the argument
                     value = self.interpret(arg)
-                    logical_args.append(Term(str(value), is_variable=False))
+                    logical_args.append(self._logical_constant(value))
 
             # Create a logical predicate and query it
             predicate = Predicate(node.name, logical_args)
-            solutions = self.logical_engine.query(predicate)
 
-            # Return True if there are solutions, False otherwise
-            return len(solutions) > 0
+            # Return True if there is a solution, stopping at the first one
+            return self.logical_engine.has_solution(predicate)
 
         # Check for built-in functions
         if node.name == 'len':
@@ -876,6 +877,32 @@ class TraditionalInterpreter:
             elif node.name == 'retractall':
                 return self.logical_engine.retractall(arg)
 
+        # Logical programming: table(name, arity) declares a tabled predicate,
+        # unless the program defines its own table() function
+        elif node.name == 'table' and node.name not in self.functions:
+            if self.logical_engine is None:
+                raise RuntimeError("table() requires a logical engine")
+            args = [self.interpret(arg) for arg in node.arguments]
+            if len(args) != 2:
+                raise RuntimeError("table() takes a predicate name and an arity")
+            self.logical_engine.table(args[0], args[1])
+            return True
+
+        # Logical programming: load_facts(path) for a .by knowledge base, or
+        # load_facts(path, predicate, columns?) for a CSV/TSV/JSONL file,
+        # unless the program defines its own load_facts() function
+        elif node.name == 'load_facts' and node.name not in self.functions:
+            if self.logical_engine is None:
+                raise RuntimeError("load_facts() requires a logical engine")
+            args = [self.interpret(arg) for arg in node.arguments]
+            options = {name: self.interpret(value)
+                       for name, value in (getattr(node, 'named_arguments', None) or {}).items()}
+            if len(args) == 1:
+                return self.logical_engine.load_facts_file(args[0], **options)
+            if len(args) in (2, 3):
+                return self.logical_engine.ingest_file(*args, **options)
+            raise RuntimeError("load_facts() takes a path, then a predicate name and columns for tabular files")
+
         # Check if this is a class (object instantiation)
         if node.name in self.classes:
             args = [self.interpret(arg) for arg in node.arguments]
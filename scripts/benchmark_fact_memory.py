@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for logical facts: bytes per fact.
+Usage:
+  python3 scripts/benchmark_fact_memory.py [--facts=100000]
+
+Compares the __slots__-based Term/Predicate/Fact classes of the logical
+engine with equivalent plain classes (per-instance __dict__, the previous
+layout), and reports the cost of a fact once stored in a LogicalEngine.
+"""
+import os
+import sys
+import argparse
+import gc
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(REPO_DIR, '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+class DictTerm:
+    """Term with a per-instance __dict__ (previous layout)"""
+    def __init__(self, value, is_variable=False):
+        self.value = value
+        self.is_variable = is_variable
+
+
+class DictPredicate:
+    """Predicate with a per-instance __dict__ (previous layout)"""
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+
+class DictFact:
+    """Fact with a per-instance __dict__ (previous layout)"""
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+
+def measure(make):
+    """Return (result, bytes allocated by make())"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = make()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure bytes per logical fact')
+    ap.add_argument('--facts', type=int, default=100000, help='Number of facts to build (default: 100000)')
+    args = ap.parse_args()
+    count = args.facts
+
+    # The argument strings are shared by both layouts, so build them first
+    names = [f'letter{i}' for i in range(count)]
+
+    def plain():
+        return [DictFact(DictPredicate('articulation', [DictTerm(names[i]), DictTerm(i % 7)]))
+                for i in range(count)]
+
+    def slotted():
+        return [Fact(Predicate('articulation', [Term(names[i]), Term(i % 7)])) for i in range(count)]
+
+    def stored():
+        engine = LogicalEngine()
+        for fact in slotted():
+            engine.add_fact(fact)
+        return engine
+
+    rows = []
+    for label, make in [('plain classes (before)', plain),
+                        ('__slots__ classes (after)', slotted),
+                        ('stored in LogicalEngine', stored)]:
+        result, size = measure(make)
+        rows.append((label, size / count))
+        del result
+
+    print(f"Facts: {count}")
+    for label, per_fact in rows:
+        print(f"  {label:<28} {per_fact:8.1f} bytes/fact")
+    print(f"  saving per fact: {rows[0][1] - rows[1][1]:.1f} bytes "
+          f"({100 * (1 - rows[1][1] / rows[0][1]):.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
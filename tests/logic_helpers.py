@@ -0,0 +1,33 @@
+"""
+Shared helpers for the logical engine tests
+أدوات مشتركة لاختبارات المحرك المنطقي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.logical_engine import Rule, Term
+
+
+def var(name):
+    """Return the logical variable ?name"""
+    return Term(name, is_variable=True)
+
+
+def parse_goal(code):
+    """Parse a logical goal written in Bayan syntax"""
+    return HybridParser(HybridLexer(code).tokenize()).parse_logical_goal()
+
+
+def parse_rule(code):
+    """Parse a rule written in Bayan syntax into a Rule"""
+    parsed = HybridParser(HybridLexer(code).tokenize()).parse_rule()
+    return Rule(parsed.head, parsed.body)
+
+
+def values(solutions, name):
+    """Return the plain value bound to name in each solution"""
+    return [s.bindings[name].value for s in solutions]
@@ -0,0 +1,109 @@
+"""
+Tests for the aggregate_all/3 built-in
+اختبارات المسند المدمج aggregate_all/3
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, standard_order_key
+from bayan.ast_nodes import BinaryOp
+from tests.logic_helpers import var
+
+
+def build_engine():
+    engine = LogicalEngine()
+    for name, dept, salary in [('ali', 'eng', 100), ('sara', 'eng', 120),
+                               ('omar', 'ops', 90), ('huda', 'eng', 120)]:
+        engine.add_fact(Fact(Predicate('salary', [Term(name), Term(dept), Term(salary)])))
+    return engine
+
+
+def exists(names, goal):
+    for name in reversed(names):
+        goal = Predicate('^', [var(name), goal])
+    return goal
+
+
+def aggregate(engine, spec, goal):
+    query = Predicate('aggregate_all', [spec, goal, var('R')])
+    return [s.bindings.get('R') for s in engine.query(query)]
+
+
+def test_scalar_aggregates():
+    """Test count, sum, max, min and avg over all solutions"""
+    engine = build_engine()
+    goal = exists(['N'], Predicate('salary', [var('N'), Term('eng'), var('S')]))
+    assert aggregate(engine, Term('count'), exists(['S'], goal)) == [3]
+    assert aggregate(engine, Predicate('sum', [var('S')]), goal) == [340]
+    assert aggregate(engine, Predicate('max', [var('S')]), goal) == [120]
+    assert aggregate(engine, Predicate('min', [var('S')]), goal) == [100]
+    assert aggregate(engine, Predicate('avg', [var('S')]), goal) == [340 / 3]
+    assert aggregate(engine, Predicate('sum', [BinaryOp('*', var('S'), Term(2))]), goal) == [680]
+
+
+def test_bag_and_set():
+    """Test bag keeps every value in order and set sorts without duplicates"""
+    engine = build_engine()
+    goal = exists(['N'], Predicate('salary', [var('N'), Term('eng'), var('S')]))
+    assert aggregate(engine, Predicate('bag', [var('S')]), goal) == [[100, 120, 120]]
+    assert aggregate(engine, Predicate('set', [var('S')]), goal) == [[100, 120]]
+
+
+def test_empty_goal():
+    """Test the results over no solutions"""
+    engine = build_engine()
+    goal = exists(['N'], Predicate('salary', [var('N'), Term('hr'), var('S')]))
+    assert aggregate(engine, Term('count'), exists(['S'], goal)) == [0]
+    assert aggregate(engine, Predicate('sum', [var('S')]), goal) == [0]
+    assert aggregate(engine, Predicate('bag', [var('S')]), goal) == [[]]
+    assert aggregate(engine, Predicate('max', [var('S')]), goal) == []
+    assert aggregate(engine, Predicate('avg', [var('S')]), goal) == []
+
+
+def test_free_variables_group_results():
+    """Test one result per binding of a free variable, in standard order"""
+    engine = build_engine()
+    query = Predicate('aggregate_all', [
+        Predicate('sum', [var('S')]),
+        exists(['N'], Predicate('salary', [var('N'), var('D'), var('S')])),
+        var('Total')])
+    solutions = engine.query(query)
+    assert [(s.bindings['D'].value, s.bindings['Total']) for s in solutions] == [('eng', 340), ('ops', 90)]
+
+    # Without ^ the name is free as well, giving one group per employee
+    query.args[1] = Predicate('salary', [var('N'), var('D'), var('S')])
+    assert len(engine.query(query)) == 4
+
+
+def test_used_inside_a_rule():
+    """Test aggregate_all as a body goal with the outer variables bound"""
+    engine = build_engine()
+    engine.add_rule(Rule(
+        Predicate('headcount', [var('D'), var('C')]),
+        [Predicate('aggregate_all', [
+            Term('count'), exists(['N', 'S'], Predicate('salary', [var('N'), var('D'), var('S')])), var('C')])]
+    ))
+    solutions = engine.query(Predicate('headcount', [Term('eng'), var('C')]))
+    assert [s.bindings['C'] for s in solutions] == [3]
+
+
+def test_errors():
+    """Test unknown specifications and non-numeric sums"""
+    engine = build_engine()
+    goal = exists(['N', 'D'], Predicate('salary', [var('N'), var('D'), var('S')]))
+    with pytest.raises(RuntimeError):
+        aggregate(engine, Predicate('median', [var('S')]), goal)
+    with pytest.raises(TypeError):
+        aggregate(engine, Predicate('sum', [var('N')]), exists(['S'], Predicate('salary', [var('N'), Term('ops'), var('S')])))
+
+
+def test_standard_order():
+    """Test the total order used by set and max/min"""
+    terms = [Predicate('f', [Term('a')]), Term('b'), [1, 2], Term(2), Term(1.0), var('X'), Term(1), 'a']
+    ordered = sorted(terms, key=standard_order_key)
+    assert ordered == [var('X'), Term(1.0), Term(1), Term(2), 'a', Term('b'),
+                       Predicate('f', [Term('a')]), [1, 2]]
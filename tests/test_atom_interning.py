@@ -0,0 +1,119 @@
+"""
+Tests for interned atoms and hash-consed ground terms
+اختبارات الذرات المُوحَّدة والحدود الثابتة المشتركة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution, Atom, AtomTable
+from bayan.ast_nodes import IsExpression, BinaryOp
+from tests.logic_helpers import var
+
+
+def test_constants_get_one_atom_each():
+    """Test that equal constants map to the same Atom and ID"""
+    table = AtomTable()
+    first = table.atom('شفتان')
+    assert table.atom('شفتان') is first
+    assert table.atom('lips') is not first
+    assert [atom.atom_id for atom in table.atoms] == [0, 1]
+    assert table.atom(1) is not table.atom('1')
+
+
+def test_identical_facts_share_structure():
+    """Test that stored ground facts are hash-consed"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('articulation', [Term('ب'), Term('lips')])))
+    engine.add_fact(Fact(Predicate('articulation', [Term('ب'), Term('lips')])))
+    engine.add_fact(Fact(Predicate('articulation', [Term('م'), Term('lips')])))
+
+    first, second, third = engine.knowledge_base['articulation']
+    assert first.predicate is second.predicate
+    assert first.predicate.args[1] is third.predicate.args[1]
+    assert isinstance(third.predicate.args[0], Atom)
+    assert len(engine.atoms) == 3
+
+
+def test_unify_compares_atoms_by_identity(monkeypatch):
+    """Test that unifying interned constants never compares their values"""
+    engine = LogicalEngine()
+    for letter in ['ب', 'م', 'ت']:
+        engine.add_fact(Fact(Predicate('letter', [Term(letter), Term('known')])))
+    goal = engine.atoms.intern(Predicate('letter', [var('L'), Term('known')]))
+
+    def no_compare(self, other):
+        raise AssertionError("atom values compared")
+    monkeypatch.setattr(Term, '__eq__', no_compare)
+
+    assert len(list(engine.solve_iter(goal))) == 3
+    assert engine._unify(engine.atoms.atom('ب'), engine.atoms.atom('م'), Substitution()) is None
+
+
+def test_parsed_programs_are_interned():
+    """Test that facts loaded from Bayan code share their constants"""
+    code = """
+hybrid {
+    مخرج_حرف("ب", "lips").
+    مخرج_حرف("م", "lips").
+}
+"""
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    facts = interpreter.logical.knowledge_base['مخرج_حرف']
+    assert facts[0].predicate.args[1] is facts[1].predicate.args[1]
+
+    goal = Predicate('مخرج_حرف', [var('x'), Term('lips')])
+    assert [s.bindings['x'].value for s in interpreter.logical.query(goal)] == ['ب', 'م']
+
+
+def test_atoms_from_another_engine_unify():
+    """Test that an engine accepts equal constants interned by another engine"""
+    first = LogicalEngine()
+    second = LogicalEngine()
+    second.add_fact(Fact(Predicate('padding', [Term('zzz')])))
+    fact = Fact(Predicate('r', [Term('a')]))
+    first.add_fact(fact)
+    second.add_fact(fact)
+    assert second.has_solution(Predicate('r', [Term('a')]))
+
+    answer = first.query(Predicate('r', [var('X')]))[0].bindings['X']
+    assert second.has_solution(Predicate('r', [answer]))
+    assert second._unify(answer, second.atoms.atom('a'), Substitution()) is not None
+
+
+def test_queries_do_not_grow_the_table():
+    """Test that querying with new constants adds no atoms or shared predicates"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('p', [Term('a'), Term(1)])))
+    atoms, predicates = len(engine.atoms), len(engine.atoms.predicates)
+    for i in range(200):
+        assert engine.query(Predicate('p', [Term(f'k{i}'), var('X')])) == []
+        assert not engine.has_solution(Predicate('p', [Term('a'), Term(i + 2)]))
+    assert (len(engine.atoms), len(engine.atoms.predicates)) == (atoms, predicates)
+    assert engine.has_solution(Predicate('p', [Term('a'), Term(1)]))
+
+
+def test_computed_values_do_not_grow_the_table():
+    """Test that values computed by is/2 and collected by findall/3 are not interned"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('known', [Term(9)])))
+    engine.add_rule(Rule(
+        Predicate('sq', [var('X'), var('Y')]),
+        [IsExpression(var('Y'), BinaryOp('*', var('X'), var('X')))]
+    ))
+    atoms = len(engine.atoms)
+    for k in range(300):
+        goal = Predicate('findall', [var('Y'), Predicate('sq', [Term(k), var('Y')]), var('L')])
+        assert engine.query(goal)[0].bindings['L'] == [k * k]
+    assert len(engine.atoms) == atoms
+
+    # A computed value that a fact uses still matches the stored atom
+    engine.add_rule(Rule(Predicate('square_known', [var('X')]),
+                         [Predicate('sq', [var('X'), var('Y')]), Predicate('known', [var('Y')])]))
+    assert engine.has_solution(Predicate('square_known', [Term(3)]))
+    assert not engine.has_solution(Predicate('square_known', [Term(4)]))
@@ -0,0 +1,72 @@
+"""
+Tests for bagof/setof grouping by free variables and ^ quantification
+اختبارات تجميع bagof/setof حسب المتغيرات الحرة والتكميم الوجودي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+from tests.logic_helpers import var, parse_goal, parse_rule
+
+
+def build_engine():
+    engine = LogicalEngine()
+    for parent, child in [('tom', 'liz'), ('ann', 'bob'), ('tom', 'bob'), ('tom', 'liz')]:
+        engine.add_fact(Fact(Predicate('parent', [Term(parent), Term(child)])))
+    return engine
+
+
+def groups(engine, goal, key, result='L'):
+    return [(s.bindings[key].value, s.bindings[result]) for s in engine.query(goal)]
+
+
+def test_bagof_groups_by_free_variables():
+    """Test one bag per parent, in standard order of the parent"""
+    engine = build_engine()
+    goal = Predicate('bagof', [var('C'), Predicate('parent', [var('P'), var('C')]), var('L')])
+    assert groups(engine, goal, 'P') == [('ann', ['bob']), ('tom', ['liz', 'bob', 'liz'])]
+
+
+def test_setof_groups_and_sorts():
+    """Test that setof sorts and deduplicates within each group"""
+    engine = build_engine()
+    goal = Predicate('setof', [var('C'), Predicate('parent', [var('P'), var('C')]), var('L')])
+    assert groups(engine, goal, 'P') == [('ann', ['bob']), ('tom', ['bob', 'liz'])]
+
+
+def test_existential_quantification():
+    """Test that Var^Goal collects across the quantified variable"""
+    engine = build_engine()
+    goal = Predicate('setof', [var('C'), Predicate('^', [var('P'), Predicate('parent', [var('P'), var('C')])]), var('L')])
+    solutions = engine.query(goal)
+    assert [s.bindings['L'] for s in solutions] == [['bob', 'liz']]
+    assert 'P' not in solutions[0].bindings
+
+
+def test_bound_variables_do_not_group():
+    """Test that a variable bound before the call selects one group"""
+    engine = build_engine()
+    engine.add_rule(parse_rule('children(?P, ?L) :- bagof(?C, parent(?P, ?C), ?L).'))
+    solutions = engine.query(Predicate('children', [Term('tom'), var('L')]))
+    assert [s.bindings['L'] for s in solutions] == [['liz', 'bob', 'liz']]
+
+
+def test_parsed_goals():
+    """Test nested goals and ^ in the logical term syntax"""
+    goal = parse_goal('setof(?C, ?P^parent(?P, ?C), ?L)')
+    assert goal.name == 'setof'
+    assert goal.args[1] == Predicate('^', [var('P'), Predicate('parent', [var('P'), var('C')])])
+
+    engine = build_engine()
+    assert [s.bindings['L'] for s in engine.query(goal)] == [['bob', 'liz']]
+
+
+def test_setof_orders_mixed_terms():
+    """Test that setof sorts values of mixed types in standard order"""
+    engine = LogicalEngine()
+    for value in [Term('b'), Term(2), Predicate('f', [Term(1)]), Term(1.5), Term('a'), Term(2)]:
+        engine.add_fact(Fact(Predicate('item', [value])))
+    goal = Predicate('setof', [var('X'), Predicate('item', [var('X')]), var('L')])
+    assert engine.query(goal)[0].bindings['L'] == [1.5, 2, 'a', 'b', Predicate('f', [Term(1)])]
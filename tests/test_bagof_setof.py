@@ -175,7 +175,9 @@ def test_setof_for_data_analysis():
     # Get all students who took math (sorted)
     goal = Predicate('setof', [
         Term('Student', is_variable=True),
-        Predicate('grade', [Term('Student', is_variable=True), Term('math'), Term('G', is_variable=True)]),
+        # ^ keeps the grade from grouping the students
+        Predicate('^', [Term('G', is_variable=True),
+                        Predicate('grade', [Term('Student', is_variable=True), Term('math'), Term('G', is_variable=True)])]),
         Term('Students', is_variable=True)
     ])
     solutions = engine.query(goal)
@@ -198,7 +200,9 @@ def test_bagof_for_ml_feature_collection():
     # Collect all feature values for sample1
     goal = Predicate('bagof', [
         Term('Value', is_variable=True),
-        Predicate('feature', [Term('sample1'), Term('F', is_variable=True), Term('Value', is_variable=True)]),
+        # ^ collects across feature names instead of grouping by them
+        Predicate('^', [Term('F', is_variable=True),
+                        Predicate('feature', [Term('sample1'), Term('F', is_variable=True), Term('Value', is_variable=True)])]),
         Term('Features', is_variable=True)
     ])
     solutions = engine.query(goal)
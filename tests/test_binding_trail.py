@@ -0,0 +1,113 @@
+"""
+Tests for the trail-based binding store
+اختبارات مخزن الروابط مع سجل التراجع
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution, ResolutionLimitError
+from tests.logic_helpers import var
+
+
+def test_undo_pops_back_to_mark():
+    """Test that undo removes exactly the bindings made after a mark"""
+    sub = Substitution()
+    sub.bind('X', Term('a'))
+    mark = sub.mark()
+    sub.bind('Y', Term('b'))
+    sub.bind('Z', Term('c'))
+
+    sub.undo(mark)
+    assert sub.bindings == {'X': Term('a')}
+    assert sub.trail == ['X']
+
+
+def test_query_does_not_copy_bindings(monkeypatch):
+    """Test that backtracking never copies the binding store"""
+    def no_copy(self):
+        raise AssertionError("Substitution.copy() called during a query")
+
+    engine = LogicalEngine()
+    for parent, child in [('tom', 'bob'), ('tom', 'liz'), ('bob', 'ann'), ('bob', 'pat')]:
+        engine.add_fact(Fact(Predicate('parent', [Term(parent), Term(child)])))
+    engine.add_rule(Rule(
+        Predicate('grandparent', [var('X'), var('Z')]),
+        [Predicate('parent', [var('X'), var('Y')]), Predicate('parent', [var('Y'), var('Z')])]
+    ))
+
+    monkeypatch.setattr(Substitution, 'copy', no_copy)
+    solutions = engine.query(Predicate('grandparent', [Term('tom'), var('G')]))
+    assert [s.bindings['G'].value for s in solutions] == ['ann', 'pat']
+
+
+def test_solutions_only_hold_query_variables():
+    """Test that rule variables do not leak into or clobber the answers"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('q', [Term('a'), Term('b')])))
+    engine.add_rule(Rule(
+        Predicate('p', [var('X')]),
+        [Predicate('q', [var('X'), var('Y')])]
+    ))
+
+    solutions = engine.query(Predicate('p', [var('Y')]))
+    assert len(solutions) == 1
+    assert solutions[0].bindings == {'Y': Term('a')}
+
+
+def test_passed_substitution_is_restored():
+    """Test that query() leaves a caller's substitution as it found it"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('color', [Term('red'), Term('warm')])))
+    engine.add_fact(Fact(Predicate('color', [Term('blue'), Term('cold')])))
+
+    sub = Substitution()
+    sub.bind('T', Term('cold'))
+    solutions = engine.query(Predicate('color', [var('C'), var('T')]), sub)
+
+    assert [s.bindings['C'].value for s in solutions] == ['blue']
+    assert solutions[0].bindings['T'].value == 'cold'
+    assert sub.bindings == {'T': Term('cold')}
+
+
+def test_caller_substitution_survives_early_exit():
+    """Test that stopping a query early or exceeding its budget leaves the caller's substitution alone"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('p', [Term(1), Term('a')])))
+    engine.add_fact(Fact(Predicate('p', [Term(1), Term('b')])))
+    engine.add_rule(Rule(Predicate('loop', [var('X')]), [Predicate('loop', [var('X')])]))
+
+    sub = Substitution({'X': Term(1)})
+    solution = next(engine.solve_iter(Predicate('p', [var('X'), var('Y')]), sub))
+    assert solution.bindings['Y'] == Term('a')
+    assert sub.bindings == {'X': Term(1)} and sub.trail == []
+
+    engine.max_steps = 100
+    with pytest.raises(ResolutionLimitError):
+        engine.query(Predicate('loop', [var('Z')]), sub)
+    assert sub.bindings == {'X': Term(1)} and sub.trail == []
+
+
+def test_hybrid_query_results():
+    """Test that query results in Bayan code are plain dicts of query variables"""
+    code = """
+hybrid {
+    parent("john", "mary").
+    parent("mary", "susan").
+    grandparent(?X, ?Z) :- parent(?X, ?Y), parent(?Y, ?Z).
+}
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(ast)
+
+    goal = Predicate('grandparent', [Term('john'), var('Who')])
+    results = interpreter.interpret(HybridParser(HybridLexer('query grandparent("john", ?Who).').tokenize()).parse())
+    assert results == [{'Who': Term('susan')}]
+    assert interpreter.logical.query(goal)[0].lookup('Who').value == 'susan'
@@ -0,0 +1,143 @@
+"""
+Tests for bulk loading facts with deferred index construction
+اختبارات التحميل المجمّع للحقائق مع تأجيل بناء الفهارس
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, ColumnStore
+from tests.logic_helpers import var, values
+
+
+def edge(a, b):
+    return Fact(Predicate('edge', [Term(a), Term(b)]))
+
+
+def test_report_and_queries():
+    """Test the load report and that loaded facts answer queries in order"""
+    engine = LogicalEngine()
+    report = engine.bulk_load([edge(1, 2), edge(1, 3), edge(2, 3)], batch_size=2)
+    assert report['facts'] == 3 and report['rules'] == 0 and report['predicates'] == 1
+    assert report['seconds'] >= 0 and report['facts_per_second'] > 0
+    assert values(engine.query(Predicate('edge', [Term(1), var('Y')])), 'Y') == [2, 3]
+
+
+def test_indexes_built_once_at_the_end():
+    """Test that the clause index covers every loaded fact, including earlier ones"""
+    engine = LogicalEngine()
+    engine.add_fact(edge(0, 1))
+    engine.bulk_load(edge(i, i + 1) for i in range(1, 50))
+    index = engine.indexes['edge']
+    assert len(index.entries) == 50
+    assert [clause.predicate.args[1].value for clause in index.arguments[0].lookup(engine.atoms.atom(7).atom_id)] == [8]
+    assert values(engine.query(Predicate('edge', [Term(49), var('Y')])), 'Y') == [50]
+
+
+def test_large_ground_predicates_go_to_columns():
+    """Test that ground facts past the threshold are stored in columns"""
+    engine = LogicalEngine()
+    engine.columnar_threshold = 100
+    engine.bulk_load((edge(i, i % 10) for i in range(1000)), batch_size=64)
+    store = engine.knowledge_base['edge']
+    assert isinstance(store, ColumnStore) and len(store) == 1000
+    assert 'edge' not in engine.indexes
+    assert len(engine.query(Predicate('edge', [var('X'), Term(3)]))) == 100
+
+    # A non-ground fact moves the predicate back to rows
+    engine.bulk_load([Fact(Predicate('edge', [var('A'), Term('any')]))])
+    assert isinstance(engine.knowledge_base['edge'], list)
+    assert values(engine.query(Predicate('edge', [Term(5000), var('Y')])), 'Y') == ['any']
+
+
+def test_rules_and_invalidation():
+    """Test rules in the load and that cached answers and generations are refreshed"""
+    engine = LogicalEngine()
+    engine.bulk_load([edge(1, 2)])
+    goal = Predicate('path', [Term(1), var('Y')])
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    assert values(engine.query(goal), 'Y') == [2]
+
+    generation = engine.generations['edge']
+    report = engine.bulk_load([
+        edge(2, 3),
+        Rule(Predicate('path', [var('X'), var('Z')]),
+             [Predicate('edge', [var('X'), var('Y')]), Predicate('path', [var('Y'), var('Z')])]),
+        edge(3, 4),
+    ])
+    assert report['facts'] == 2 and report['rules'] == 1 and report['predicates'] == 2
+    assert engine.generations['edge'] == generation + 1
+    assert values(engine.query(goal), 'Y') == [2, 3, 4]
+
+
+def test_rejects_other_objects():
+    """Test that only facts and rules are accepted, and earlier batches stay usable"""
+    engine = LogicalEngine()
+    with pytest.raises(TypeError):
+        engine.bulk_load([edge(1, 2), Predicate('edge', [Term(2), Term(3)])], batch_size=1)
+    assert values(engine.query(Predicate('edge', [Term(1), var('Y')])), 'Y') == [2]
+
+
+def test_load_facts_file(tmp_path):
+    """Test loading a .by knowledge base in chunks of lines"""
+    path = tmp_path / 'letters.by'
+    path.write_text(
+        '# Letters\n'
+        'مخرج_حرف("الحلق", "throat").\n'
+        'مخرج_حرف("الشفتان", "lips").\n'
+        '\n'
+        'حرف("ب", "الشفتان",\n'
+        '    "خط أفقي").\n'
+        'حرف("ح", "الحلق", "دائرة").\n'
+        'rule من_مخرج(?ح, ?م) :- حرف(?ح, ?ن, ?_), مخرج_حرف(?ن, ?م).\n',
+        encoding='utf-8')
+    engine = LogicalEngine()
+    report = engine.load_facts_file(str(path), batch_size=2, chunk_lines=2)
+    assert report['facts'] == 4 and report['rules'] == 1 and report['path'] == str(path)
+    assert values(engine.query(Predicate('من_مخرج', [var('L'), Term('lips')])), 'L') == ['ب']
+
+
+def test_load_facts_file_cuts_chunks_at_clause_ends(tmp_path):
+    """Test that comments and strings ending in '.' do not split a clause across chunks"""
+    path = tmp_path / 'rules.by'
+    path.write_text(
+        'note("ends with a dot.").\n'
+        'rule greet(?X) :-\n'
+        '    # only people are greeted.\n'
+        '    person(?X),\n'
+        '    note("hello.\n'
+        'world.").\n'
+        'person("ali").\n',
+        encoding='utf-8')
+    engine = LogicalEngine()
+    report = engine.load_facts_file(str(path), chunk_lines=1)
+    assert report['facts'] == 2 and report['rules'] == 1
+    assert engine.query(Predicate('greet', [Term('ali')])) == []
+    engine.add_fact(Fact(Predicate('note', [Term('hello.\nworld.')])))
+    assert values(engine.query(Predicate('greet', [var('X')])), 'X') == ['ali']
+
+
+def test_load_facts_file_rejects_statements(tmp_path):
+    """Test that a file with program statements is refused"""
+    path = tmp_path / 'program.by'
+    path.write_text('x = 1\n', encoding='utf-8')
+    with pytest.raises(SyntaxError):
+        LogicalEngine().load_facts_file(str(path))
+
+
+def test_atoms_from_another_engine():
+    """Test loading facts built from another engine's answers into column storage"""
+    source = LogicalEngine()
+    source.add_fact(Fact(Predicate('q', [Term('q1'), Term('q2'), Term('q3')])))
+    source.add_fact(Fact(Predicate('p', [Term('x'), Term('y'), Term('z')])))
+    answer = source.query(Predicate('p', [var('A'), var('B'), var('C')]))[0].bindings
+
+    engine = LogicalEngine()
+    engine.columnar_threshold = 1
+    engine.bulk_load([Fact(Predicate('copy', [answer['A'], answer['B'], answer['C']]))])
+    assert isinstance(engine.knowledge_base['copy'], ColumnStore)
+    solutions = engine.query(Predicate('copy', [var('A'), var('B'), var('C')]))
+    assert [s.bindings[name].value for name in 'ABC' for s in solutions] == ['x', 'y', 'z']
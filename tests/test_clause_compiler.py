@@ -0,0 +1,79 @@
+"""
+Tests for rules compiled into head matchers and tagged body goals
+اختبارات ترجمة القواعد إلى دوال مطابقة وأهداف مصنفة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Rule, Predicate, Term, Substitution
+from bayan.logical_engine import _CALL, _CUT, _IS, _COMPARE, _BUILTIN
+from bayan.ast_nodes import Cut, IsExpression, BinaryOp
+from tests.logic_helpers import var
+
+
+def test_rules_are_compiled_when_added():
+    """Test that add_rule compiles the clause and tags each body goal"""
+    engine = LogicalEngine()
+    rule = Rule(Predicate('r', [var('X'), var('Y')]), [
+        Predicate('p', [var('X')]),
+        Predicate('_compare_>', [var('X'), Term(0)]),
+        IsExpression(var('Y'), BinaryOp('+', var('X'), Term(1))),
+        Predicate('not', [Predicate('q', [var('X')])]),
+        Cut(),
+    ])
+    engine.add_rule(rule)
+    template = rule._template
+    assert template is not None
+    assert [kind for kind, _ in template.body_steps] == [_CALL, _COMPARE, _IS, _BUILTIN, _CUT]
+
+
+def test_retract_drops_the_compiled_form():
+    """Test that retracting a rule invalidates its cached compilation"""
+    engine = LogicalEngine()
+    rule = Rule(Predicate('r', [var('X')]), [Predicate('p', [var('X')])])
+    engine.add_rule(rule)
+    assert rule._template is not None
+    assert engine.retract(Predicate('r', [var('Any')]))
+    assert rule._template is None
+
+
+def test_head_variables_alias_goal_arguments():
+    """Test that first head occurrences reuse the goal's terms instead of fresh variables"""
+    engine = LogicalEngine()
+    rule = Rule(Predicate('r', [var('X'), var('Y')]), [Predicate('p', [var('X'), var('Z')])])
+    engine.add_rule(rule)
+    goal = Predicate('r', [Term('a'), var('Out')])
+    frame = rule._template.match_head(engine, goal, Substitution())
+    names = rule._template.var_names
+    assert frame[names.index('X')] is goal.args[0]
+    assert frame[names.index('Y')] is goal.args[1]
+    assert frame[names.index('Z')].is_variable and frame[names.index('Z')].value.startswith('Z#')
+
+
+def test_repeated_and_compound_head_arguments():
+    """Test heads with a repeated variable, a constant and a nested predicate"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('same', [var('X'), var('X')]), []))
+    engine.add_rule(Rule(Predicate('wrap', [Predicate('box', [var('X')]), Term('tag'), var('X')]), []))
+
+    assert engine.has_solution(Predicate('same', [Term('a'), Term('a')]))
+    assert not engine.has_solution(Predicate('same', [Term('a'), Term('b')]))
+    solutions = engine.query(Predicate('wrap', [var('B'), Term('tag'), Term(3)]))
+    assert solutions[0].bindings['B'] == Predicate('box', [Term(3)])
+    assert engine.query(Predicate('wrap', [var('B'), Term('other'), Term(3)])) == []
+    assert engine.query(Predicate('same', [Term('a')])) == []
+
+
+def test_compiled_rules_solve_recursion():
+    """Test a recursive rule with a guard and arithmetic through the compiled path"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('count', [Term(0), Term('done')]), []))
+    engine.add_rule(Rule(Predicate('count', [var('N'), var('R')]), [
+        Predicate('_compare_>', [var('N'), Term(0)]),
+        IsExpression(var('M'), BinaryOp('-', var('N'), Term(1))),
+        Predicate('count', [var('M'), var('R')]),
+    ]))
+    solutions = engine.query(Predicate('count', [Term(500), var('R')]))
+    assert [s.bindings['R'].value for s in solutions] == ['done']
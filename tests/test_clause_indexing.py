@@ -0,0 +1,84 @@
+"""
+Tests for first-argument clause indexing
+اختبارات فهرسة البنود حسب المعامل الأول
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+
+
+def letter(char, number):
+    return Fact(Predicate('letter', [Term(char), Term(number)]))
+
+
+def test_bound_first_argument_uses_bucket():
+    """Test that a bound first argument only visits its bucket"""
+    engine = LogicalEngine()
+    for i in range(100):
+        engine.add_fact(letter(f'c{i}', i))
+
+    goal = Predicate('letter', [Term('c42'), Term('N', is_variable=True)])
+    assert engine._clauses_for(goal) == [engine.knowledge_base['letter'][42]]
+
+    solutions = engine.query(goal)
+    assert len(solutions) == 1
+    assert solutions[0].bindings['N'].value == 42
+
+
+def test_variable_first_argument_clauses_keep_order():
+    """Test that clauses with a variable first argument are merged in order"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('p', [Term('a'), Term(1)])))
+    engine.add_fact(Fact(Predicate('p', [Term('X', is_variable=True), Term(2)])))
+    engine.add_fact(Fact(Predicate('p', [Term('b'), Term(3)])))
+    engine.add_fact(Fact(Predicate('p', [Term('a'), Term(4)])))
+    engine.asserta(Fact(Predicate('p', [Term('a'), Term(0)])))
+
+    goal = Predicate('p', [Term('a'), Term('V', is_variable=True)])
+    values = [s.bindings['V'].value for s in engine.query(goal)]
+    assert values == [0, 1, 2, 4]
+
+
+def test_rules_are_indexed():
+    """Test that rule heads are indexed like facts"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('parent', [Term('tom'), Term('bob')])))
+    engine.add_fact(Fact(Predicate('parent', [Term('bob'), Term('ann')])))
+    engine.add_rule(Rule(
+        Predicate('ancestor', [Term('X', is_variable=True), Term('Y', is_variable=True)]),
+        [Predicate('parent', [Term('X', is_variable=True), Term('Y', is_variable=True)])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('ancestor', [Term('root'), Term('tom')]),
+        [Predicate('parent', [Term('tom'), Term('bob')])]
+    ))
+
+    root_goal = Predicate('ancestor', [Term('root'), Term('Y', is_variable=True)])
+    assert engine._clauses_for(root_goal) == engine.knowledge_base['ancestor']
+
+    goal = Predicate('ancestor', [Term('tom'), Term('Y', is_variable=True)])
+    assert engine._clauses_for(goal) == engine.knowledge_base['ancestor'][:1]
+    solutions = engine.query(goal)
+    assert [s.lookup('Y').value for s in solutions] == ['bob']
+
+
+def test_retract_keeps_index_in_sync():
+    """Test that retract and retractall update the index"""
+    engine = LogicalEngine()
+    engine.add_fact(letter('a', 1))
+    engine.add_fact(letter('a', 2))
+    engine.add_fact(letter('b', 3))
+
+    assert engine.retract(Predicate('letter', [Term('a'), Term(1)]))
+    goal = Predicate('letter', [Term('a'), Term('N', is_variable=True)])
+    assert [s.bindings['N'].value for s in engine.query(goal)] == [2]
+
+    assert engine.retractall(Predicate('letter', [Term('a'), Term('N', is_variable=True)])) == 1
+    assert engine.query(goal) == []
+    assert 'a' not in engine.indexes['letter'].arguments[0].buckets
+
+    engine.assertz(letter('a', 5))
+    assert [s.bindings['N'].value for s in engine.query(goal)] == [5]
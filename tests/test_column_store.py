@@ -0,0 +1,141 @@
+"""
+Tests for the columnar fact store
+اختبارات مخزن الحقائق العمودي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, ColumnStore
+from tests.logic_helpers import var, values
+
+
+def letter(char, place):
+    return Fact(Predicate('letter', [Term(char), Term(place)]))
+
+
+PLACES = ['lips', 'teeth', 'throat', 'tongue']
+
+
+def build_engine(size=50, threshold=32):
+    engine = LogicalEngine()
+    engine.columnar_threshold = threshold
+    for i in range(size):
+        engine.add_fact(letter(f'c{i}', PLACES[i % 4]))
+    return engine
+
+
+def test_ground_predicate_moves_to_columns():
+    """Test that a predicate of ground facts becomes a ColumnStore at the threshold"""
+    engine = build_engine(size=31)
+    assert isinstance(engine.knowledge_base['letter'], list)
+    engine.add_fact(letter('c31', 'tongue'))
+
+    store = engine.knowledge_base['letter']
+    assert isinstance(store, ColumnStore)
+    assert 'letter' not in engine.indexes
+    assert len(store) == 32
+    assert store[5].predicate == Predicate('letter', [Term('c5'), Term('teeth')])
+    assert [f.predicate.args[0].value for f in store][:3] == ['c0', 'c1', 'c2']
+
+
+def test_queries_match_row_storage():
+    """Test that answers and their order are the same as with clause lists"""
+    columnar = build_engine()
+    rows = build_engine(threshold=None)
+    goals = [
+        Predicate('letter', [var('C'), Term('throat')]),
+        Predicate('letter', [Term('c7'), var('P')]),
+        Predicate('letter', [var('C'), var('P')]),
+        Predicate('letter', [Term('c7'), Term('lips')]),
+        Predicate('letter', [var('C'), Term('nowhere')]),
+    ]
+    for goal in goals:
+        expected = [s.bindings for s in rows.query(goal)]
+        assert [s.bindings for s in columnar.query(goal)] == expected
+
+
+def test_indexes_are_built_on_demand():
+    """Test that per-column indexes appear once a column is bound"""
+    engine = build_engine()
+    engine.query(Predicate('letter', [var('C'), Term('lips')]))
+    info = [i for i in engine.list_indexes() if i['predicate'] == 'letter']
+    assert [(i['position'], i['keys'], i['clauses']) for i in info] == [(1, 4, 50)]
+    assert info[0]['bytes'] > 0
+
+    # Each entry reports its own index, not the whole store
+    engine.query(Predicate('letter', [Term('c3'), var('P')]))
+    store = engine.knowledge_base['letter']
+    info = {i['position']: i['bytes'] for i in engine.list_indexes() if i['predicate'] == 'letter'}
+    assert info[0] != info[1]
+    columns = sum(column.buffer_info()[1] * column.itemsize for column in store.columns)
+    assert columns + info[0] + info[1] == store.memory_size()
+
+
+def test_assert_and_retract_on_columns():
+    """Test assertz, asserta, retract and retractall on a ColumnStore"""
+    engine = build_engine()
+    goal = Predicate('letter', [var('C'), Term('lips')])
+
+    engine.assertz(letter('late', 'lips'))
+    engine.asserta(letter('early', 'lips'))
+    assert engine.retract(Predicate('letter', [Term('c4'), var('P')]))
+    names = values(engine.query(goal), 'C')
+    assert names[0] == 'early' and names[-1] == 'late'
+    assert 'c4' not in names
+
+    assert engine.retractall(Predicate('letter', [var('C'), Term('teeth')])) == 13
+    assert engine.query(Predicate('letter', [var('C'), Term('teeth')])) == []
+    assert isinstance(engine.knowledge_base['letter'], ColumnStore)
+
+
+def test_rules_join_over_columns():
+    """Test rule bodies joining a columnar predicate"""
+    engine = build_engine()
+    engine.add_rule(Rule(
+        Predicate('same_place', [var('A'), var('B')]),
+        [Predicate('letter', [var('A'), var('P')]), Predicate('letter', [var('B'), var('P')])]
+    ))
+    solutions = engine.query(Predicate('same_place', [Term('c1'), var('B')]))
+    assert values(solutions, 'B') == [f'c{i}' for i in range(1, 50, 4)]
+
+
+def test_non_ground_clause_moves_back_to_rows():
+    """Test that adding a rule to a columnar predicate restores a clause list"""
+    engine = build_engine()
+    engine.add_rule(Rule(
+        Predicate('letter', [var('C'), Term('nasal')]),
+        [Predicate('letter', [var('C'), Term('lips')])]
+    ))
+    assert isinstance(engine.knowledge_base['letter'], list)
+    assert len(engine.query(Predicate('letter', [var('C'), Term('nasal')]))) == 13
+
+    engine.add_fact(letter('extra', 'lips'))
+    assert isinstance(engine.knowledge_base['letter'], list)
+
+
+def test_scans_see_the_facts_from_their_start():
+    """Test retracting and asserting during a scan, as a clause list behaves"""
+    for threshold in (2, None):
+        engine = LogicalEngine()
+        engine.columnar_threshold = threshold
+        for i in range(6):
+            engine.add_fact(Fact(Predicate('p', [Term(i)])))
+        assert isinstance(engine.knowledge_base['p'], ColumnStore) == (threshold is not None)
+
+        seen = []
+        for solution in engine.solve_iter(Predicate('p', [var('X')])):
+            seen.append(solution.bindings['X'].value)
+            engine.retract(Predicate('p', [solution.bindings['X']]))
+        assert seen == [0, 1, 2, 3, 4, 5]
+        assert len(engine.knowledge_base['p']) == 0
+
+        for i in range(3):
+            engine.add_fact(Fact(Predicate('p', [Term(i)])))
+        seen = []
+        for solution in engine.solve_iter(Predicate('p', [var('X')])):
+            seen.append(solution.bindings['X'].value)
+            if len(seen) == 1:
+                engine.asserta(Fact(Predicate('p', [Term(9)])))
+        assert seen == [0, 1, 2]
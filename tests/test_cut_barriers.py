@@ -0,0 +1,93 @@
+"""
+Tests for cut barriers: ! prunes the parent predicate's remaining clauses
+اختبارات حواجز القطع: القطع يلغي بقية بنود المسند الأب
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import Cut, IsExpression, BinaryOp
+from tests.logic_helpers import var
+
+
+def countdown_engine():
+    """count(0) :- !.  count(N) :- M is N - 1, count(M)."""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('count', [Term(0)]), [Cut()]))
+    engine.add_rule(Rule(Predicate('count', [var('N')]), [
+        IsExpression(var('M'), BinaryOp('-', var('N'), Term(1))),
+        Predicate('count', [var('M')]),
+    ]))
+    return engine
+
+
+def test_cut_skips_remaining_clauses():
+    """Test max/3: once the first clause commits, the second is never tried"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('max', [var('X'), var('Y'), var('X')]),
+                         [Predicate('_compare_>=', [var('X'), var('Y')]), Cut()]))
+    engine.add_rule(Rule(Predicate('max', [var('X'), var('Y'), var('Y')]), []))
+
+    solutions = engine.query(Predicate('max', [Term(5), Term(3), var('M')]))
+    assert [s.bindings['M'].value for s in solutions] == [5]
+    solutions = engine.query(Predicate('max', [Term(2), Term(3), var('M')]))
+    assert [s.bindings['M'].value for s in solutions] == [3]
+
+
+def test_cut_makes_recursion_terminate():
+    """Test that the base case's cut stops the recursive clause on backtracking"""
+    engine = countdown_engine()
+    engine.max_steps = 10000
+    assert len(engine.query(Predicate('count', [Term(1000)]))) == 1
+
+
+def test_deterministic_recursion_keeps_no_choice_points():
+    """Test that a cut-committed loop runs with a bounded choice point stack"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('loop', [var('N')]), [
+        Predicate('_compare_>', [var('N'), Term(0)]),
+        Cut(),
+        IsExpression(var('M'), BinaryOp('-', var('N'), Term(1))),
+        Predicate('loop', [var('M')]),
+    ]))
+    engine.add_rule(Rule(Predicate('loop', [var('Done')]), []))
+    sizes = []
+    resume = engine._resume
+
+    def recording_resume(choicepoints, substitution):
+        sizes.append(len(choicepoints))
+        return resume(choicepoints, substitution)
+
+    engine._resume = recording_resume
+    assert engine.has_solution(Predicate('loop', [Term(2000)]))
+    assert max(sizes) <= 2
+
+
+def test_cut_does_not_reach_the_caller():
+    """Test that a cut inside a called predicate leaves the caller's choices alone"""
+    engine = LogicalEngine()
+    for color in ['red', 'green']:
+        engine.add_fact(Fact(Predicate('color', [Term(color)])))
+    for n in [1, 2, 3]:
+        engine.add_fact(Fact(Predicate('num', [Term(n)])))
+    engine.add_rule(Rule(Predicate('first_num', [var('N')]), [Predicate('num', [var('N')]), Cut()]))
+    engine.add_rule(Rule(Predicate('pair', [var('C'), var('N')]),
+                         [Predicate('color', [var('C')]), Predicate('first_num', [var('N')])]))
+
+    solutions = engine.query(Predicate('pair', [var('C'), var('N')]))
+    assert [(s.bindings['C'].value, s.bindings['N'].value) for s in solutions] == [('red', 1), ('green', 1)]
+
+
+def test_cut_inside_not_is_local():
+    """Test that not/1 isolates a cut in the negated goal"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('item', [Term('a')])))
+    engine.add_fact(Fact(Predicate('item', [Term('b')])))
+    engine.add_rule(Rule(Predicate('blocked', [Term('a')]), [Cut()]))
+    engine.add_rule(Rule(Predicate('free', [var('X')]),
+                         [Predicate('item', [var('X')]), Predicate('not', [Predicate('blocked', [var('X')])])]))
+
+    solutions = engine.query(Predicate('free', [var('X')]))
+    assert [s.bindings['X'].value for s in solutions] == ['b']
@@ -0,0 +1,138 @@
+"""
+Tests for bottom-up semi-naive Datalog evaluation
+اختبارات تقييم داتالوج من الأسفل إلى الأعلى
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.datalog_engine import DatalogEvaluator
+from tests.logic_helpers import var
+
+
+def graph_engine(edges):
+    engine = LogicalEngine()
+    for source, target in edges:
+        engine.add_fact(Fact(Predicate('edge', [Term(source), Term(target)])))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('edge', [var('X'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('path', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]
+    ))
+    return engine
+
+
+def test_transitive_closure_on_cycle():
+    """Test that a left-recursive closure over a cycle reaches its fixpoint"""
+    engine = graph_engine([('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')])
+    model = engine.materialize()
+
+    paths = {(x.value, y.value) for x, y in model.relations['path']}
+    assert len(paths) == 12
+    assert ('d', 'a') not in paths
+    assert ('a', 'd') in paths
+
+
+def test_queries_are_answered_from_the_model():
+    """Test that query() reads materialized rows instead of resolving rules"""
+    engine = graph_engine([(f'n{i}', f'n{i + 1}') for i in range(50)])
+    engine.materialize()
+
+    calls = []
+    compiled = engine._compiled
+    engine._compiled = lambda rule: calls.append(rule) or compiled(rule)
+    solutions = engine.query(Predicate('path', [Term('n10'), var('Y')]))
+
+    assert len(solutions) == 40
+    assert calls == []
+
+
+def test_stratified_negation():
+    """Test that not/1 reads a relation computed in a lower stratum"""
+    engine = graph_engine([('a', 'b'), ('b', 'c'), ('d', 'd')])
+    for node in 'abcd':
+        engine.add_fact(Fact(Predicate('node', [Term(node)])))
+    engine.add_rule(Rule(
+        Predicate('unreachable', [var('X'), var('Y')]),
+        [Predicate('node', [var('X')]), Predicate('node', [var('Y')]),
+         Predicate('not', [Predicate('path', [var('X'), var('Y')])])]
+    ))
+
+    model = DatalogEvaluator(engine).run()
+    assert model.strata.index(['unreachable']) > [i for i, s in enumerate(model.strata) if 'path' in s][0]
+    pairs = {(x.value, y.value) for x, y in model.relations['unreachable']}
+    assert ('a', 'c') not in pairs
+    assert ('c', 'a') in pairs
+    assert len(pairs) == 16 - 4
+
+
+def test_recursive_negation_is_rejected():
+    """Test that a predicate negating itself cannot be stratified"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('node', [Term('a')])))
+    engine.add_rule(Rule(
+        Predicate('odd', [var('X')]),
+        [Predicate('node', [var('X')]), Predicate('not', [Predicate('odd', [var('X')])])]
+    ))
+    with pytest.raises(RuntimeError, match="stratifiable"):
+        engine.materialize()
+
+
+def test_model_is_dropped_on_rule_change():
+    """Test that asserting a rule falls back to top-down resolution"""
+    code = """
+hybrid {
+    edge("a", "b").
+    edge("b", "c").
+    blocked("c").
+    path(?X, ?Y) :- edge(?X, ?Y).
+    path(?X, ?Y) :- edge(?X, ?Z), path(?Z, ?Y).
+    open_path(?X, ?Y) :- path(?X, ?Y), not(blocked(?Y)).
+}
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(ast)
+    engine = interpreter.logical
+
+    engine.materialize()
+    goal = Predicate('open_path', [Term('a'), var('Y')])
+    assert [s.bindings['Y'].value for s in engine.query(goal)] == ['b']
+
+    engine.assertz(Rule(
+        Predicate('edge', [var('X'), Term('d')]),
+        [Predicate('blocked', [var('X')])]
+    ))
+    assert engine.model is None
+    assert sorted(s.bindings['Y'].value for s in engine.query(goal)) == ['b', 'd']
+
+
+def test_unsafe_rule_is_rejected_before_evaluation():
+    """Test that a head variable missing from the body is reported even when the body has no rows"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('pair', [var('X'), var('Y')]), [Predicate('item', [var('X')])]))
+    engine.add_fact(Fact(Predicate('other', [Term('a')])))
+    with pytest.raises(RuntimeError, match=r"Unsafe rule.*\?Y"):
+        engine.materialize()
+    assert engine.model is None
+
+
+def test_negated_builtin_is_rejected():
+    """Test that not/1 around a builtin is refused instead of read as an empty relation"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('item', [Term(1)])))
+    engine.add_rule(Rule(Predicate('outside', [var('X')]),
+                         [Predicate('item', [var('X')]), Predicate('not', [Predicate('member', [var('X'), [Term(1)]])])]))
+    with pytest.raises(RuntimeError, match="does not support"):
+        engine.materialize()
+    assert engine.has_solution(Predicate('member', [Term(1), [Term(1)]]))
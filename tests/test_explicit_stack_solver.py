@@ -0,0 +1,114 @@
+"""
+Tests for the explicit-stack solver
+اختبارات المحلل ذي المكدس الصريح
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, ResolutionLimitError
+from bayan.ast_nodes import IsExpression, BinaryOp, Cut, Number, Variable
+from tests.logic_helpers import var
+
+
+def chain_engine(length):
+    engine = LogicalEngine()
+    for i in range(length):
+        engine.add_fact(Fact(Predicate('next', [Term(i), Term(i + 1)])))
+    engine.add_fact(Fact(Predicate('reach', [Term(length), Term('end')])))
+    engine.add_rule(Rule(
+        Predicate('reach', [var('X'), var('Y')]),
+        [Predicate('next', [var('X'), var('Z')]), Predicate('reach', [var('Z'), var('Y')])]
+    ))
+    return engine
+
+
+def countdown_engine():
+    engine = LogicalEngine()
+    engine.add_rule(Rule(
+        Predicate('countdown', [var('N')]),
+        [Predicate('_compare_==', [var('N'), Term(0)])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('countdown', [var('N')]),
+        [
+            Predicate('_compare_>', [var('N'), Term(0)]),
+            IsExpression(var('M'), BinaryOp('-', Variable('?N'), Number(1))),
+            Predicate('countdown', [var('M')]),
+        ]
+    ))
+    return engine
+
+
+def test_deep_recursion_beyond_python_limit():
+    """Test that recursion far deeper than sys.getrecursionlimit() succeeds"""
+    depth = sys.getrecursionlimit() * 5
+    engine = chain_engine(depth)
+
+    solutions = engine.query(Predicate('reach', [Term(0), var('Y')]))
+    assert [s.bindings['Y'].value for s in solutions] == ['end']
+
+
+def test_deep_arithmetic_recursion():
+    """Test a long countdown mixing comparisons and 'is'"""
+    engine = countdown_engine()
+    assert engine.has_solution(Predicate('countdown', [Term(5000)]))
+
+
+def test_depth_budget_raises():
+    """Test that exceeding max_depth raises a clean error"""
+    engine = chain_engine(200)
+    engine.max_depth = 50
+
+    with pytest.raises(ResolutionLimitError, match="depth"):
+        engine.query(Predicate('reach', [Term(0), var('Y')]))
+    assert engine.call_stack == []
+
+
+def test_deep_nesting_through_findall_raises():
+    """Test that recursion through findall/3 at every level ends in a clean error"""
+    engine = chain_engine(3000)
+    engine.add_fact(Fact(Predicate('walk', [Term(3000), Term(0)])))
+    engine.add_rule(Rule(Predicate('walk', [var('X'), var('C')]), [
+        Predicate('next', [var('X'), var('Z')]),
+        Predicate('findall', [var('Q'), Predicate('walk', [var('Z'), var('Q')]), var('L')]),
+        Predicate('length', [var('L'), var('C')]),
+    ]))
+    assert engine.query(Predicate('walk', [Term(2990), var('C')]))[0].bindings['C'] == 1
+
+    with pytest.raises(ResolutionLimitError, match="too deep"):
+        engine.query(Predicate('walk', [Term(0), var('C')]))
+    with pytest.raises(ResolutionLimitError, match="too deep"):
+        engine.has_solution(Predicate('walk', [Term(0), var('C')]))
+    assert engine.call_stack == []
+
+
+def test_step_budget_raises():
+    """Test that max_steps bounds the work of a single query"""
+    engine = chain_engine(200)
+    engine.max_steps = 100
+
+    with pytest.raises(ResolutionLimitError, match="step"):
+        engine.query(Predicate('reach', [Term(0), var('Y')]))
+
+    # The counter restarts for every query
+    engine.max_steps = 1000
+    assert engine.query(Predicate('reach', [Term(199), var('Y')]))[0].bindings['Y'].value == 'end'
+    assert engine.steps < 1000
+
+
+def test_cut_commits_in_machine():
+    """Test that a cut drops the alternatives of the goals before it"""
+    engine = LogicalEngine()
+    for value in ('a', 'b', 'c'):
+        engine.add_fact(Fact(Predicate('item', [Term(value)])))
+    engine.add_rule(Rule(
+        Predicate('first', [var('X')]),
+        [Predicate('item', [var('X')]), Cut()]
+    ))
+
+    solutions = engine.query(Predicate('first', [var('X')]))
+    assert [s.bindings['X'].value for s in solutions] == ['a']
@@ -0,0 +1,157 @@
+"""
+Tests for streaming CSV/TSV/JSONL files into logical facts
+اختبارات استيراد ملفات CSV وTSV وJSONL كحقائق منطقية
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Predicate, Term, ColumnStore
+from bayan.fact_ingest import read_facts, native_value
+from tests.logic_helpers import var
+
+
+def rows(engine, name, arity):
+    goal = Predicate(name, [var(f'A{i}') for i in range(arity)])
+    return [tuple(s.bindings[f'A{i}'].value for i in range(arity)) for s in engine.query(goal)]
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_native_values():
+    """Test which field texts become numbers"""
+    assert native_value('12') == 12 and native_value('-3') == -3
+    assert native_value('1.5') == 1.5 and native_value('2e3') == 2000.0
+    assert native_value('nan') == 'nan' and native_value('12a') == '12a' and native_value('') == ''
+    assert native_value('007') == '007' and native_value('0') == 0 and native_value('0.25') == 0.25
+
+
+def test_csv_with_header(tmp_path):
+    """Test a CSV file with a header, numeric columns and Arabic text"""
+    path = write(tmp_path, 'people.csv', 'name,age,city\nعلي,30,الرياض\nsara,25.5,"Jeddah, KSA"\n')
+    engine = LogicalEngine()
+    report = engine.ingest_file(path, 'person')
+    assert report['facts'] == 2 and report['path'] == path
+    assert rows(engine, 'person', 3) == [('علي', 30, 'الرياض'), ('sara', 25.5, 'Jeddah, KSA')]
+    assert engine.has_solution(Predicate('person', [var('N'), Term(30), var('C')]))
+
+
+def test_column_selection(tmp_path):
+    """Test choosing and reordering columns by name and by position"""
+    path = write(tmp_path, 'people.csv', 'name,age,city\nali,30,riyadh\n')
+    engine = LogicalEngine()
+    engine.ingest_file(path, 'lives_in', columns=['city', 'name'])
+    engine.ingest_file(path, 'age', columns=[0, 1])
+    assert rows(engine, 'lives_in', 2) == [('riyadh', 'ali')]
+    assert rows(engine, 'age', 2) == [('ali', 30)]
+    with pytest.raises(ValueError):
+        engine.ingest_file(path, 'bad', columns=['country'])
+
+
+def test_tsv_without_header_and_text_only(tmp_path):
+    """Test a headerless TSV file, keeping numeric-looking fields as text"""
+    path = write(tmp_path, 'codes.tsv', 'a\t007\nb\t010\n')
+    engine = LogicalEngine()
+    engine.ingest_file(path, 'code', header=False, numeric=False)
+    assert rows(engine, 'code', 2) == [('a', '007'), ('b', '010')]
+
+
+def test_columns_keep_one_type(tmp_path):
+    """Test that a column becomes numeric only if every field in it is a number"""
+    path = write(tmp_path, 'places.csv', 'zip,code,rooms\n02139,12,3\n10001,12a,4\n')
+    engine = LogicalEngine()
+    engine.ingest_file(path, 'place')
+    assert rows(engine, 'place', 3) == [('02139', '12', 3), ('10001', '12a', 4)]
+
+
+def test_named_numeric_columns(tmp_path):
+    """Test converting only the columns named in numeric, and rejecting text in them"""
+    path = write(tmp_path, 'stock.csv', 'sku,count\n0042,7\n0043,9\n')
+    engine = LogicalEngine()
+    engine.ingest_file(path, 'stock', numeric={'count'})
+    assert rows(engine, 'stock', 2) == [('0042', 7), ('0043', 9)]
+    with pytest.raises(ValueError, match='not a number'):
+        engine.ingest_file(path, 'sku', numeric=['sku'])
+
+
+def test_jsonl(tmp_path):
+    """Test JSON objects (keys of the first record by default) and arrays"""
+    path = write(tmp_path, 'events.jsonl', '{"user": "ali", "score": 7}\n\n{"score": 9, "user": "sara"}\n')
+    engine = LogicalEngine()
+    engine.ingest_file(path, 'score')
+    assert rows(engine, 'score', 2) == [('ali', 7), ('sara', 9)]
+
+    arrays = write(tmp_path, 'pairs.ndjson', '[1, "x"]\n[2, "y"]\n')
+    engine.ingest_file(arrays, 'pair', columns=[1, 0])
+    assert rows(engine, 'pair', 2) == [('x', 1), ('y', 2)]
+
+    broken = write(tmp_path, 'broken.jsonl', '{"user": "ali"}\n{"name": "sara"}\n')
+    with pytest.raises(ValueError):
+        engine.ingest_file(broken, 'user')
+
+
+def test_reading_is_lazy(tmp_path):
+    """Test that facts are produced one record at a time"""
+    path = write(tmp_path, 'n.csv', 'n\n' + ''.join(f'{i}\n' for i in range(5000)))
+    facts = read_facts(path, 'n')
+    assert next(facts).predicate == Predicate('n', [Term(0)])
+    facts.close()
+
+
+def test_large_files_use_the_bulk_path(tmp_path):
+    """Test that a big ground relation lands in a ColumnStore"""
+    path = write(tmp_path, 'edges.csv', 'a,b\n' + ''.join(f'{i},{i % 10}\n' for i in range(3000)))
+    engine = LogicalEngine()
+    report = engine.ingest_file(path, 'edge', batch_size=500)
+    assert report['facts'] == 3000 and report['facts_per_second'] > 0
+    assert isinstance(engine.knowledge_base['edge'], ColumnStore)
+    assert len(engine.query(Predicate('edge', [var('X'), Term(4)]))) == 300
+
+
+def test_unknown_format(tmp_path):
+    """Test that an unrecognised extension needs an explicit format"""
+    path = write(tmp_path, 'data.txt', 'a,b\n1,2\n')
+    with pytest.raises(ValueError):
+        LogicalEngine().ingest_file(path, 'p')
+    assert LogicalEngine().ingest_file(path, 'p', format='csv')['facts'] == 1
+
+
+def test_bayan_builtin(tmp_path):
+    """Test load_facts() called from a Bayan program"""
+    csv_path = write(tmp_path, 'capitals.csv', 'country,capital\nمصر,القاهرة\nfrance,paris\n')
+    kb_path = write(tmp_path, 'kb.by', 'continent("مصر", "africa").\n')
+    code = f'''
+load_facts("{csv_path}", "capital")
+load_facts("{kb_path}")
+hybrid {{
+    rule african_capital(?C) :- capital(?X, ?C), continent(?X, "africa").
+}}
+'''
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    solutions = interpreter.logical.query(Predicate('african_capital', [var('C')]))
+    assert [s.bindings['C'].value for s in solutions] == ['القاهرة']
+
+
+def test_user_function_named_load_facts():
+    """Test that a program's own load_facts() function is called instead of the builtin"""
+    code = '''
+def load_facts(name): {
+    return "loaded " + name
+}
+
+message = load_facts("people")
+'''
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    assert interpreter.traditional.global_env['message'] == 'loaded people'
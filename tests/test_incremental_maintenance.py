@@ -0,0 +1,188 @@
+"""
+Tests for incremental maintenance of materialized rules
+اختبارات الصيانة التدريجية للقواعد المحسوبة مسبقاً
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.datalog_engine import DatalogEvaluator, Relation
+from tests.logic_helpers import var
+
+
+def edge(source, target):
+    return Fact(Predicate('edge', [Term(source), Term(target)]))
+
+
+def graph_engine(edges):
+    engine = LogicalEngine()
+    for source, target in edges:
+        engine.add_fact(edge(source, target))
+    engine.add_fact(Fact(Predicate('hub', [Term('n0')])))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('edge', [var('X'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('path', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('isolated', [var('X')]),
+        [Predicate('edge', [var('X'), var('Y')]),
+         Predicate('not', [Predicate('path', [Term('n0'), var('X')])]),
+         Predicate('not', [Predicate('hub', [var('X')])])]
+    ))
+    return engine
+
+
+def snapshot(model):
+    return {name: set(relation) for name, relation in model.relations.items() if len(relation)}
+
+
+def test_insert_propagates_without_recompute(monkeypatch):
+    """Test that asserting a fact only extends the affected relations"""
+    engine = LogicalEngine()
+    engine.add_fact(edge('a', 'b'))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('edge', [var('X'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('path', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]
+    ))
+    model = engine.materialize()
+
+    def no_recompute(self, level):
+        raise AssertionError("stratum recomputed")
+    monkeypatch.setattr(DatalogEvaluator, '_evaluate_stratum', no_recompute)
+
+    engine.assertz(edge('b', 'c'))
+    assert engine.model is model
+    assert (Term('a'), Term('c')) in model.relations['path']
+
+
+def test_retract_rederives_alternative_support():
+    """Test that a row with another derivation survives a retract"""
+    engine = graph_engine([('n0', 'n1'), ('n1', 'n2'), ('n0', 'n2')])
+    model = engine.materialize()
+
+    engine.retract(Predicate('edge', [Term('n1'), Term('n2')]))
+    assert (Term('n0'), Term('n2')) in model.relations['path']
+    assert (Term('n1'), Term('n2')) not in model.relations['path']
+
+
+def test_duplicate_facts_are_counted():
+    """Test that retracting one of two identical facts keeps the row"""
+    engine = graph_engine([('n0', 'n1'), ('n0', 'n1')])
+    model = engine.materialize()
+
+    engine.retract(Predicate('edge', [Term('n0'), Term('n1')]))
+    assert (Term('n0'), Term('n1')) in model.relations['path']
+    engine.retract(Predicate('edge', [Term('n0'), Term('n1')]))
+    assert len(model.relations['path']) == 0
+
+
+def test_negated_predicates_are_kept_consistent():
+    """Test that a change under not/1 updates the higher stratum"""
+    engine = graph_engine([('n0', 'n1'), ('n5', 'n6')])
+    engine.materialize()
+    goal = Predicate('isolated', [var('X')])
+    assert [s.bindings['X'].value for s in engine.query(goal)] == ['n5']
+
+    engine.assertz(edge('n1', 'n5'))
+    assert engine.query(goal) == []
+    engine.retractall(Predicate('edge', [Term('n1'), var('Y')]))
+    assert [s.bindings['X'].value for s in engine.query(goal)] == ['n5']
+
+
+def test_random_updates_match_full_recompute():
+    """Test incremental results against materializing from scratch"""
+    rng = random.Random(7)
+    nodes = [f'n{i}' for i in range(8)]
+    engine = graph_engine([(rng.choice(nodes), rng.choice(nodes)) for _ in range(10)])
+    model = engine.materialize()
+
+    for _ in range(60):
+        source, target = rng.choice(nodes), rng.choice(nodes)
+        if rng.random() < 0.5:
+            engine.assertz(edge(source, target))
+        else:
+            engine.retract(Predicate('edge', [Term(source), var('Y')]))
+        assert engine.model is model
+        assert snapshot(model) == snapshot(DatalogEvaluator(engine).run())
+
+
+def record_scans(monkeypatch):
+    """Record the names of relations read in full"""
+    scans = []
+    lookup = Relation.lookup
+
+    def recording_lookup(self, positions, key):
+        if not positions:
+            scans.append(self.name)
+        return lookup(self, positions, key)
+    monkeypatch.setattr(Relation, 'lookup', recording_lookup)
+    return scans
+
+
+def test_updates_start_from_the_changed_literal(monkeypatch):
+    """Test that a change to the second body literal does not scan the first one"""
+    engine = LogicalEngine()
+    for i in range(500):
+        engine.add_fact(Fact(Predicate('a', [Term(f'x{i}'), Term(i % 10)])))
+    engine.add_fact(Fact(Predicate('b', [Term(1), Term('y')])))
+    engine.add_rule(Rule(
+        Predicate('r', [var('X'), var('Y')]),
+        [Predicate('a', [var('X'), var('Z')]), Predicate('b', [var('Z'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('s', [var('X'), var('N')]),
+        [Predicate('a', [var('X'), var('Z')]), Predicate('_compare_==', [var('Z'), Term(2)]),
+         Predicate('b', [var('Z'), var('Y')]), Predicate('size', [var('Y'), var('N')])]
+    ))
+    model = engine.materialize()
+    scans = record_scans(monkeypatch)
+
+    engine.assertz(Fact(Predicate('b', [Term('k'), Term('k')])))
+    engine.assertz(Fact(Predicate('b', [Term(2), Term('w')])))
+    engine.assertz(Fact(Predicate('size', [Term('w'), Term(3)])))
+    engine.retract(Predicate('b', [Term(1), Term('y')]))
+    assert 'a' not in scans
+    assert engine.model is model
+    assert len(model.relations['r']) == 50 and len(model.relations['s']) == 50
+    assert snapshot(model) == snapshot(DatalogEvaluator(engine).run())
+
+
+def test_recursive_rounds_start_from_the_delta(monkeypatch):
+    """Test that semi-naive rounds look up a recursive literal that is not first in the body"""
+    scans = record_scans(monkeypatch)
+    engine = LogicalEngine()
+    for i in range(30):
+        engine.add_fact(edge(f'n{i}', f'n{i + 1}'))
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('edge', [var('X'), var('Z')]), Predicate('path', [var('Z'), var('Y')])]
+    ))
+    model = engine.materialize()
+    assert len(model.relations['path']) == 30 * 31 // 2
+    assert scans.count('edge') == 2
+
+
+def test_failed_update_drops_the_model(monkeypatch):
+    """Test that an error while maintaining the model falls back to top-down queries"""
+    engine = graph_engine([('a', 'b')])
+    engine.materialize()
+
+    def failing_insert(self, facts):
+        raise RuntimeError("update failed")
+    monkeypatch.setattr(DatalogEvaluator, 'insert', failing_insert)
+
+    engine.assertz(edge('b', 'c'))
+    assert engine.model is None
+    assert engine.has_solution(Predicate('path', [Term('a'), Term('c')]))
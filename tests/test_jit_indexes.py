@@ -0,0 +1,83 @@
+"""
+Tests for just-in-time argument indexes
+اختبارات الفهارس الفورية على المعاملات
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+def relation(source, target):
+    return Fact(Predicate('relation', [Term(source), Term(target)]))
+
+
+def build_engine(size=100):
+    engine = LogicalEngine()
+    for i in range(size):
+        engine.add_fact(relation(f'n{i}', f't{i % 10}'))
+    return engine
+
+
+def test_second_argument_index_is_built_on_demand():
+    """Test that binding the second argument builds an index on it"""
+    engine = build_engine()
+    assert [i['position'] for i in engine.list_indexes()] == [0]
+
+    goal = Predicate('relation', [Term('S', is_variable=True), Term('t3')])
+    solutions = engine.query(goal)
+
+    assert [s.bindings['S'].value for s in solutions] == [f'n{i}' for i in range(3, 100, 10)]
+    assert len(engine._clauses_for(goal)) == 10
+    positions = [(i['predicate'], i['position']) for i in engine.list_indexes()]
+    assert positions == [('relation', 0), ('relation', 1)]
+
+
+def test_small_predicates_are_not_jit_indexed():
+    """Test that predicates below the threshold are scanned"""
+    engine = build_engine(size=5)
+    goal = Predicate('relation', [Term('S', is_variable=True), Term('t3')])
+    assert len(engine.query(goal)) == 1
+    assert [i['position'] for i in engine.list_indexes()] == [0]
+
+
+def test_selective_first_argument_skips_jit_index():
+    """Test that a selective first-argument lookup does not build more indexes"""
+    engine = build_engine()
+    goal = Predicate('relation', [Term('n7'), Term('t7')])
+    assert len(engine.query(goal)) == 1
+    assert [i['position'] for i in engine.list_indexes()] == [0]
+
+
+def test_jit_index_follows_assert_and_retract():
+    """Test that assertz/asserta/retract keep the JIT index in sync"""
+    engine = build_engine()
+    goal = Predicate('relation', [Term('S', is_variable=True), Term('t3')])
+    engine.query(goal)
+
+    engine.asserta(relation('first', 't3'))
+    engine.assertz(relation('last', 't3'))
+    engine.retract(Predicate('relation', [Term('n13'), Term('t3')]))
+
+    names = [s.bindings['S'].value for s in engine.query(goal)]
+    assert names[0] == 'first'
+    assert names[-1] == 'last'
+    assert 'n13' not in names
+    assert len(names) == 11
+
+    engine.retractall(Predicate('relation', [Term('S', is_variable=True), Term('t3')]))
+    assert engine.query(goal) == []
+
+
+def test_list_indexes_reports_memory():
+    """Test that list_indexes reports keys, clauses and bytes"""
+    engine = build_engine()
+    engine.query(Predicate('relation', [Term('S', is_variable=True), Term('t1')]))
+
+    info = {i['position']: i for i in engine.list_indexes()}
+    assert info[0]['keys'] == 100
+    assert info[1]['keys'] == 10
+    assert info[1]['clauses'] == 100
+    assert info[0]['bytes'] > info[1]['bytes'] > 0
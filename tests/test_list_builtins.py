@@ -0,0 +1,112 @@
+"""
+Tests for the native list predicates member, append, length, nth0/nth1 and msort
+اختبارات مسندات القوائم المدمجة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from tests.logic_helpers import var
+
+
+def values(solutions, name):
+    return [s.bindings[name] for s in solutions]
+
+
+def plain(value):
+    """Strip Terms from a binding for comparison"""
+    if isinstance(value, Term):
+        return value.value
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+def test_registered_on_construction():
+    """Test that a new engine knows the list predicates"""
+    engine = LogicalEngine()
+    for key in [('member', 2), ('append', 3), ('length', 2), ('nth0', 3), ('nth1', 3), ('msort', 2)]:
+        assert key in engine.builtins
+
+
+def test_member():
+    """Test checking and enumerating members"""
+    engine = LogicalEngine()
+    assert engine.has_solution(Predicate('member', [Term(2), [1, 2, 3]]))
+    assert not engine.has_solution(Predicate('member', [Term(4), [1, 2, 3]]))
+    assert values(engine.query(Predicate('member', [var('X'), ['a', 'b']])), 'X') == ['a', 'b']
+
+
+def test_append_modes():
+    """Test append with the prefix known, and enumerating the splits of a list"""
+    engine = LogicalEngine()
+    solutions = engine.query(Predicate('append', [[1, 2], [3], var('Z')]))
+    assert values(solutions, 'Z') == [[1, 2, 3]]
+
+    splits = engine.query(Predicate('append', [var('X'), var('Y'), [1, 2, 3]]))
+    assert [(s.bindings['X'], s.bindings['Y']) for s in splits] == [
+        ([], [1, 2, 3]), ([1], [2, 3]), ([1, 2], [3]), ([1, 2, 3], [])]
+
+    assert values(engine.query(Predicate('append', [var('X'), [3], [1, 2, 3]])), 'X') == [[1, 2]]
+    assert engine.query(Predicate('append', [var('X'), [4], [1, 2, 3]])) == []
+
+    with pytest.raises(RuntimeError):
+        engine.query(Predicate('append', [var('X'), var('Y'), var('Z')]))
+
+
+def test_length_modes():
+    """Test measuring a list and building one of a given length"""
+    engine = LogicalEngine()
+    assert values(engine.query(Predicate('length', [[1, 2, 3], var('N')])), 'N') == [3]
+    assert engine.has_solution(Predicate('length', [[], Term(0)]))
+
+    built = engine.query(Predicate('length', [var('L'), Term(2)]))
+    assert len(built) == 1 and len(built[0].bindings['L']) == 2
+    assert all(item.is_variable for item in built[0].bindings['L'])
+
+    partial = {'list_pattern': True, 'head': [Term('a')], 'tail': var('T')}
+    closed = engine.query(Predicate('length', [partial, Term(3)]))
+    assert len(closed[0].bindings['T']) == 2
+
+
+def test_nth():
+    """Test indexing and enumerating positions"""
+    engine = LogicalEngine()
+    letters = ['a', 'b', 'c']
+    assert plain(values(engine.query(Predicate('nth0', [Term(1), letters, var('E')])), 'E')) == ['b']
+    assert plain(values(engine.query(Predicate('nth1', [Term(1), letters, var('E')])), 'E')) == ['a']
+    assert engine.query(Predicate('nth1', [Term(4), letters, var('E')])) == []
+    assert values(engine.query(Predicate('nth0', [var('I'), letters, Term('c')])), 'I') == [2]
+
+
+def test_msort():
+    """Test sorting in standard order with duplicates kept"""
+    engine = LogicalEngine()
+    solutions = engine.query(Predicate('msort', [['b', 2, 'a', 1.5, 2], var('S')]))
+    assert values(solutions, 'S') == [[1.5, 2, 2, 'a', 'b']]
+
+
+def test_use_in_rules_and_user_definitions_win():
+    """Test the built-ins as rule body goals, and that a program's own predicate shadows them"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('team', [Term('red'), [Term('ali'), Term('sara')]])))
+    engine.add_rule(Rule(Predicate('plays', [var('P'), var('T')]),
+                         [Predicate('team', [var('T'), var('L')]), Predicate('member', [var('P'), var('L')])]))
+    assert plain(values(engine.query(Predicate('plays', [var('P'), Term('red')])), 'P')) == ['ali', 'sara']
+
+    engine.add_fact(Fact(Predicate('member', [Term('only'), Term('mine')])))
+    assert engine.query(Predicate('member', [Term(1), [1]])) == []
+    assert engine.has_solution(Predicate('member', [Term('only'), Term('mine')]))
+
+
+def test_long_lists_are_linear():
+    """Test that the native predicates handle long lists without recursion"""
+    engine = LogicalEngine()
+    big = list(range(20000))
+    assert values(engine.query(Predicate('length', [big, var('N')])), 'N') == [20000]
+    assert engine.has_solution(Predicate('member', [Term(19999), big]))
+    assert engine.has_solution(Predicate('append', [big, [1], var('Z')]))
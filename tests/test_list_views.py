@@ -0,0 +1,112 @@
+"""
+Tests for zero-copy list tails (ListView) and the PartialList term
+اختبارات ذيول القوائم بدون نسخ ومصطلح القائمة الجزئية
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.traditional_interpreter import TraditionalInterpreter
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import (LogicalEngine, Fact, Predicate, Term, Substitution,
+                                  ListView, PartialList)
+from tests.logic_helpers import var, parse_goal, parse_rule
+
+
+def test_tail_is_a_view_of_the_same_list():
+    """Test that [H|T] binds T to a view sharing the matched list"""
+    engine = LogicalEngine()
+    items = [1, 2, 3]
+    result = engine._unify(PartialList([var('H')], var('T')), items, Substitution())
+    tail = result.lookup('T')
+    assert isinstance(tail, ListView)
+    assert tail.items is items and tail.start == 1
+    assert tail == [2, 3] and [2, 3] == tail
+    assert list(tail) == [2, 3] and len(tail) == 2 and tail[-1] == 3
+
+
+def test_views_of_views_stay_flat():
+    """Test that a view of a view points at the original list"""
+    items = list(range(5))
+    view = ListView(ListView(items, 1), 2)
+    assert view.items is items and view.start == 3
+    assert view == [3, 4] and view[0:1] == [3]
+    assert ListView(items, 5) == []
+
+
+def test_empty_tail():
+    """Test that matching every element leaves an empty tail"""
+    engine = LogicalEngine()
+    result = engine._unify(PartialList([var('A'), var('B')], var('T')), [1, 2], Substitution())
+    assert result.lookup('T') == []
+    assert engine._unify(PartialList([var('A'), var('B')], var('T')), [1], Substitution()) is None
+
+
+def test_recursion_over_a_long_list():
+    """Test a recursive rule walking a long list through views"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('total', [[], Term(0)])))
+    engine.add_rule(parse_rule('total([?H|?T], ?S) :- total(?T, ?S1), ?S is ?S1 + ?H.'))
+    items = list(range(5000))
+    solutions = engine.query(Predicate('total', [items, var('S')]))
+    assert [s.bindings['S'] for s in solutions] == [sum(items)]
+
+
+def test_resolved_bindings_are_lists():
+    """Test that solutions report plain lists, not views"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('split', [PartialList([var('H')], var('T')), var('H'), var('T')])))
+    solutions = engine.query(Predicate('split', [[1, 2, 3], var('X'), var('Rest')]))
+    rest = solutions[0].bindings['Rest']
+    assert type(rest) is list and rest == [2, 3]
+
+
+def test_parser_builds_list_terms():
+    """Test that lists in logical terms become lists and PartialLists"""
+    goal = parse_goal('split([?H, 2|?T], [1, ?X])')
+    pattern, closed = goal.args
+    assert pattern == PartialList([var('H'), Term(2)], var('T'))
+    assert closed == [Term(1), var('X')]
+
+
+def test_program_with_list_patterns():
+    """Test rules over [H|T] written in Bayan source"""
+    code = """
+hybrid {
+    mem(?H, [?H|?T]).
+    rule mem(?X, [?H|?T]) :- mem(?X, ?T).
+}
+query mem(?X, [1, 2, 3]).
+"""
+    interpreter = HybridInterpreter()
+    result = interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    assert [row['X'].value for row in result] == [1, 2, 3]
+
+
+def test_interpreter_builds_partial_lists():
+    """Test that the interpreter evaluates [H|T] to a PartialList"""
+    interpreter = TraditionalInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer('x = 1\nrest = [2, 3]').tokenize()).parse())
+    node = HybridParser(HybridLexer('[x|rest]').tokenize()).parse_primary()
+    assert interpreter.visit_list_pattern(node) == PartialList([1], [2, 3])
+
+
+def test_older_dict_form_still_unifies():
+    """Test the {'list_pattern': ...} form accepted before PartialList existed"""
+    engine = LogicalEngine()
+    pattern = {'list_pattern': True, 'head': [var('H')], 'tail': var('T')}
+    result = engine._unify([1, 2], pattern, Substitution())
+    assert result.lookup('H') == 1 and result.lookup('T') == [2]
+    assert engine._is_list_pattern(pattern) and engine._is_list_pattern(PartialList([], var('T')))
+
+
+def test_member_on_an_open_list():
+    """Test member/2 over the known elements of a partial list"""
+    engine = LogicalEngine()
+    open_list = PartialList([Term(1), Term(2)], var('T'))
+    assert engine.has_solution(Predicate('member', [Term(1), open_list]))
+    solutions = engine.query(Predicate('member', [var('X'), open_list]))
+    assert [s.bindings['X'] for s in solutions] == [Term(1), Term(2)]
@@ -0,0 +1,116 @@
+"""
+Tests for native int/float numbers in logical terms
+اختبارات الأعداد الأصلية في الحدود المنطقية
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.traditional_interpreter import TraditionalInterpreter
+from bayan.hybrid_interpreter import HybridInterpreter
+from tests.logic_helpers import var, parse_goal, parse_rule
+
+
+def run_code(code):
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter.logical
+
+
+def test_parser_builds_numeric_terms():
+    """Test that integer, float and negative literals keep their type"""
+    goal = parse_goal('point(3, 2.5, -4)')
+    values = [arg.value for arg in goal.args]
+    assert values == [3, 2.5, -4]
+    assert [type(v) for v in values] == [int, float, int]
+
+
+def test_parsed_facts_join_with_is_results():
+    """Test that numbers computed by 'is' match parsed numeric facts"""
+    engine = run_code('''
+hybrid {
+    age(ali, 30).
+    age(sara, 31).
+    older(?P, ?Q) :- age(?P, ?A), ?B is ?A + 1, age(?Q, ?B).
+}
+''')
+    goal = Predicate('older', [var('P'), var('Q')])
+    solutions = engine.query(goal)
+    assert [(s.bindings['P'].value, s.bindings['Q'].value) for s in solutions] == [('ali', 'sara')]
+
+    engine.materialize()
+    solutions = engine.query(goal)
+    assert [(s.bindings['P'].value, s.bindings['Q'].value) for s in solutions] == [('ali', 'sara')]
+
+
+def test_int_and_float_unify():
+    """Test that 1 and 1.0 unify in rows, indexes and columns"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('weight', [Term('a'), Term(1)])))
+    engine.add_fact(Fact(Predicate('weight', [Term('b'), Term(2.0)])))
+    assert engine.has_solution(Predicate('weight', [Term('a'), Term(1.0)]))
+    assert engine.has_solution(Predicate('weight', [Term('b'), Term(2)]))
+    assert not engine.has_solution(Predicate('weight', [Term('b'), Term(2.5)]))
+
+    engine.use_columns('weight')
+    found = engine.query(Predicate('weight', [var('W'), Term(1.0)]))
+    assert [s.bindings['W'].value for s in found] == ['a']
+    engine.add_fact(Fact(Predicate('weight', [Term('c'), Term(1.0)])))
+    found = engine.query(Predicate('weight', [var('W'), Term(1)]))
+    assert [s.bindings['W'].value for s in found] == ['a', 'c']
+
+
+def test_comparison_operators():
+    """Test parsed comparisons, including the Prolog spellings"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('n', [Term(2)])))
+    engine.add_fact(Fact(Predicate('n', [Term(5)])))
+    engine.add_rule(Rule(
+        Predicate('big', [var('X')]),
+        [Predicate('n', [var('X')]), parse_goal('?X > 3')]
+    ))
+    assert [s.bindings['X'].value for s in engine.query(Predicate('big', [var('X')]))] == [5]
+
+    sub = engine.query(Predicate('n', [var('X')]))[0]
+    assert engine._evaluate_comparison(Predicate('_compare_=<', [var('X'), Term(2.0)]), sub)
+    assert engine._evaluate_comparison(Predicate('_compare_=:=', [var('X'), Term(2.0)]), sub)
+    assert not engine._evaluate_comparison(Predicate('_compare_=\\=', [var('X'), Term(2)]), sub)
+
+
+def test_function_call_predicates_keep_numbers():
+    """Test that evaluated call arguments become numeric terms"""
+    interpreter = TraditionalInterpreter()
+    assert interpreter._logical_constant(7).value == 7
+    assert interpreter._logical_constant(1.5).value == 1.5
+    assert interpreter._logical_constant(True).value == 'True'
+    assert interpreter._logical_constant('x').value == 'x'
+
+
+def test_int_and_float_calls_are_different_variants():
+    """Test that the query cache and answer tables keep inc(1, Z) and inc(1.0, Z) apart"""
+    for tabled in (False, True):
+        engine = LogicalEngine()
+        engine.add_rule(parse_rule('inc(?X, ?Y) :- ?Y is ?X + 1.'))
+        if tabled:
+            engine.table('inc', 2)
+        first, second = [getattr(value, 'value', value) for value in (
+            engine.query(Predicate('inc', [Term(1), var('Z')]))[0].bindings['Z'],
+            engine.query(Predicate('inc', [Term(1.0), var('Z')]))[0].bindings['Z'])]
+        assert (first, type(first)) == (2, int)
+        assert (second, type(second)) == (2.0, float)
+
+
+def test_materialized_rows_keep_number_types():
+    """Test that q(a, 2) and q(a, 2.0) stay two rows of a Datalog relation"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('q', [Term('a'), Term(2)])))
+    engine.add_fact(Fact(Predicate('q', [Term('a'), Term(2.0)])))
+    engine.materialize()
+    values = [s.bindings['V'].value for s in engine.query(Predicate('q', [Term('a'), var('V')]))]
+    assert [(v, type(v)) for v in values] == [(2, int), (2.0, float)]
+    engine.retract(Predicate('q', [Term('a'), Term(2.0)]))
+    assert [s.bindings['V'].value for s in engine.query(Predicate('q', [Term('a'), var('V')]))] == [2]
@@ -0,0 +1,105 @@
+"""
+Tests for unifying open lists with each other: patterns, partial lists and difference lists
+اختبارات توحيد القوائم المفتوحة فيما بينها: الأنماط والقوائم الجزئية وقوائم الفرق
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term, Substitution, PartialList
+from tests.logic_helpers import var, parse_rule
+
+
+def unify(left, right):
+    engine = LogicalEngine()
+    result = engine._unify(left, right, Substitution())
+    if result is None:
+        return None
+    return {name: engine._resolve(value, result) for name, value in result.bindings.items()}
+
+
+def test_pattern_with_pattern():
+    """Test [H|T] against [1, 2|U], binding H and sharing the open tail"""
+    bindings = unify(PartialList([var('H')], var('T')), PartialList([Term(1), Term(2)], var('U')))
+    assert bindings['H'] == Term(1)
+    assert bindings['T'] == PartialList([Term(2)], var('U'))
+
+
+def test_longer_pattern_binds_shorter_tail():
+    """Test [A, B, C|T] against [1|U]: U becomes [B, C|T] with B and C bound"""
+    engine = LogicalEngine()
+    left = PartialList([var('A'), var('B'), var('C')], var('T'))
+    result = engine._unify(left, PartialList([Term(1)], var('U')), Substitution())
+    assert result.lookup('A') == Term(1)
+    assert engine._resolve(var('U'), result) == PartialList([var('B'), var('C')], var('T'))
+
+
+def test_clashing_elements_fail():
+    """Test that a mismatch in the known prefix fails"""
+    assert unify(PartialList([Term(1)], var('T')), PartialList([Term(2)], var('U'))) is None
+    assert unify(PartialList([Term(1), Term(2)], var('T')), [Term(1), Term(3)]) is None
+    assert unify(PartialList([Term(1), Term(2)], var('T')), [Term(1)]) is None
+
+
+def test_same_tail_variable():
+    """Test [1|T] = [1|T] and [1|T] = [X|T]"""
+    assert unify(PartialList([Term(1)], var('T')), PartialList([Term(1)], var('T'))) == {}
+    assert unify(PartialList([Term(1)], var('T')), PartialList([var('X')], var('T'))) == {'X': Term(1)}
+
+
+def test_nested_and_empty_heads():
+    """Test patterns whose tails are themselves patterns or bound lists"""
+    nested = PartialList([Term(1)], PartialList([Term(2)], var('T')))
+    assert unify(nested, [Term(1), Term(2), Term(3)]) == {'T': [Term(3)]}
+    assert unify(PartialList([], var('T')), PartialList([Term(1)], var('U')))['T'] == PartialList([Term(1)], var('U'))
+
+
+def test_cyclic_binding_is_rejected():
+    """Test that T = [1|T] fails the occurs check"""
+    assert unify(var('T'), PartialList([Term(1)], var('T'))) is None
+
+
+def test_difference_list_append():
+    """Test constant-time append of difference lists Front-Back"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('append_dl', [
+        Predicate('-', [var('A'), var('B')]),
+        Predicate('-', [var('B'), var('C')]),
+        Predicate('-', [var('A'), var('C')])])))
+    first = Predicate('-', [PartialList([Term(1), Term(2)], var('T1')), var('T1')])
+    second = Predicate('-', [PartialList([Term(3)], var('T2')), var('T2')])
+    goal = Predicate('append_dl', [first, second, Predicate('-', [var('R'), []])])
+    solutions = engine.query(goal)
+    assert [s.bindings['R'] for s in solutions] == [[Term(1), Term(2), Term(3)]]
+
+
+def test_rules_pass_partial_lists():
+    """Test a rule that fills in a partial list built by its caller"""
+    engine = LogicalEngine()
+    engine.add_rule(parse_rule('starts([?A, ?B|?T], ?A, ?B, ?T) :- true(?A).'))
+    engine.add_fact(Fact(Predicate('true', [var('_')])))
+    goal = Predicate('starts', [PartialList([Term('x')], var('Rest')), var('First'), Term('y'), var('T')])
+    solutions = engine.query(goal)
+    assert len(solutions) == 1
+    assert solutions[0].bindings['First'] == Term('x')
+    rest = solutions[0].bindings['Rest']
+    assert rest.head == [Term('y')] and rest.tail.is_variable
+
+
+def test_user_append_builds_long_lists():
+    """Test append written with [H|T] heads, in both directions and on a long list"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('app', [[], var('L'), var('L')])))
+    engine.add_rule(parse_rule('app([?H|?T], ?L, [?H|?R]) :- app(?T, ?L, ?R).'))
+
+    splits = engine.query(Predicate('app', [var('X'), var('Y'), [1, 2]]))
+    assert [(s.bindings['X'], s.bindings['Y']) for s in splits] == [([], [1, 2]), ([1], [2]), ([1, 2], [])]
+
+    open_end = engine.query(Predicate('app', [[Term(1)], var('Y'), PartialList([var('A'), Term(2)], var('Z'))]))
+    assert open_end[0].bindings['A'] == Term(1)
+    assert open_end[0].bindings['Y'].head == [Term(2)]
+
+    big = list(range(3000))
+    solutions = engine.query(Predicate('app', [big, [Term('end')], var('Z')]))
+    assert solutions[0].bindings['Z'] == big + [Term('end')]
@@ -0,0 +1,75 @@
+"""
+Tests for path compression when dereferencing variables
+اختبارات ضغط المسارات عند تتبع المتغيرات
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution
+from tests.logic_helpers import var
+
+
+def chain(sub, length, end):
+    """Bind V0 -> V1 -> ... -> V<length> -> end"""
+    for i in range(length):
+        sub.bind(f'V{i}', var(f'V{i + 1}'))
+    sub.bind(f'V{length}', end)
+
+
+def test_deref_compresses_the_chain():
+    """Test that every variable on a chain is rebound to its end"""
+    engine = LogicalEngine()
+    sub = Substitution()
+    chain(sub, 50, Term('end'))
+
+    assert engine._deref(var('V0'), sub) == Term('end')
+    assert all(sub.bindings[f'V{i}'] == Term('end') for i in range(51))
+    assert engine._deref(var('V25'), sub) == Term('end')
+
+
+def test_compression_stops_at_unbound_variable():
+    """Test that a chain ending in a free variable points at that variable"""
+    engine = LogicalEngine()
+    sub = Substitution()
+    for i in range(5):
+        sub.bind(f'V{i}', var(f'V{i + 1}'))
+
+    assert engine._deref(var('V0'), sub) == var('V5')
+    assert sub.bindings['V0'] == var('V5')
+
+
+def test_undo_restores_the_original_chain():
+    """Test that backtracking past a compression restores the chain"""
+    engine = LogicalEngine()
+    sub = Substitution()
+    for i in range(5):
+        sub.bind(f'V{i}', var(f'V{i + 1}'))
+    mark = sub.mark()
+    sub.bind('V5', Term('late'))
+
+    assert engine._deref(var('V0'), sub) == Term('late')
+    sub.undo(mark)
+
+    assert sub.bindings == {f'V{i}': var(f'V{i + 1}') for i in range(5)}
+    assert engine._deref(var('V0'), sub) == var('V5')
+
+
+def test_deep_forwarding_rules():
+    """Test a recursion that builds long variable-to-variable chains"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('forward', [Term(0), var('X'), var('X')])))
+    engine.add_rule(Rule(
+        Predicate('forward', [var('N'), var('In'), var('Out')]),
+        [
+            Predicate('_compare_>', [var('N'), Term(0)]),
+            Predicate('step', [var('N'), var('M')]),
+            Predicate('forward', [var('M'), var('In'), var('Out')]),
+        ]
+    ))
+    for n in range(1, 3001):
+        engine.add_fact(Fact(Predicate('step', [Term(n), Term(n - 1)])))
+
+    solutions = engine.query(Predicate('forward', [Term(3000), Term('payload'), var('R')]))
+    assert [s.bindings['R'].value for s in solutions] == ['payload']
@@ -0,0 +1,110 @@
+"""
+Tests for the LRU query-answer cache
+اختبارات ذاكرة التخزين المؤقت لنتائج الاستعلامات
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, QueryCache
+from tests.logic_helpers import var
+
+
+def build_engine():
+    engine = LogicalEngine()
+    for letter, place in [('ب', 'lips'), ('م', 'lips'), ('ت', 'teeth')]:
+        engine.add_fact(Fact(Predicate('articulation', [Term(letter), Term(place)])))
+    engine.add_rule(Rule(
+        Predicate('lip_letter', [var('L')]),
+        [Predicate('articulation', [var('L'), Term('lips')])]
+    ))
+    engine.add_fact(Fact(Predicate('color', [Term('red')])))
+    return engine
+
+
+def test_repeated_query_hits_the_cache():
+    """Test that an identical query is answered without solving again"""
+    engine = build_engine()
+    goal = Predicate('lip_letter', [var('X')])
+    first = engine.query(goal)
+
+    calls = []
+    compiled = engine._compiled
+    engine._compiled = lambda rule: calls.append(rule) or compiled(rule)
+    second = engine.query(goal)
+
+    assert [s.bindings['X'].value for s in second] == [s.bindings['X'].value for s in first] == ['ب', 'م']
+    assert calls == []
+    assert engine.cache_stats()['hits'] == 1
+    assert engine.cache_stats()['misses'] == 1
+
+
+def test_variants_share_an_entry():
+    """Test that goals differing only in variable names use one entry"""
+    engine = build_engine()
+    engine.query(Predicate('articulation', [var('X'), Term('lips')]))
+    solutions = engine.query(Predicate('articulation', [var('Letter'), Term('lips')]))
+
+    assert [s.bindings['Letter'].value for s in solutions] == ['ب', 'م']
+    assert engine.cache_stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'capacity': 1024}
+
+
+def test_generations_invalidate_dependent_entries():
+    """Test that changing a predicate only invalidates queries depending on it"""
+    engine = build_engine()
+    goal = Predicate('lip_letter', [var('X')])
+    engine.query(goal)
+    engine.query(Predicate('color', [var('C')]))
+
+    engine.assertz(Fact(Predicate('articulation', [Term('و'), Term('lips')])))
+    assert [s.bindings['X'].value for s in engine.query(goal)] == ['ب', 'م', 'و']
+    engine.query(Predicate('color', [var('C')]))
+    assert engine.cache_stats()['hits'] == 1
+
+    engine.retract(Predicate('articulation', [Term('ب'), Term('lips')]))
+    assert [s.bindings['X'].value for s in engine.query(goal)] == ['م', 'و']
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test LRU eviction and the eviction counter"""
+    cache = QueryCache(capacity=2)
+    cache.put('a', (), [1])
+    cache.put('b', (), [2])
+    assert cache.get('a', {}) == [1]
+    cache.put('c', (), [3])
+
+    assert cache.get('b', {}) is None
+    assert cache.get('a', {}) == [1]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_query_expressions_use_the_cache():
+    """Test that repeated query expressions in Bayan code are cache hits"""
+    code = """
+hybrid {
+    parent("john", "mary").
+}
+"""
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    query = HybridParser(HybridLexer('query parent("john", ?X).').tokenize()).parse()
+
+    for _ in range(3):
+        assert interpreter.interpret(query) == [{'X': Term('mary')}]
+    assert interpreter.logical.cache_stats()['hits'] == 2
+
+
+def test_cached_lists_are_not_shared():
+    """Test that changing a list in one answer does not change later cached answers"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('items', [[Term(1), [Term(2)]]])))
+    goal = Predicate('items', [var('L')])
+    first = engine.query(goal)[0].bindings['L']
+    first.append(Term(3))
+    first[1].append(Term(4))
+    assert engine.query(goal)[0].bindings['L'] == [Term(1), [Term(2)]]
+    assert engine.cache_stats()['hits'] == 1
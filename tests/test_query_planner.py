@@ -0,0 +1,143 @@
+"""
+Tests for the selectivity-based query planner
+اختبارات مخطط الاستعلامات المعتمد على الانتقائية
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import Cut
+from bayan.query_planner import QueryPlanner
+from tests.logic_helpers import var
+
+
+def build_engine(columnar_threshold=1024):
+    """employee(Name, Dept) with 400 rows, manager(Dept) with one row"""
+    engine = LogicalEngine()
+    engine.columnar_threshold = columnar_threshold
+    for i in range(400):
+        engine.add_fact(Fact(Predicate('employee', [Term(f'e{i}'), Term(f'd{i % 20}')])))
+    engine.add_fact(Fact(Predicate('manager', [Term('d7')])))
+    engine.add_rule(Rule(
+        Predicate('managed', [var('E')]),
+        [Predicate('employee', [var('E'), var('D')]), Predicate('manager', [var('D')])]
+    ))
+    return engine
+
+
+def answers(engine, goal, name):
+    return sorted(s.bindings[name].value for s in engine.query(goal))
+
+
+def test_statistics():
+    """Test cardinality and distinct counts for rows and columns"""
+    for threshold in (1024, 100):
+        engine = build_engine(threshold)
+        stats = engine.predicate_stats('employee')
+        assert stats.cardinality == 400
+        assert stats.distinct == [400, 20]
+    assert engine.predicate_stats('managed') is None
+    assert engine.predicate_stats('missing') is None
+
+
+def test_statistics_follow_changes():
+    """Test that asserting a fact refreshes the cached statistics"""
+    engine = build_engine()
+    planner = engine.enable_planner()
+    assert planner.predicate_stats('manager').cardinality == 1
+    engine.assertz(Fact(Predicate('manager', [Term('d8')])))
+    assert planner.predicate_stats('manager').cardinality == 2
+
+
+def test_statistics_are_updated_in_place(monkeypatch):
+    """Test that asserts and retracts adjust the statistics without scanning the facts again"""
+    for threshold in (1024, 100):
+        engine = build_engine(threshold)
+        planner = engine.enable_planner()
+        goal = Predicate('managed', [var('E')])
+        answers(engine, goal, 'E')
+
+        def no_collect(self, pred_name):
+            raise AssertionError(f"statistics of {pred_name} collected again")
+        monkeypatch.setattr(QueryPlanner, '_collect', no_collect)
+        for i in range(5):
+            engine.assertz(Fact(Predicate('employee', [Term(f'new{i}'), Term('d99')])))
+            assert answers(engine, goal, 'E')[:1] == ['e107']
+        engine.retract(Predicate('employee', [Term('e7'), var('D')]))
+        engine.retract(Predicate('employee', [Term('new0'), var('D')]))
+        stats = planner.predicate_stats('employee')
+        monkeypatch.undo()
+
+        assert (stats.cardinality, stats.distinct) == (403, [403, 21])
+        fresh = QueryPlanner(engine).predicate_stats('employee')
+        assert (fresh.cardinality, fresh.distinct) == (403, [403, 21])
+
+
+def test_selective_goal_runs_first():
+    """Test that the planner reorders the body and does less work for the same answers"""
+    goal = Predicate('managed', [var('E')])
+
+    plain = build_engine()
+    expected = answers(plain, goal, 'E')
+    plain_steps = plain.steps
+
+    planned = build_engine()
+    planned.enable_planner()
+    assert answers(planned, goal, 'E') == expected == sorted(f'e{i}' for i in range(7, 400, 20))
+    assert planned.steps < plain_steps
+
+    template = planned.knowledge_base['managed'][0]._template
+    (_, steps), = template.plans.values()
+    assert [template.goal_names[template.body_steps.index(step)] for step in steps] == ['manager', 'employee']
+
+
+def test_plans_depend_on_bound_head_arguments():
+    """Test that a call with the head bound keeps the cheaper original order"""
+    engine = build_engine()
+    engine.enable_planner()
+    assert engine.has_solution(Predicate('managed', [Term('e7')]))
+    assert not engine.has_solution(Predicate('managed', [Term('e8')]))
+    template = engine.knowledge_base['managed'][0]._template
+    plan = template.plans[(True,)][1]
+    assert plan == template.body_steps
+
+
+def test_cut_and_rules_are_not_moved():
+    """Test that goals never cross a cut or a call to a rule"""
+    engine = build_engine()
+    engine.enable_planner()
+    rule = Rule(
+        Predicate('first_managed', [var('E')]),
+        [Predicate('managed', [var('E')]), Cut(),
+         Predicate('employee', [var('E'), var('D')]), Predicate('manager', [var('D')])]
+    )
+    engine.add_rule(rule)
+    solutions = engine.query(Predicate('first_managed', [var('E')]))
+    assert [s.bindings['E'].value for s in solutions] == ['e7']
+    (_, steps), = rule._template.plans.values()
+    order = [rule._template.body_steps.index(step) for step in steps]
+    assert order[:2] == [0, 1]
+    assert sorted(order[2:]) == [2, 3]
+
+
+def test_goals_before_a_cut_keep_their_order():
+    """Test that the cut commits to the same answer with and without the planner"""
+    def pick_engine():
+        engine = LogicalEngine()
+        for i in range(50):
+            engine.add_fact(Fact(Predicate('big', [Term(i), Term(i % 5)])))
+        engine.add_fact(Fact(Predicate('small', [Term(3)])))
+        engine.add_fact(Fact(Predicate('small', [Term(1)])))
+        engine.add_rule(Rule(
+            Predicate('pick', [var('X')]),
+            [Predicate('big', [var('X'), var('Y')]), Predicate('small', [var('Y')]), Cut()]
+        ))
+        return engine
+
+    goal = Predicate('pick', [var('X')])
+    assert answers(pick_engine(), goal, 'X') == [1]
+    engine = pick_engine()
+    engine.enable_planner()
+    assert answers(engine, goal, 'X') == [1]
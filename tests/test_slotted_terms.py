@@ -0,0 +1,57 @@
+"""
+Tests for the compact __slots__-based logical term classes
+اختبارات أصناف الحدود المنطقية المدمجة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution
+from tests.logic_helpers import var
+
+
+def test_instances_have_no_dict():
+    """Test that the core classes store their fields in slots"""
+    term = Term('a')
+    predicate = Predicate('p', [term])
+    objects = [term, predicate, Fact(predicate), Rule(predicate, []), Substitution()]
+    for obj in objects:
+        assert not hasattr(obj, '__dict__')
+    with pytest.raises(AttributeError):
+        term.extra = 1
+
+
+def test_constructors_keep_their_signatures():
+    """Test positional and keyword construction as before"""
+    term = Term('X', is_variable=True)
+    rule = Rule(head=Predicate('p', [term]), body=[Predicate('q', [term])])
+    assert term.value == 'X' and term.is_variable
+    assert rule.head.args[0] is term
+    assert rule._template is None
+    assert Fact(predicate=Predicate('p', [])).predicate.name == 'p'
+
+
+def test_hashes_are_cached_and_consistent():
+    """Test that equal terms and predicates hash alike"""
+    assert hash(Term('a')) == hash(Term('a'))
+    assert hash(Term('a')) != hash(var('a'))
+    first = Predicate('p', [Term('a'), Term(1)])
+    assert hash(first) == hash(Predicate('p', [Term('a'), Term(1)]))
+    assert first._hash is not None
+    assert len({first, Predicate('p', [Term('a'), Term(1)])}) == 1
+
+
+def test_engine_works_with_slotted_classes():
+    """Test facts, rules and renaming on the slotted classes"""
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('parent', [Term('tom'), Term('bob')])))
+    engine.add_rule(Rule(
+        Predicate('child', [var('C'), var('P')]),
+        [Predicate('parent', [var('P'), var('C')])]
+    ))
+    solutions = engine.query(Predicate('child', [var('Who'), Term('tom')]))
+    assert [s.bindings['Who'].value for s in solutions] == ['bob']
+    assert engine.knowledge_base['child'][0]._template is not None
@@ -0,0 +1,95 @@
+"""
+Tests for lazy, generator-based solution streaming
+اختبارات توليد الحلول بشكل كسول
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+
+
+def build_engine():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('color', [Term('red')])))
+    engine.add_fact(Fact(Predicate('color', [Term('green')])))
+    engine.add_rule(Rule(
+        Predicate('color', [Term('X', is_variable=True)]),
+        [Predicate('paint', [Term('X', is_variable=True)])]
+    ))
+    engine.add_fact(Fact(Predicate('paint', [Term('blue')])))
+    return engine
+
+
+def count_rule_calls(engine):
+    calls = []
+    compiled = engine._compiled
+
+    def counting_compiled(rule):
+        calls.append(rule)
+        return compiled(rule)
+
+    engine._compiled = counting_compiled
+    return calls
+
+
+def test_solve_iter_yields_lazily():
+    """Test that solve_iter does not explore clauses past the answers consumed"""
+    engine = build_engine()
+    calls = count_rule_calls(engine)
+
+    solutions = engine.solve_iter(Predicate('color', [Term('X', is_variable=True)]))
+    first = next(solutions)
+    assert first.bindings['X'].value == 'red'
+    assert calls == []
+
+    rest = [s.bindings['X'].value for s in solutions]
+    assert rest == ['green', 'blue']
+    assert len(calls) == 1
+
+
+def test_query_still_returns_a_list():
+    """Test that query() collects every streamed solution"""
+    engine = build_engine()
+    solutions = engine.query(Predicate('color', [Term('X', is_variable=True)]))
+    assert isinstance(solutions, list)
+    assert [s.bindings['X'].value for s in solutions] == ['red', 'green', 'blue']
+
+
+def test_has_solution_stops_at_first_answer():
+    """Test that has_solution only computes one answer"""
+    engine = build_engine()
+    calls = count_rule_calls(engine)
+
+    assert engine.has_solution(Predicate('color', [Term('X', is_variable=True)]))
+    assert calls == []
+    assert not engine.has_solution(Predicate('color', [Term('black')]))
+    assert engine.call_stack == []
+
+
+def test_not_stops_at_first_answer():
+    """Test that not/1 fails without enumerating the whole goal"""
+    engine = build_engine()
+    calls = count_rule_calls(engine)
+
+    goal = Predicate('not', [Predicate('color', [Term('X', is_variable=True)])])
+    assert engine.query(goal) == []
+    assert calls == []
+
+
+def test_function_call_query_is_boolean():
+    """Test that a predicate call in traditional code checks for any solution"""
+    code = """
+hybrid {
+    parent("john", "mary").
+}
+found = parent("john", ?X)
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(ast)
+    assert interpreter.traditional.global_env['found'] is True
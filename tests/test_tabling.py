@@ -0,0 +1,115 @@
+"""
+Tests for tabled (memoized) resolution
+اختبارات الحل مع جداول الإجابات
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from tests.logic_helpers import var
+
+
+def graph_engine(edges, left_recursive=True):
+    engine = LogicalEngine()
+    for source, target in edges:
+        engine.add_fact(Fact(Predicate('edge', [Term(source), Term(target)])))
+    engine.add_rule(Rule(
+        Predicate('path', [var('X'), var('Y')]),
+        [Predicate('edge', [var('X'), var('Y')])]
+    ))
+    if left_recursive:
+        body = [Predicate('path', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]
+    else:
+        body = [Predicate('edge', [var('X'), var('Z')]), Predicate('path', [var('Z'), var('Y')])]
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Y')]), body))
+    engine.table('path', 2)
+    return engine
+
+
+def reachable(engine, source):
+    solutions = engine.query(Predicate('path', [Term(source), var('Y')]))
+    return sorted(s.bindings['Y'].value for s in solutions)
+
+
+def test_left_recursion_terminates():
+    """Test that a left-recursive closure over a cycle terminates"""
+    engine = graph_engine([('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')])
+    assert reachable(engine, 'a') == ['a', 'b', 'c', 'd']
+
+
+def test_right_recursion_on_cycle_terminates():
+    """Test that a right-recursive closure over a cycle terminates"""
+    engine = graph_engine([('a', 'b'), ('b', 'a'), ('b', 'c')], left_recursive=False)
+    assert reachable(engine, 'a') == ['a', 'b', 'c']
+    assert reachable(engine, 'c') == []
+
+
+def test_completed_tables_are_reused():
+    """Test that a second identical query is answered from the table"""
+    engine = graph_engine([('a', 'b'), ('b', 'c')])
+    reachable(engine, 'a')
+    table = next(t for t in engine.tables.values() if t.goal.args[0] == Term('a'))
+    assert table.complete
+
+    calls = []
+    compiled = engine._compiled
+    engine._compiled = lambda rule: calls.append(rule) or compiled(rule)
+    assert reachable(engine, 'a') == ['b', 'c']
+    assert calls == []
+
+
+def test_assert_and_retract_invalidate_tables():
+    """Test that changing a dependency drops the stale tables"""
+    engine = graph_engine([('a', 'b'), ('b', 'c')])
+    assert reachable(engine, 'a') == ['b', 'c']
+
+    engine.assertz(Fact(Predicate('edge', [Term('c'), Term('d')])))
+    assert reachable(engine, 'a') == ['b', 'c', 'd']
+
+    engine.retract(Predicate('edge', [Term('b'), Term('c')]))
+    assert reachable(engine, 'a') == ['b']
+
+    # Unrelated predicates keep the tables
+    engine.add_fact(Fact(Predicate('color', [Term('red')])))
+    assert engine.tables
+
+
+def test_table_builtin_in_bayan_code():
+    """Test that table(name, arity) declares a tabled predicate from Bayan code"""
+    code = """
+table("path", 2)
+hybrid {
+    edge("a", "b").
+    edge("b", "a").
+    path(?X, ?Y) :- path(?X, ?Z), edge(?Z, ?Y).
+    path(?X, ?Y) :- edge(?X, ?Y).
+}
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(ast)
+
+    assert ('path', 2) in interpreter.logical.tabled
+    assert reachable(interpreter.logical, 'a') == ['a', 'b']
+
+
+def test_user_function_named_table():
+    """Test that a program's own table() function is called instead of the builtin"""
+    code = """
+def table(rows, columns): {
+    return rows * columns
+}
+
+cells = table(2, 3)
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(ast)
+
+    assert interpreter.traditional.global_env['cells'] == 6
+    assert not interpreter.logical.tabled
@@ -0,0 +1,85 @@
+"""
+Tests for counter-based variable renaming
+اختبارات إعادة تسمية المتغيرات بعداد
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import IsExpression, BinaryOp, Number, Variable
+from tests.logic_helpers import var
+
+
+def ancestor_engine(length):
+    engine = LogicalEngine()
+    for i in range(length):
+        engine.add_fact(Fact(Predicate('parent', [Term(f'p{i}'), Term(f'p{i + 1}')])))
+    engine.add_rule(Rule(
+        Predicate('ancestor', [var('X'), var('Y')]),
+        [Predicate('parent', [var('X'), var('Y')])]
+    ))
+    engine.add_rule(Rule(
+        Predicate('ancestor', [var('X'), var('Y')]),
+        [Predicate('parent', [var('X'), var('Z')]), Predicate('ancestor', [var('Z'), var('Y')])]
+    ))
+    return engine
+
+
+def test_renamed_variables_are_fresh_and_deterministic():
+    """Test that each renaming uses the next counter value"""
+    engine = LogicalEngine()
+    rule = Rule(Predicate('p', [var('X'), Term('a')]), [Predicate('q', [var('X'), var('Y')])])
+
+    first = engine._rename_variables(rule)
+    second = engine._rename_variables(rule)
+
+    assert first.head.args[0] == var('X#1')
+    assert first.body[0].args[1] == var('Y#1')
+    assert second.head.args[0] == var('X#2')
+    assert first.head.args[1] is rule.head.args[1]
+    assert not hasattr(engine, 'var_mapping')
+
+
+def test_template_is_compiled_once():
+    """Test that the clause template is cached on the rule"""
+    engine = LogicalEngine()
+    rule = Rule(Predicate('p', [var('X')]), [Predicate('q', [var('X')])])
+    engine._rename_variables(rule)
+    template = rule._template
+    engine._rename_variables(rule)
+
+    assert rule._template is template
+    assert template.var_names == ['X']
+
+
+def test_ground_goals_are_shared():
+    """Test that goals without variables are not rebuilt"""
+    engine = LogicalEngine()
+    ground = Predicate('ready', [Term('now')])
+    rule = Rule(Predicate('p', [var('X')]), [ground, Predicate('q', [var('X')])])
+
+    renamed = engine._rename_variables(rule)
+    assert renamed.body[0] is ground
+
+
+def test_recursive_rule_renames_every_level():
+    """Test that nested applications of one rule never share variables"""
+    engine = ancestor_engine(30)
+    goal = Predicate('ancestor', [Term('p0'), var('Who')])
+    names = [s.bindings['Who'].value for s in engine.query(goal)]
+    assert names == [f'p{i}' for i in range(1, 31)]
+
+
+def test_is_expression_variables_are_renamed():
+    """Test that variables inside 'is' expressions follow the rule renaming"""
+    engine = LogicalEngine()
+    engine.add_rule(Rule(
+        Predicate('double', [var('X'), var('Y')]),
+        [IsExpression(var('Y'), BinaryOp('*', Variable('?X'), Number(2)))]
+    ))
+
+    solutions = engine.query(Predicate('double', [Term(21), var('R')]))
+    assert len(solutions) == 1
+    assert solutions[0].bindings['R'] == 42